@@ -1,28 +1,36 @@
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.models import User
 from django.views.decorators.csrf import ensure_csrf_cookie, csrf_exempt
-from django.http import JsonResponse
 from django.views.decorators.http import require_POST
-import json
+from backend.json_codec import json_response, read_json
+from base.query_budget import query_budget
+from base.throttling import throttle
+from .tokens import InvalidToken, bearer_token, login_tokens, refresh_tokens, revoke_tokens
 
+@query_budget(9)
+@throttle('login')
 @require_POST
 @csrf_exempt
 def login_api(request):
     """API endpoint pour la connexion utilisateur"""
-    data = json.loads(request.body)
+    try:
+        data = read_json(request)
+    except ValueError:
+        return json_response({'detail': 'Format de données invalide'}, status=400)
     username = data.get('username')
     password = data.get('password')
     
     if not username or not password:
-        return JsonResponse({'detail': 'Veuillez fournir un nom d\'utilisateur et un mot de passe'}, status=400)
+        return json_response({'detail': 'Veuillez fournir un nom d\'utilisateur et un mot de passe'}, status=400)
     
     user = authenticate(request, username=username, password=password)
     
     if user is not None:
+        # Session pour les pages Django, jetons signés pour le client React
         login(request, user)
-        return JsonResponse({
+        return json_response({
             'success': True,
-            'token': 'session-auth',  # Django utilise les sessions pour l'authentification
+            **login_tokens(user),
             'username': user.username,
             'email': user.email,
             'id': user.id,
@@ -30,8 +38,10 @@ def login_api(request):
             'is_superuser': user.is_superuser
         })
     else:
-        return JsonResponse({'detail': 'Identifiants invalides'}, status=400)
+        return json_response({'detail': 'Identifiants invalides'}, status=400)
 
+@query_budget(11)
+@throttle('register')
 @csrf_exempt
 def register_api(request):
     """API endpoint simplifié pour l'inscription utilisateur"""
@@ -44,11 +54,11 @@ def register_api(request):
     
     # Pour les requêtes OPTIONS (preflight CORS)
     if request.method == 'OPTIONS':
-        return JsonResponse({}, status=200, headers=headers)
+        return json_response({}, status=200, headers=headers)
         
     # Pour les requêtes GET (test de l'endpoint)
     if request.method == 'GET':
-        return JsonResponse({
+        return json_response({
             'status': 'ok',
             'message': 'Endpoint d\'inscription prêt à recevoir des données POST'
         }, headers=headers)
@@ -57,11 +67,11 @@ def register_api(request):
     if request.method == 'POST':
         try:
             if 'application/json' in request.content_type:
-                data = json.loads(request.body.decode('utf-8'))
+                data = read_json(request)
             else:
                 data = request.POST.dict()
         except Exception as e:
-            return JsonResponse({
+            return json_response({
                 'error': 'Format de données invalide',
                 'detail': str(e)
             }, status=400, headers=headers)
@@ -94,7 +104,7 @@ def register_api(request):
         errors['password2'] = "Les mots de passe ne correspondent pas"
     
     if errors:
-        return JsonResponse(errors, status=400, headers=headers)
+        return json_response(errors, status=400, headers=headers)
     
     try:
         # Création de l'utilisateur
@@ -104,7 +114,7 @@ def register_api(request):
         login(request, user)
         
         # Réponse de succès
-        return JsonResponse({
+        return json_response({
             'success': True,
             'message': 'Compte créé avec succès',
             'username': user.username,
@@ -112,23 +122,49 @@ def register_api(request):
             'id': user.id
         }, headers=headers)
     except Exception as e:
-        return JsonResponse({'detail': str(e)}, status=500, headers=headers)
+        return json_response({'detail': str(e)}, status=500, headers=headers)
 
+@query_budget(4)
 @require_POST
 def logout_api(request):
     """API endpoint pour la déconnexion utilisateur"""
+    try:
+        refresh = read_json(request).get('refresh') if request.body else None
+        access = bearer_token(request)
+    except (ValueError, AttributeError, InvalidToken):
+        refresh = access = None
+    revoke_tokens(access, refresh)
     logout(request)
-    return JsonResponse({'success': True})
+    return json_response({'success': True})
+
+@query_budget(1)
+@throttle('token')
+@require_POST
+@csrf_exempt
+def token_refresh_api(request):
+    """API endpoint pour échanger un jeton de rafraîchissement contre une nouvelle paire"""
+    try:
+        refresh = read_json(request).get('refresh')
+    except (ValueError, AttributeError):
+        return json_response({'detail': 'Format de données invalide'}, status=400)
+    if not refresh:
+        return json_response({'detail': 'Veuillez fournir un jeton de rafraîchissement'}, status=400)
+    try:
+        user, tokens = refresh_tokens(refresh)
+    except InvalidToken as error:
+        return json_response({'detail': str(error)}, status=401)
+    return json_response({'token': tokens['access'], **tokens, 'username': user.username, 'id': user.id})
 
+@query_budget(3)
 @ensure_csrf_cookie
 def user_api(request):
     """API endpoint pour récupérer les informations de l'utilisateur connecté"""
     if request.user.is_authenticated:
-        return JsonResponse({
+        return json_response({
             'isAuthenticated': True,
             'username': request.user.username,
             'email': request.user.email,
             'id': request.user.id
         })
     else:
-        return JsonResponse({'isAuthenticated': False}, status=401)
+        return json_response({'isAuthenticated': False}, status=401)
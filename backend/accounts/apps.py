@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
+
+    def ready(self):
+        # Cache des utilisateurs et écritures différées de last_login
+        from . import signals  # noqa: F401
+        # Refus de démarrer si sessions ou utilisateurs en cache sur un cache par processus
+        from .checks import check_shared_caches
+        check_shared_caches()
@@ -0,0 +1,48 @@
+"""
+Backend d'authentification qui sert request.user depuis le cache :
+une requête authentifiée ne lit plus la table auth_user pour savoir qui
+est l'utilisateur. L'entrée garde toutes les colonnes de User, mot de
+passe haché compris (la session est vérifiée contre son empreinte), et
+disparaît à chaque save()/delete() d'un User (accounts.signals).
+
+Les mises à jour groupées (QuerySet.update, bulk_update) ne déclenchent
+pas les signaux : appeler forget_users() après coup.
+"""
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+
+FIELDS = [field.attname for field in User._meta.concrete_fields]
+
+
+def _cache():
+    return caches[getattr(settings, 'AUTH_USER_CACHE_ALIAS', 'default')]
+
+
+def user_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def forget_users(user_ids):
+    _cache().delete_many([user_key(user_id) for user_id in user_ids])
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend dont get_user() (appelé à chaque requête authentifiée
+    par session) lit d'abord le cache AUTH_USER_CACHE_ALIAS
+    """
+    def get_user(self, user_id):
+        cache = _cache()
+        key = user_key(user_id)
+        values = cache.get(key)
+        if values is None:
+            values = User._default_manager.filter(pk=user_id).values_list(*FIELDS).first()
+            if values is None:
+                return None
+            cache.set(key, values, settings.AUTH_USER_CACHE_TIMEOUT)
+        # Instance « chargée » : save() fait un UPDATE, comme après un get()
+        user = User.from_db(DEFAULT_DB_ALIAS, FIELDS, values)
+        return user if self.user_can_authenticate(user) else None
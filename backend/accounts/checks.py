@@ -0,0 +1,43 @@
+"""
+Vérification au démarrage (AccountsConfig.ready) : sessions et
+utilisateurs en cache, liste de révocation des jetons signés doivent
+vivre dans un cache partagé par tous les workers. Avec un cache propre
+au processus (LocMemCache), une déconnexion, une désactivation, un
+changement de mot de passe ou un jeton consommé, traité par un worker,
+resterait sans effet dans les autres.
+"""
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+PROCESS_LOCAL_BACKENDS = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+def is_shared(alias):
+    return settings.CACHES[alias]['BACKEND'] not in PROCESS_LOCAL_BACKENDS
+
+
+def required_shared_caches():
+    """
+    (réglage, alias) des caches dont dépend la configuration actuelle
+    """
+    required = []
+    if settings.SESSION_ENGINE == 'accounts.sessions':
+        required.append(('SESSION_CACHE_ALIAS', settings.SESSION_CACHE_ALIAS))
+    if 'accounts.backends.CachedModelBackend' in settings.AUTHENTICATION_BACKENDS:
+        required.append(('AUTH_USER_CACHE_ALIAS', getattr(settings, 'AUTH_USER_CACHE_ALIAS', 'default')))
+    if getattr(settings, 'TOKEN_AUTH_ENABLED', False):
+        required.append(('TOKEN_CACHE_ALIAS', getattr(settings, 'TOKEN_CACHE_ALIAS', 'default')))
+    return required
+
+
+def check_shared_caches():
+    for setting, alias in required_shared_caches():
+        if not is_shared(alias):
+            raise ImproperlyConfigured(
+                f"{setting} = '{alias}' désigne un cache propre au processus "
+                f"({settings.CACHES[alias]['BACKEND']}) : configurer un cache partagé "
+                f"(Redis, Memcached) ou désactiver la fonction qui en dépend"
+            )
@@ -1,23 +1,23 @@
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.models import User
 from django.views.decorators.csrf import csrf_exempt
-from django.http import JsonResponse, HttpResponse
-import json
+from django.http import HttpResponse
+from backend.json_codec import json_response, loads
+from base.query_budget import query_budget
+from base.throttling import client_ip, throttle
+from .tokens import login_tokens
 import logging
 
-# Configuration du logger
-logging.basicConfig(level=logging.INFO)
+# Configuration par LOGGING (settings) : une ligne structurée par tentative
 logger = logging.getLogger(__name__)
 
+@query_budget(9)
+@throttle('login')
 @csrf_exempt
 def direct_login(request):
     """
     Vue simplifiée pour la connexion - accepte à la fois les requêtes form et json
     """
-    logger.info("=== NOUVELLE TENTATIVE DE CONNEXION ===")
-    logger.info(f"Méthode: {request.method}")
-    logger.info(f"Content-Type: {request.content_type}")
-    
     # Gérer les requêtes OPTIONS pour CORS
     if request.method == 'OPTIONS':
         response = HttpResponse()
@@ -28,7 +28,7 @@ def direct_login(request):
     
     # Pour les requêtes GET, renvoyer la page de connexion standard
     if request.method == 'GET':
-        return JsonResponse({
+        return json_response({
             'message': "Endpoint de connexion directe prêt à recevoir des requêtes POST."
         })
     
@@ -37,25 +37,20 @@ def direct_login(request):
         # Récupérer les données (support JSON et form-data)
         if request.content_type and 'application/json' in request.content_type:
             try:
-                body = request.body.decode('utf-8')
-                logger.info(f"Données JSON brutes: {body}")
-                data = json.loads(body)
+                data = loads(request.body)
             except Exception as e:
-                logger.error(f"Erreur de parsing JSON: {str(e)}")
-                return JsonResponse({'error': str(e)}, status=400)
+                logger.warning('login', extra={'event': 'login', 'outcome': 'invalid_json', 'ip': client_ip(request)})
+                return json_response({'error': str(e)}, status=400)
         else:
             data = request.POST.dict()
-            logger.info(f"Données de formulaire: {data}")
         
         # Récupération des identifiants
         username = data.get('username', '')
         password = data.get('password', '')
         
-        logger.info(f"Tentative de connexion pour l'utilisateur: {username}")
-        
         if not username or not password:
-            logger.warning("Identifiants manquants")
-            return JsonResponse({'error': 'Veuillez fournir un nom d\'utilisateur et un mot de passe'}, status=400)
+            logger.warning('login', extra={'event': 'login', 'outcome': 'missing_credentials', 'ip': client_ip(request)})
+            return json_response({'error': 'Veuillez fournir un nom d\'utilisateur et un mot de passe'}, status=400)
         
         # Authentification
         user = authenticate(request, username=username, password=password)
@@ -63,11 +58,13 @@ def direct_login(request):
         if user is not None:
             # Connexion réussie
             login(request, user)
-            logger.info(f"Connexion réussie pour l'utilisateur: {username}")
+            logger.info('login', extra={'event': 'login', 'outcome': 'success', 'username': username,
+                                        'ip': client_ip(request)})
             
-            response = JsonResponse({
+            response = json_response({
                 'success': True,
                 'message': 'Connexion réussie',
+                **login_tokens(user),
                 'username': username,
                 'id': user.id,
                 'email': user.email,
@@ -78,24 +75,26 @@ def direct_login(request):
             return response
         else:
             # Échec de l'authentification
-            logger.warning(f"Échec de la connexion pour l'utilisateur: {username}")
+            logger.warning('login', extra={'event': 'login', 'outcome': 'failure', 'username': username,
+                                           'ip': client_ip(request)})
             
-            response = JsonResponse({
+            response = json_response({
                 'error': 'Échec de la connexion. Veuillez vérifier vos identifiants.'
             }, status=401)
             response["Access-Control-Allow-Origin"] = "*"
             return response
     
     # Si la méthode n'est pas supportée
-    return JsonResponse({'error': 'Méthode non supportée'}, status=405)
+    return json_response({'error': 'Méthode non supportée'}, status=405)
 
 
+@query_budget(4)
 @csrf_exempt
 def direct_logout(request):
     """Vue simplifiée pour la déconnexion"""
     logout(request)
     
-    response = JsonResponse({
+    response = json_response({
         'success': True,
         'message': 'Déconnexion réussie'
     })
@@ -2,23 +2,22 @@ from django.shortcuts import render, redirect
 from django.contrib.auth.models import User
 from django.contrib.auth import login
 from django.views.decorators.csrf import csrf_exempt
-from django.http import JsonResponse, HttpResponse
-import json
+from django.http import HttpResponse
+from backend.json_codec import json_response, loads
+from base.query_budget import query_budget
+from base.throttling import client_ip, throttle
 import logging
 
-# Configuration du logger
-logging.basicConfig(level=logging.INFO)
+# Configuration par LOGGING (settings) : une ligne structurée par tentative
 logger = logging.getLogger(__name__)
 
+@query_budget(11)
+@throttle('register')
 @csrf_exempt
 def direct_register(request):
     """
     Vue simplifiée pour inscription - accepte à la fois les requêtes form et json
     """
-    logger.info("=== NOUVELLE TENTATIVE D'INSCRIPTION ===")
-    logger.info(f"Méthode: {request.method}")
-    logger.info(f"Content-Type: {request.content_type}")
-    
     # Gérer les requêtes OPTIONS pour CORS
     if request.method == 'OPTIONS':
         response = HttpResponse()
@@ -36,15 +35,13 @@ def direct_register(request):
         # Récupérer les données (support JSON et form-data)
         if request.content_type and 'application/json' in request.content_type:
             try:
-                body = request.body.decode('utf-8')
-                logger.info(f"Données JSON brutes: {body}")
-                data = json.loads(body)
+                data = loads(request.body)
             except Exception as e:
-                logger.error(f"Erreur de parsing JSON: {str(e)}")
-                return JsonResponse({'error': str(e)}, status=400)
+                logger.warning('register', extra={'event': 'register', 'outcome': 'invalid_json',
+                                                  'ip': client_ip(request)})
+                return json_response({'error': str(e)}, status=400)
         else:
             data = request.POST.dict()
-            logger.info(f"Données de formulaire: {data}")
         
         # Récupération des champs
         username = data.get('username', '')
@@ -52,8 +49,6 @@ def direct_register(request):
         password = data.get('password', '')
         password2 = data.get('password2', '')
         
-        logger.info(f"Champs extraits: username={username}, email={email}, a_password={'oui' if password else 'non'}, a_password2={'oui' if password2 else 'non'}")
-        
         # Validation des données
         errors = {}
         
@@ -77,8 +72,9 @@ def direct_register(request):
         
         # Si validation échoue, renvoyer les erreurs
         if errors:
-            logger.warning(f"Erreurs de validation: {errors}")
-            response = JsonResponse(errors, status=400)
+            logger.warning('register', extra={'event': 'register', 'outcome': 'invalid', 'fields': sorted(errors),
+                                              'ip': client_ip(request)})
+            response = json_response(errors, status=400)
             # Ajouter les en-têtes CORS
             response["Access-Control-Allow-Origin"] = "*"
             return response
@@ -87,10 +83,11 @@ def direct_register(request):
         try:
             user = User.objects.create_user(username=username, email=email, password=password)
             login(request, user)
-            logger.info(f"Utilisateur {username} créé avec succès!")
+            logger.info('register', extra={'event': 'register', 'outcome': 'success', 'username': username,
+                                           'ip': client_ip(request)})
             
             # Réponse réussie
-            response = JsonResponse({
+            response = json_response({
                 'success': True,
                 'message': 'Inscription réussie',
                 'username': username
@@ -99,10 +96,11 @@ def direct_register(request):
             return response
             
         except Exception as e:
-            logger.error(f"Erreur lors de la création de l'utilisateur: {str(e)}")
-            response = JsonResponse({'error': str(e)}, status=500)
+            logger.exception('register', extra={'event': 'register', 'outcome': 'error', 'username': username,
+                                                'ip': client_ip(request)})
+            response = json_response({'error': str(e)}, status=500)
             response["Access-Control-Allow-Origin"] = "*"
             return response
     
     # Si la méthode n'est pas supportée
-    return JsonResponse({'error': 'Méthode non supportée'}, status=405)
+    return json_response({'error': 'Méthode non supportée'}, status=405)
@@ -0,0 +1,36 @@
+"""
+Moteur de session (SESSION_ENGINE = 'accounts.sessions') : sessions en
+cache avec écriture immédiate en base (cached_db), qui n'écrit plus une
+session dont le contenu n'a pas changé. Avec SESSION_SAVE_EVERY_REQUEST,
+seule l'expiration est prolongée : dans le cache tout de suite, en base
+par lot (accounts.write_behind).
+"""
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+
+from . import write_behind
+
+
+class SessionStore(CachedDBStore):
+    _snapshot = None
+
+    def _dump(self, data):
+        return self.serializer().dumps(data)
+
+    def load(self):
+        data = super().load()
+        self._snapshot = self._dump(data) if data else None
+        return data
+
+    def _unchanged(self):
+        return (self.session_key is not None and self._snapshot is not None
+                and self._dump(self._session) == self._snapshot)
+
+    def save(self, must_create=False):
+        if not must_create and self._unchanged():
+            if settings.SESSION_SAVE_EVERY_REQUEST:
+                self._cache.touch(self.cache_key, self.get_expiry_age())
+                write_behind.record_touch(self.session_key, self.get_expiry_date())
+            return
+        super().save(must_create)
+        self._snapshot = self._dump(self._session)
@@ -0,0 +1,24 @@
+from django.contrib.auth.models import User, update_last_login
+from django.contrib.auth.signals import user_logged_in
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .backends import forget_users
+from . import write_behind
+
+# last_login n'est plus écrit par un UPDATE à chaque connexion (receveur de
+# django.contrib.auth) mais regroupé par accounts.write_behind
+user_logged_in.disconnect(update_last_login, dispatch_uid='update_last_login')
+
+
+@receiver(user_logged_in)
+def record_last_login(sender, user, **kwargs):
+    user.last_login = timezone.now()
+    write_behind.record_login(user.pk, user.last_login)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    forget_users([instance.pk])
@@ -1,3 +1,230 @@
-from django.test import TestCase
+import json
+import logging
+import os
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from accounts import write_behind
+from accounts.checks import check_shared_caches
+from accounts.tokens import issue_tokens
+from backend.log import BackgroundHandler, JSONFormatter, RedactFilter, SampleFilter
+from base.models import Likes
+from base.tests import make_post
+
+
+class LoggingPipelineTests(TestCase):
+    def record(self, name='accounts.direct_auth', level=logging.INFO, **extra):
+        record = logging.LogRecord(name, level, __file__, 1, 'login', (), None)
+        record.__dict__.update(extra)
+        return record
+
+    def test_sensitive_fields_are_redacted(self):
+        record = self.record(password='secret', data={'username': 'marie', 'Password2': 'secret'})
+        RedactFilter().filter(record)
+        self.assertEqual(record.password, '[masqué]')
+        self.assertEqual(record.data, {'username': 'marie', 'Password2': '[masqué]'})
+
+    def test_info_lines_are_sampled(self):
+        sample = SampleFilter({'accounts': 0.25})
+        kept = [sample.filter(self.record()) for _ in range(8)]
+        self.assertEqual(kept.count(True), 2)
+        self.assertTrue(sample.filter(self.record(level=logging.WARNING)))
+        self.assertTrue(sample.filter(self.record(name='base.api')))
+
+    def test_background_handler_writes_json_lines(self):
+        path = '/tmp/projet_python_test_log.jsonl'
+        handler = BackgroundHandler(filename=path)
+        self.addCleanup(lambda: os.path.exists(path) and os.remove(path))
+        handler.setFormatter(JSONFormatter())
+        handler.addFilter(RedactFilter())
+        handler.handle(self.record(outcome='success', password='secret'))
+        handler.flush()
+        handler.close()
+        with open(path, encoding='utf-8') as output:
+            line = json.loads(output.read())
+        self.assertEqual((line['msg'], line['outcome'], line['password']), ('login', 'success', '[masqué]'))
+
+    def test_request_objects_are_not_serialized(self):
+        # django.request passe la requête en extra : son corps ne doit pas être écrit
+        request = RequestFactory().post('/accounts/api/login/', {'password': 'motdepasse123'},
+                                        content_type='application/json')
+        line = JSONFormatter().format(self.record(name='django.request', request=request, status_code=400))
+        self.assertNotIn('motdepasse123', line)
+        self.assertIn('/accounts/api/login/', json.loads(line)['request'])
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        handler = BackgroundHandler(max_queue=1)
+        handler.listener.stop()
+        self.addCleanup(handler.close)
+        for _ in range(3):
+            handler.handle(self.record())
+        self.assertEqual(handler.dropped, 2)
+
+    def test_login_logs_one_line_without_the_password(self):
+        User.objects.create_user('marie', 'marie@example.com', 'motdepasse123')
+        with self.assertLogs('accounts.direct_auth', level='INFO') as logs:
+            self.client.post('/accounts/direct-login/', {'username': 'marie', 'password': 'motdepasse123'},
+                             content_type='application/json')
+        self.assertEqual(len(logs.records), 1)
+        self.assertEqual((logs.records[0].event, logs.records[0].outcome), ('login', 'success'))
+        self.assertNotIn('motdepasse123', str(vars(logs.records[0])))
+
+
+# LocMemCache tient lieu de cache partagé : les tests tournent dans un seul processus
+@override_settings(
+    AUTH_FLUSH_INTERVAL=3600,
+    SESSION_ENGINE='accounts.sessions',
+    AUTHENTICATION_BACKENDS=['accounts.backends.CachedModelBackend'],
+)
+class SessionFastPathTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('marie', 'marie@example.com', 'motdepasse123')
+        self.client.force_login(self.user)
+        # Premier passage : session et utilisateur lus en base puis mis en cache
+        self.client.get('/accounts/api/user/')
+        write_behind.flush()
+
+    def test_authenticated_request_runs_no_query(self):
+        with self.assertNumQueries(0):
+            response = self.client.get('/accounts/api/user/')
+        self.assertEqual(response.json()['username'], 'marie')
+
+    def test_process_local_cache_is_refused_at_startup(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, 'SESSION_CACHE_ALIAS'):
+            check_shared_caches()
+        with override_settings(SESSION_ENGINE='django.contrib.sessions.backends.db',
+                               AUTHENTICATION_BACKENDS=['django.contrib.auth.backends.ModelBackend']):
+            check_shared_caches()
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+                                                   'LOCATION': 'redis://localhost:6379'}}):
+            check_shared_caches()
+
+    def test_saved_user_is_reloaded(self):
+        self.user.set_password('nouveau-motdepasse')
+        self.user.save()
+        self.assertFalse(self.client.get('/accounts/api/user/').json()['isAuthenticated'])
+
+    def test_last_login_is_written_in_batch(self):
+        other = User.objects.create_user('paul', 'paul@example.com', 'motdepasse123')
+        for username in ('marie', 'paul'):
+            response = self.client.post('/accounts/direct-login/',
+                                        {'username': username, 'password': 'motdepasse123'},
+                                        content_type='application/json')
+            self.assertEqual(response.status_code, 200)
+        self.assertIsNone(User.objects.get(pk=other.pk).last_login)
+        self.assertEqual(write_behind.pending(), 2)
+        self.assertEqual(write_behind.flush(), 2)
+        self.assertEqual(User.objects.filter(pk__in=[self.user.pk, other.pk], last_login__isnull=False).count(), 2)
+
+    @override_settings(SESSION_SAVE_EVERY_REQUEST=True)
+    def test_unchanged_session_is_touched_in_batch(self):
+        session = Session.objects.get()
+        Session.objects.update(expire_date=session.expire_date - timedelta(days=1))
+        with self.assertNumQueries(0):
+            self.client.get('/accounts/api/user/')
+        self.assertEqual(write_behind.pending(), 1)
+        self.assertEqual(write_behind.flush(), 1)
+        self.assertGreater(Session.objects.get().expire_date, session.expire_date - timedelta(minutes=1))
+
+
+# LocMemCache tient lieu de cache partagé : les tests tournent dans un seul processus
+@override_settings(TOKEN_AUTH_ENABLED=True)
+class SignedTokenTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('marie', 'marie@example.com', 'motdepasse123')
+        self.post = make_post(self.user)
+        Likes.objects.create(user=self.user, post=self.post)
+
+    def bearer(self, token):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return client
+
+    def test_login_issues_tokens_verified_without_session_or_user_query(self):
+        response = self.client.post('/accounts/api/login/', {'username': 'marie', 'password': 'motdepasse123'},
+                                    content_type='application/json')
+        data = response.json()
+        self.assertEqual(data['token'], data['access'])
+        self.assertIn('refresh', data)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.bearer(data['access']).get('/api/user/liked-post-ids/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(self.post.pk, response.json()['ids'])
+        tables = ' '.join(query['sql'] for query in queries.captured_queries)
+        self.assertNotIn('django_session', tables)
+        self.assertNotIn('"auth_user"', tables)
+
+    def test_invalid_token_is_rejected_with_401(self):
+        access = issue_tokens(self.user)['access']
+        response = self.bearer(access[:-2] + 'xx').get('/api/user/liked-post-ids/')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['WWW-Authenticate'], 'Bearer')
+        with override_settings(TOKEN_ACCESS_LIFETIME=-1):
+            expired = issue_tokens(self.user)['access']
+        self.assertEqual(self.bearer(expired).get('/api/user/liked-post-ids/').status_code, 401)
+        # Sans jeton : 403 comme avant
+        self.assertEqual(APIClient().get('/api/user/liked-post-ids/').status_code, 403)
+
+    def test_expired_token_gets_401_on_async_routes(self):
+        with override_settings(TOKEN_ACCESS_LIFETIME=-1):
+            expired = issue_tokens(self.user)['access']
+        response = self.client.get('/api/async/posts/', HTTP_AUTHORIZATION=f'Bearer {expired}')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['WWW-Authenticate'], 'Bearer')
+        self.assertEqual(self.client.get('/api/async/posts/').status_code, 403)
+        access = issue_tokens(self.user)['access']
+        self.assertEqual(self.client.get('/api/async/posts/', HTTP_AUTHORIZATION=f'Bearer {access}').status_code, 200)
+
+    def test_refresh_token_is_single_use(self):
+        refresh = issue_tokens(self.user)['refresh']
+        response = self.client.post('/accounts/api/token/refresh/', {'refresh': refresh},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.bearer(response.json()['access']).get('/api/user/liked-post-ids/').status_code, 200)
+        response = self.client.post('/accounts/api/token/refresh/', {'refresh': refresh},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 401)
+
+    def test_password_change_invalidates_refresh_token(self):
+        refresh = issue_tokens(self.user)['refresh']
+        self.user.set_password('nouveau-motdepasse')
+        self.user.save()
+        response = self.client.post('/accounts/api/token/refresh/', {'refresh': refresh},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 401)
+
+    def test_logout_revokes_presented_tokens(self):
+        tokens = issue_tokens(self.user)
+        client = self.bearer(tokens['access'])
+        self.assertEqual(client.post('/accounts/api/logout/', {'refresh': tokens['refresh']},
+                                     format='json').status_code, 200)
+        self.assertEqual(client.get('/api/user/liked-post-ids/').status_code, 401)
+        response = self.client.post('/accounts/api/token/refresh/', {'refresh': tokens['refresh']},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 401)
+
+    def test_bearer_user_has_its_own_throttle_bucket(self):
+        tokens = issue_tokens(self.user)
+        with override_settings(THROTTLE_RATES={'like': {'user': '1/min'}}):
+            client = self.bearer(tokens['access'])
+            self.assertEqual(client.post(f'/api/posts/{self.post.slug}/toggle-like/').status_code, 200)
+            self.assertEqual(client.post(f'/api/posts/{self.post.slug}/toggle-like/').status_code, 429)
+
+    def test_tokens_require_a_shared_cache(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, 'TOKEN_CACHE_ALIAS'):
+            check_shared_caches()
+        with override_settings(TOKEN_AUTH_ENABLED=False):
+            check_shared_caches()
+            response = self.client.post('/accounts/api/login/', {'username': 'marie', 'password': 'motdepasse123'},
+                                        content_type='application/json')
+            self.assertEqual(response.json()['token'], 'session-auth')
+            self.assertNotIn('refresh', response.json())
@@ -0,0 +1,202 @@
+"""
+Jetons signés pour le client React (Authorization: Bearer <jeton>).
+
+À la connexion, l'API délivre un jeton d'accès court
+(TOKEN_ACCESS_LIFETIME) et un jeton de rafraîchissement
+(TOKEN_REFRESH_LIFETIME), signés HMAC-SHA256 par django.core.signing
+avec SECRET_KEY. Le jeton d'accès porte l'identité (id, username,
+is_staff, is_superuser) : sa vérification ne lit ni la session ni
+auth_user, seulement la liste de révocation en cache
+(TOKEN_CACHE_ALIAS), dont les entrées expirent avec les jetons. Cette
+liste et les jetons de rafraîchissement consommés devant être vus par
+tous les workers, les jetons ne sont actifs (TOKEN_AUTH_ENABLED) qu'avec
+un cache partagé ; sinon le client reste sur les sessions.
+
+    POST /accounts/api/login/          -> {'token', 'access', 'refresh', 'expires_in', ...}
+    POST /accounts/api/token/refresh/  {'refresh'} -> nouvelle paire
+    POST /accounts/api/logout/         révoque les jetons présentés
+"""
+import secrets
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import signing
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.crypto import salted_hmac
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+ACCESS_SALT = 'accounts.tokens.access'
+REFRESH_SALT = 'accounts.tokens.refresh'
+# Champs de l'utilisateur reconstruit depuis le jeton ; les autres sont
+# différés et lus en base seulement si une vue y accède
+CLAIM_FIELDS = ['id', 'username', 'is_staff', 'is_superuser', 'is_active']
+
+
+class InvalidToken(Exception):
+    pass
+
+
+def tokens_enabled():
+    return getattr(settings, 'TOKEN_AUTH_ENABLED', False)
+
+
+def _cache():
+    return caches[getattr(settings, 'TOKEN_CACHE_ALIAS', 'default')]
+
+
+def _revoked_key(jti):
+    return f'tokens:revoked:{jti}'
+
+
+def _password_fingerprint(user):
+    # Un changement de mot de passe invalide les jetons de rafraîchissement
+    return salted_hmac('accounts.tokens.password', user.password).hexdigest()[:16]
+
+
+def _sign(claims, salt, lifetime):
+    claims.update(j=secrets.token_urlsafe(12), x=int(time.time()) + lifetime)
+    return signing.dumps(claims, salt=salt)
+
+
+def issue_tokens(user):
+    """
+    Paire de jetons de `user`, au format de la réponse de login_api
+    """
+    lifetime = settings.TOKEN_ACCESS_LIFETIME
+    access = _sign({'u': user.pk, 'n': user.username, 's': user.is_staff, 'a': user.is_superuser},
+                   ACCESS_SALT, lifetime)
+    refresh = _sign({'u': user.pk, 'h': _password_fingerprint(user)}, REFRESH_SALT, settings.TOKEN_REFRESH_LIFETIME)
+    return {'access': access, 'refresh': refresh, 'token_type': 'Bearer', 'expires_in': lifetime}
+
+
+def login_tokens(user):
+    """
+    Champs de jeton de la réponse de connexion : la paire de jetons, ou
+    le marqueur 'session-auth' (ignoré par blogApi.js) sans jetons actifs
+    """
+    if not tokens_enabled():
+        return {'token': 'session-auth'}
+    tokens = issue_tokens(user)
+    return {'token': tokens['access'], **tokens}
+
+
+def verify(token, salt=ACCESS_SALT):
+    """
+    Revendications du jeton ; InvalidToken s'il est mal signé, expiré ou révoqué
+    """
+    try:
+        claims = signing.loads(token, salt=salt)
+    except signing.BadSignature:
+        raise InvalidToken('Jeton invalide')
+    if claims['x'] <= time.time():
+        raise InvalidToken('Jeton expiré')
+    if _cache().get(_revoked_key(claims['j'])):
+        raise InvalidToken('Jeton révoqué')
+    return claims
+
+
+def revoke(claims):
+    """
+    Ajoute le jeton à la liste de révocation jusqu'à son expiration ;
+    False s'il y était déjà
+    """
+    timeout = max(1, claims['x'] - int(time.time()))
+    return _cache().add(_revoked_key(claims['j']), True, timeout)
+
+
+def refresh_tokens(refresh):
+    """
+    Nouvelle paire contre un jeton de rafraîchissement, qui ne sert
+    qu'une fois. Seule étape qui relit l'utilisateur en base : compte
+    désactivé ou mot de passe changé depuis la connexion -> InvalidToken.
+    """
+    if not tokens_enabled():
+        raise InvalidToken('Jetons signés désactivés')
+    claims = verify(refresh, REFRESH_SALT)
+    user = User._default_manager.filter(pk=claims['u'], is_active=True).first()
+    if user is None or claims['h'] != _password_fingerprint(user):
+        raise InvalidToken('Jeton invalide')
+    # add() atomique : deux rafraîchissements simultanés, un seul gagne
+    if not revoke(claims):
+        raise InvalidToken('Jeton révoqué')
+    return user, issue_tokens(user)
+
+
+def revoke_tokens(access=None, refresh=None):
+    """
+    Révoque les jetons valides parmi ceux fournis (déconnexion)
+    """
+    if not tokens_enabled():
+        return
+    for token, salt in ((access, ACCESS_SALT), (refresh, REFRESH_SALT)):
+        if token:
+            try:
+                revoke(verify(token, salt))
+            except InvalidToken:
+                pass
+
+
+def bearer_token(request):
+    """
+    Jeton de l'en-tête `Authorization: Bearer <jeton>` de la requête
+    Django, ou None
+    """
+    parts = request.META.get('HTTP_AUTHORIZATION', '').split()
+    if not parts or parts[0].lower() != 'bearer':
+        return None
+    if len(parts) != 2:
+        raise InvalidToken('En-tête Authorization invalide')
+    return parts[1]
+
+
+def bearer_claims(request):
+    """
+    Revendications du jeton d'accès de la requête Django, None sans
+    jeton Bearer ou sans jetons actifs. Vérifiées une fois par requête
+    (limitation de débit puis authentification DRF).
+    """
+    if not tokens_enabled():
+        return None
+    if '_bearer_claims' not in request.__dict__:
+        try:
+            token = bearer_token(request)
+            request._bearer_claims = token and verify(token)
+        except InvalidToken as error:
+            request._bearer_claims = error
+    if isinstance(request._bearer_claims, InvalidToken):
+        raise request._bearer_claims
+    return request._bearer_claims
+
+
+def token_user(claims):
+    # Instance « chargée » sans requête SQL, comme accounts.backends
+    return User.from_db(DEFAULT_DB_ALIAS, CLAIM_FIELDS, [claims['u'], claims['n'], claims['s'], claims['a'], True])
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    """
+    Authentification DRF par jeton d'accès signé ; sans en-tête Bearer,
+    la main passe à SessionAuthentication
+    """
+    def authenticate(self, request):
+        try:
+            claims = bearer_claims(request._request)
+        except InvalidToken as error:
+            raise AuthenticationFailed(str(error))
+        if claims is None:
+            return None
+        return token_user(claims), claims
+
+    def authenticate_header(self, request):
+        # 401 (le client rafraîchit son jeton) si un jeton a été présenté ;
+        # sinon 403, comme avec les seules sessions
+        if not tokens_enabled():
+            return None
+        try:
+            presented = bearer_token(request._request) is not None
+        except InvalidToken:
+            presented = True
+        return 'Bearer' if presented else None
@@ -16,6 +16,7 @@ urlpatterns = [
     path('api/register/', api.register_api, name='register_api'),
     path('api/logout/', api.logout_api, name='logout_api'),
     path('api/user/', api.user_api, name='user_api'),
+    path('api/token/refresh/', api.token_refresh_api, name='token_refresh_api'),
     
     # Routes d'authentification directes (simplifiées)
     path('register-direct/', register_view.direct_register, name='direct_register'),
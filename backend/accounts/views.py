@@ -3,9 +3,13 @@ from django.contrib.auth import authenticate, login, logout
 from django.contrib import messages
 from django.http import HttpResponse
 from django.contrib.auth.models import User
+from base.query_budget import query_budget
+from base.throttling import throttle
 from .forms import RegistrationForm
 
 # Create your views here.
+@query_budget(9)
+@throttle('login')
 def login_view(request):
     # Préparer le contexte pour le template
     context = {}
@@ -41,6 +45,7 @@ def login_view(request):
     # Afficher le formulaire de connexion
     return render(request, 'registration/login.html', context)
     
+@query_budget(4)
 def logout_view(request):
     # Déconnecter l'utilisateur, quelle que soit la méthode HTTP
     logout(request)
@@ -48,6 +53,8 @@ def logout_view(request):
     messages.success(request, 'You have been successfully logged out')
     return redirect('post_list')
 
+@query_budget(11)
+@throttle('register')
 def register_view(request):
     # Rediriger si l'utilisateur est déjà connecté
     if request.user.is_authenticated:
@@ -0,0 +1,99 @@
+"""
+Écritures différées de l'authentification : last_login (à chaque
+connexion) et prolongation de l'expiration des sessions inchangées
+(SESSION_SAVE_EVERY_REQUEST) sont gardés en mémoire du processus puis
+écrits en lot, à la fin d'une requête, toutes les AUTH_FLUSH_INTERVAL
+secondes ou dès AUTH_FLUSH_MAX_PENDING entrées en attente.
+
+Ces valeurs sont indicatives : un arrêt du processus perd au plus un
+intervalle d'écritures, jamais une session ni un mot de passe. Les
+utilisateurs en cache (accounts.backends) ne sont pas invalidés : leur
+last_login peut retarder de AUTH_USER_CACHE_TIMEOUT secondes.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.signals import request_finished
+from django.db import transaction
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_logins = {}    # user_id -> dernière connexion
+_touches = {}   # clé de session -> nouvelle expiration
+_flushed_at = time.monotonic()
+
+
+def _record(pending, key, value):
+    with _lock:
+        pending[key] = value
+
+
+def record_login(user_id, when):
+    _record(_logins, user_id, when)
+
+
+def record_touch(session_key, expire_date):
+    _record(_touches, session_key, expire_date)
+
+
+def pending():
+    return len(_logins) + len(_touches)
+
+
+def due():
+    if not pending():
+        return False
+    interval = getattr(settings, 'AUTH_FLUSH_INTERVAL', 0) or 0
+    return (time.monotonic() - _flushed_at >= interval
+            or pending() >= getattr(settings, 'AUTH_FLUSH_MAX_PENDING', 500))
+
+
+def flush():
+    """
+    Écrit les entrées en attente : un UPDATE groupé (CASE) pour
+    last_login, un autre pour expire_date. Retourne le nombre d'entrées
+    écrites.
+    """
+    global _logins, _touches, _flushed_at
+    with _lock:
+        logins, touches = _logins, _touches
+        _logins, _touches, _flushed_at = {}, {}, time.monotonic()
+    if not logins and not touches:
+        return 0
+    try:
+        with transaction.atomic():
+            if logins:
+                User.objects.bulk_update(
+                    [User(pk=user_id, last_login=when) for user_id, when in logins.items()],
+                    ['last_login'], batch_size=500,
+                )
+            if touches:
+                Session.objects.bulk_update(
+                    [Session(session_key=key, expire_date=when) for key, when in touches.items()],
+                    ['expire_date'], batch_size=500,
+                )
+    except Exception:
+        # Remettre les entrées sans écraser celles arrivées entre-temps
+        with _lock:
+            for user_id, when in logins.items():
+                _logins.setdefault(user_id, when)
+            for key, when in touches.items():
+                _touches.setdefault(key, when)
+        raise
+    return len(logins) + len(touches)
+
+
+@receiver(request_finished)
+def flush_if_due(**kwargs):
+    # Après l'envoi de la réponse : le client n'attend pas l'écriture
+    if due():
+        try:
+            flush()
+        except Exception:
+            logger.exception("Échec de l'écriture différée de l'authentification")
@@ -0,0 +1,77 @@
+import random
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.conf import settings
+
+PRIMARY = 'default'
+
+# Applications toujours lues sur la base principale : une session créée
+# à la connexion doit être relue immédiatement, sans retard de réplication
+PRIMARY_ONLY_APPS = {'sessions'}
+
+
+@dataclass
+class RoutingState:
+    """
+    État de routage de la requête en cours : `pinned` force les lectures
+    sur la base principale, `wrote` indique qu'une écriture a eu lieu
+    """
+    pinned: bool = False
+    wrote: bool = False
+
+
+_routing_state = ContextVar('routing_state', default=None)
+
+
+def begin_request(pinned=False):
+    return _routing_state.set(RoutingState(pinned=pinned))
+
+
+def end_request(token):
+    state = _routing_state.get()
+    _routing_state.reset(token)
+    return state
+
+
+def replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def reads_pinned():
+    """
+    Vrai si les lectures de la requête en cours sont épinglées sur la
+    base principale alors que des réplicas existent
+    """
+    state = _routing_state.get()
+    return bool(replicas()) and state is not None and state.pinned
+
+
+class PrimaryReplicaRouter:
+    """
+    Écritures sur la base principale, lectures réparties sur les réplicas
+    de DATABASE_REPLICAS. Après une écriture, les lectures de la requête
+    restent sur la principale ; ReadYourWritesMiddleware prolonge cet
+    épinglage pour les requêtes suivantes du même client.
+    """
+    def db_for_read(self, model, **hints):
+        aliases = replicas()
+        state = _routing_state.get()
+        if not aliases or (state is not None and state.pinned):
+            return PRIMARY
+        if model._meta.app_label in PRIMARY_ONLY_APPS:
+            return PRIMARY
+        return random.choice(aliases)
+
+    def db_for_write(self, model, **hints):
+        state = _routing_state.get()
+        if state is not None:
+            state.pinned = state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Principale et réplicas contiennent les mêmes données
+        databases = {PRIMARY, *replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
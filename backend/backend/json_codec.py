@@ -0,0 +1,60 @@
+"""
+Encodage et décodage JSON partagés par l'API DRF et les vues JsonResponse
+(accounts) : orjson s'il est installé, sinon la bibliothèque standard.
+Dans les deux cas, le JSON produit est celui du JSONRenderer de DRF
+(compact, UTF-8, U+2028/U+2029 échappés).
+"""
+import json
+
+from django.http import HttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Types non natifs (Decimal, chaînes traduites, QuerySet...) et dates :
+# même conversion que l'encodeur de DRF
+_default = JSONEncoder().default
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def dumps(data):
+    """
+    Sérialise `data` en JSON (bytes UTF-8)
+    """
+    if orjson is None:
+        content = json.dumps(data, cls=JSONEncoder, ensure_ascii=False, allow_nan=False, separators=(',', ':'))
+        content = content.encode()
+    else:
+        content = orjson.dumps(data, default=_default, option=_ORJSON_OPTIONS)
+    # Séparateurs de ligne JavaScript, échappés comme le fait DRF
+    if b'\xe2\x80' in content:
+        content = content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+    return content
+
+
+def loads(content):
+    """
+    Décode un document JSON (bytes ou str) ; lève ValueError s'il est invalide
+    """
+    if orjson is None:
+        return json.loads(content)
+    return orjson.loads(content)
+
+
+def read_json(request):
+    """
+    Corps JSON d'une requête Django ; lève ValueError s'il est invalide
+    """
+    return loads(request.body)
+
+
+def json_response(data, status=200, headers=None):
+    """
+    Remplaçant de JsonResponse, encodé avec dumps()
+    """
+    return HttpResponse(dumps(data), status=status, headers=headers, content_type='application/json')
@@ -0,0 +1,175 @@
+"""
+Journalisation non bloquante, configurée par LOGGING (settings) :
+
+- BackgroundHandler : le thread de la requête ne fait que déposer
+  l'enregistrement dans une file ; un thread (QueueListener) le formate
+  et l'écrit. File pleine : l'enregistrement est abandonné et compté,
+  la requête n'attend jamais l'écriture.
+- JSONFormatter : une ligne JSON compacte par enregistrement, champs
+  `extra` compris.
+- RedactFilter : masque les champs sensibles (mots de passe, jetons...)
+  passés en `extra`.
+- SampleFilter : ne garde qu'une fraction des lignes INFO/DEBUG des
+  loggers très bavards.
+
+    logger.info('login', extra={'event': 'login', 'outcome': 'success', 'username': username})
+"""
+import atexit
+import copy
+import logging
+import queue
+import sys
+import threading
+from itertools import count
+from logging.handlers import QueueHandler, QueueListener
+
+from backend.json_codec import dumps
+
+# Attributs d'un LogRecord : tout le reste vient de `extra`
+RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+SENSITIVE_FIELDS = frozenset({
+    'password', 'password1', 'password2', 'old_password', 'new_password',
+    'token', 'access', 'refresh', 'secret', 'authorization', 'cookie', 'sessionid',
+    'csrfmiddlewaretoken', 'body',
+})
+REDACTED = '[masqué]'
+
+
+def extra_fields(record):
+    return {name: value for name, value in vars(record).items() if name not in RECORD_ATTRIBUTES}
+
+
+def redact(value):
+    """
+    Copie de `value` (dict, liste) avec les champs sensibles masqués
+    """
+    if isinstance(value, dict):
+        return {key: REDACTED if str(key).lower() in SENSITIVE_FIELDS else redact(item)
+                for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    return value
+
+
+class RedactFilter(logging.Filter):
+    def filter(self, record):
+        for name, value in extra_fields(record).items():
+            setattr(record, name, REDACTED if name.lower() in SENSITIVE_FIELDS else redact(value))
+        if isinstance(record.args, dict):
+            record.args = redact(record.args)
+        return True
+
+
+class SampleFilter(logging.Filter):
+    """
+    Garde un enregistrement sur round(1 / taux) pour les loggers de
+    `rates` ({préfixe de logger: taux}) jusqu'au niveau `max_level` ;
+    les niveaux supérieurs passent toujours
+    """
+    def __init__(self, rates=None, max_level='INFO'):
+        super().__init__()
+        self.every = {name: max(1, round(1 / rate)) for name, rate in (rates or {}).items() if rate > 0}
+        self.muted = {name for name, rate in (rates or {}).items() if rate <= 0}
+        self.max_level = logging.getLevelName(max_level) if isinstance(max_level, str) else max_level
+        # Préfixe le plus long d'abord : 'accounts.api' avant 'accounts'
+        self.prefixes = sorted(self.every.keys() | self.muted, key=len, reverse=True)
+        self.counters = {}
+
+    def _prefix(self, name):
+        for prefix in self.prefixes:
+            if name == prefix or name.startswith(prefix + '.'):
+                return prefix
+        return None
+
+    def filter(self, record):
+        if record.levelno > self.max_level:
+            return True
+        prefix = self._prefix(record.name)
+        if prefix is None:
+            return True
+        if prefix in self.muted:
+            return False
+        counter = self.counters.get(prefix) or self.counters.setdefault(prefix, count())
+        # next() sur itertools.count est atomique sous le GIL
+        return next(counter) % self.every[prefix] == 0
+
+
+def plain(value):
+    """
+    Valeur `extra` réduite aux types JSON ; le reste par str(). Pas
+    d'encodeur générique : il itérerait un HttpRequest (extra de
+    django.request) et écrirait son corps, mot de passe compris.
+    """
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, dict):
+        return {str(key): plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [plain(item) for item in value]
+    return str(value)
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        data = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        data.update((name, plain(value)) for name, value in extra_fields(record).items())
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data['exc'] = record.exc_text
+        return dumps(data).decode()
+
+
+class BackgroundHandler(QueueHandler):
+    """
+    Handler à placer dans LOGGING : écrit sur stderr ou dans `filename`
+    depuis un thread dédié. Le formatage (JSON, traceback) a lieu dans ce
+    thread ; seul le message est résolu à l'appel, pour figer ses arguments.
+    """
+    def __init__(self, filename=None, max_queue=10000):
+        super().__init__(queue.Queue(max_queue))
+        self.target = logging.FileHandler(filename, encoding='utf-8') if filename else logging.StreamHandler(sys.stderr)
+        self.dropped = 0
+        self._lock_dropped = threading.Lock()
+        self.listener = QueueListener(self.queue, self.target)
+        self.listener.start()
+        atexit.register(self.close)
+
+    def setFormatter(self, fmt):
+        super().setFormatter(fmt)
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Copie : les handlers suivants (mail_admins...) gardent la traceback
+        record = copy.copy(record)
+        record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            # La traceback ne doit pas survivre à la requête (références aux frames)
+            record.exc_text = (self.target.formatter or logging.Formatter()).formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock_dropped:
+                self.dropped += 1
+
+    def flush(self):
+        # Attend que le thread ait écrit tout ce qui est en file
+        if self.listener._thread is not None:
+            self.queue.join()
+        self.target.flush()
+
+    def close(self):
+        if self.listener._thread is not None:
+            self.listener.stop()
+        self.target.close()
+        super().close()
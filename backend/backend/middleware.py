@@ -1,46 +1,141 @@
 import re
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
 
-class CSRFExemptMiddleware:
+from base.query_budget import check_budget, enforce, get_budget, start_recording, stop_recording
+
+from .db_router import begin_request, end_request, replicas
+
+class HybridMiddleware:
     """
-    Middleware pour exempter certaines routes de la vérification CSRF.
-    Particulièrement utile pour les API utilisées par React.
+    Base des middlewares du projet, utilisables en WSGI comme en ASGI :
+    sous ASGI, les vues asynchrones (base.async_api) ne repassent pas par
+    un thread à cause d'un middleware uniquement synchrone.
+    Les sous-classes implémentent process_request et/ou process_response.
     """
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
-        # Compiler les expressions régulières une seule fois à l'initialisation
-        self.exempt_urls = [
-            re.compile(r'^/accounts/api/'),
-            re.compile(r'^/api/'),
-        ]
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def process_request(self, request):
+        pass
+
+    def process_response(self, request, response):
+        return response
 
     def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        self.process_request(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        self.process_request(request)
+        return self.process_response(request, await self.get_response(request))
+
+class CSRFExemptMiddleware(HybridMiddleware):
+    """
+    Middleware pour exempter certaines routes de la vérification CSRF.
+    Particulièrement utile pour les API utilisées par React.
+    """
+    # Expressions régulières compilées une seule fois
+    exempt_urls = [
+        re.compile(r'^/accounts/api/'),
+        re.compile(r'^/api/'),
+    ]
+
+    def process_request(self, request):
         # Vérifie si l'URL demandée correspond à l'une des routes exemptées
         path = request.path_info.lstrip('/')
-        
+
         # Exemption CSRF pour les API (React en développement et production)
         if request.path.startswith('/api/') or any(m.match(path) for m in self.exempt_urls):
             setattr(request, '_dont_enforce_csrf_checks', True)
-        
-        response = self.get_response(request)
-        
+
+    def process_response(self, request, response):
         # Ajouter des en-têtes CORS supplémentaires pour React en développement
         if request.path.startswith('/api/'):
             response["Access-Control-Allow-Origin"] = "http://localhost:3000"
             response["Access-Control-Allow-Credentials"] = "true"
             response["Access-Control-Allow-Headers"] = "Content-Type, Authorization"
-        
+
         return response
 
-class ReactDevProxyMiddleware:
+class ReactDevProxyMiddleware(HybridMiddleware):
     """
     Middleware pour faciliter le développement avec React sur localhost:3000
     """
-    def __init__(self, get_response):
-        self.get_response = get_response
+    def process_response(self, request, response):
+        # En développement uniquement, désactiver le cache pour le hot reload React.
+        # Les vues qui définissent leur propre politique (ETag, 304...) sont respectées.
+        if settings.DEBUG and not response.has_header("Cache-Control"):
+            response["Cache-Control"] = "no-cache, no-store, must-revalidate"
+        return response
 
-    def __call__(self, request):
-        response = self.get_response(request)
-        
-        # Ajouter les headers pour le hot reload React
-        response["Cache-Control"] = "no-cache, no-store, must-revalidate"
+
+class ReadYourWritesMiddleware(HybridMiddleware):
+    """
+    Garde les lectures d'un client sur la base principale pendant
+    READ_YOUR_WRITES_WINDOW secondes après l'une de ses écritures (like,
+    commentaire, inscription...), le temps que les réplicas rattrapent
+    leur retard. L'échéance est portée par un cookie.
+    """
+    unsafe_methods = {'POST', 'PUT', 'PATCH', 'DELETE'}
+
+    def process_request(self, request):
+        request._routing_token = None
+        if not replicas():
+            return
+        try:
+            pinned_until = float(request.COOKIES.get(settings.READ_YOUR_WRITES_COOKIE, 0))
+        except ValueError:
+            pinned_until = 0
+        # Une requête d'écriture lit aussi sur la principale ce qu'elle va modifier
+        pinned = request.method in self.unsafe_methods or pinned_until > time.time()
+        request._routing_token = begin_request(pinned=pinned)
+
+    def process_response(self, request, response):
+        if request._routing_token is None:
+            return response
+        state = end_request(request._routing_token)
+        if state.wrote:
+            window = settings.READ_YOUR_WRITES_WINDOW
+            response.set_cookie(
+                settings.READ_YOUR_WRITES_COOKIE, str(time.time() + window),
+                max_age=window, httponly=True, samesite='Lax'
+            )
+        return response
+
+
+class QueryBudgetMiddleware(HybridMiddleware):
+    """
+    Compte les requêtes SQL de chaque requête HTTP (nombre, durée, formes
+    répétées), les expose dans les en-têtes X-Query-Count et Server-Timing
+    et les compare au budget de la vue (base.query_budget). Actif seulement
+    si QUERY_BUDGET_ENABLED (développement, tests).
+    """
+    def process_request(self, request):
+        request._query_recording = None
+        if settings.QUERY_BUDGET_ENABLED:
+            request._query_recording = start_recording()
+            request._query_budget = None
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request._query_recording is not None:
+            request._query_budget = get_budget(view_func, request)
+
+    def process_response(self, request, response):
+        if getattr(request, '_query_recording', None) is None:
+            return response
+        stats, token = request._query_recording
+        stop_recording(token)
+        response['X-Query-Count'] = str(stats.count)
+        response['Server-Timing'] = f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries"'
+        enforce(check_budget(stats, request._query_budget, f'{request.method} {request.path}'))
         return response
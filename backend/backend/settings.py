@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 import os
+from importlib.util import find_spec
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -49,6 +50,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'backend.middleware.QueryBudgetMiddleware',  # Budget de requêtes SQL par endpoint (développement)
+    'django.middleware.http.ConditionalGetMiddleware',  # ETag/304 pour les réponses sans validateurs propres
+    'backend.middleware.ReadYourWritesMiddleware',  # Lectures sur la base principale après une écriture
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # Middleware CORS avant CommonMiddleware
     'django.middleware.common.CommonMiddleware',
@@ -105,6 +109,153 @@ DATABASES = {
     }
  }
 
+# Réplicas en lecture : déclarer chaque alias dans DATABASES puis dans
+# DATABASE_REPLICAS ; les écritures restent sur 'default' (backend.db_router)
+DATABASE_REPLICAS = []
+DATABASE_ROUTERS = ['backend.db_router.PrimaryReplicaRouter']
+
+# Après une écriture, le client lit sur la base principale pendant ce délai (secondes)
+READ_YOUR_WRITES_WINDOW = 5
+READ_YOUR_WRITES_COOKIE = 'primary_until'
+
+# Moteur de recherche des posts : index FULLTEXT sous MySQL,
+# index inversé en mémoire pour SQLite et les tests
+if DATABASES['default']['ENGINE'] == 'django.db.backends.mysql':
+    SEARCH_BACKEND = 'base.search.MySQLFulltextSearchBackend'
+else:
+    SEARCH_BACKEND = 'base.search.InMemorySearchBackend'
+
+
+# Cache : mémoire locale par défaut, remplaçable par Redis/Memcached en production
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'projet-python',
+    }
+}
+# Vrai dès que le cache par défaut est partagé entre processus (Redis,
+# Memcached) : condition des sessions et utilisateurs servis depuis le cache
+SHARED_CACHE = CACHES['default']['BACKEND'] not in (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+# Cache des réponses des endpoints publics de lecture (base.response_cache)
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = 300
+
+# Écriture différée des likes (désactivée par défaut) : les likes/unlikes sont
+# regroupés dans un tampon puis écrits en lot (base.like_buffer)
+LIKES_WRITE_BEHIND = False
+LIKES_BUFFER_BACKEND = 'base.like_buffer.LocalLikeBuffer'  # ou 'base.like_buffer.CacheLikeBuffer'
+LIKES_BUFFER_CACHE_ALIAS = 'default'
+LIKES_FLUSH_INTERVAL = 2  # secondes ; None pour ne vider que via `manage.py flush_likes`
+LIKES_FLUSH_MAX_PENDING = 500
+
+# Nombre de commentaires intégrés au détail d'un post (API et template) ;
+# les suivants se lisent sur /api/posts/<slug>/comments/ (pagination par curseur)
+COMMENTS_EMBED_LIMIT = 10
+
+# Vues asynchrones (base.async_api) : les lectures indépendantes d'une requête
+# s'exécutent chacune dans un thread du pool, sur sa propre connexion, et se
+# chevauchent en base ; False pour les garder sur le thread unique des appels
+# thread_sensitive (une connexion par requête, mais lectures en série)
+ASYNC_PARALLEL_READS = True
+
+# Stats du tableau de bord d'administration (base.stats) : la ligne SiteStats
+# est recalculée entièrement quand elle a plus de ADMIN_STATS_MAX_AGE secondes
+# (ou par `manage.py recompute_stats` depuis un cron) ; None pour désactiver
+ADMIN_STATS_MAX_AGE = 3600
+# Les deltas des écritures (signaux, likes) s'accumulent en mémoire du
+# processus et sont écrits dans la ligne SiteStats en fin de requête, au
+# plus une fois toutes les ADMIN_STATS_FLUSH_INTERVAL secondes
+ADMIN_STATS_FLUSH_INTERVAL = 5
+
+# Budget de requêtes SQL par endpoint (base.query_budget, QueryBudgetMiddleware) :
+# nombre, durée et requêtes répétées de chaque requête HTTP, en développement
+QUERY_BUDGET_ENABLED = DEBUG
+# 'warn' (log + QueryBudgetWarning) ou 'raise' (QueryBudgetExceeded, pour les tests)
+QUERY_BUDGET_MODE = 'warn'
+# Une même forme de requête exécutée autant de fois signale un N+1
+QUERY_BUDGET_DUPLICATES = 5
+
+# Limitation de débit des endpoints d'écriture et d'authentification
+# (base.throttling) : seaux à jetons par utilisateur ('user') et par IP ('ip'),
+# au format 'nombre/période' (s, min, hour, day) ; au-delà, 429 + Retry-After
+THROTTLE_ENABLED = True
+THROTTLE_BACKEND = 'base.throttling.CacheTokenBuckets'  # ou 'base.throttling.LocalTokenBuckets'
+THROTTLE_CACHE_ALIAS = 'default'
+THROTTLE_RATES = {
+    # Endpoints bon marché : limites larges
+    'like': {'user': '120/min', 'ip': '600/min'},
+    'comment': {'user': '20/min', 'ip': '120/min'},
+    # Endpoints qui hachent un mot de passe (PBKDF2) : limites strictes
+    'login': {'ip': '10/min'},
+    'register': {'ip': '5/min'},
+    # Rafraîchissement des jetons signés
+    'token': {'ip': '30/min'},
+}
+# Nombre de mandataires de confiance (X-Forwarded-For) devant Django
+THROTTLE_NUM_PROXIES = 0
+
+# Avec un cache partagé : sessions en cache avec écriture immédiate en base
+# (accounts.sessions), une session inchangée n'étant pas réécrite, et
+# request.user servi depuis le cache (accounts.backends) au lieu d'une lecture
+# de auth_user par requête. Sans cache partagé, sessions en base et
+# ModelBackend : une déconnexion doit être vue par tous les workers
+# (AccountsConfig.ready refuse un alias de cache propre au processus)
+SESSION_CACHE_ALIAS = 'default'
+AUTH_USER_CACHE_ALIAS = 'default'
+if SHARED_CACHE:
+    SESSION_ENGINE = 'accounts.sessions'
+    AUTHENTICATION_BACKENDS = ['accounts.backends.CachedModelBackend']
+else:
+    SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+    AUTHENTICATION_BACKENDS = ['django.contrib.auth.backends.ModelBackend']
+AUTH_USER_CACHE_TIMEOUT = 300
+# last_login et prolongation des sessions écrits en lot (accounts.write_behind),
+# en fin de requête, toutes les AUTH_FLUSH_INTERVAL secondes ou dès
+# AUTH_FLUSH_MAX_PENDING entrées en attente
+AUTH_FLUSH_INTERVAL = 30
+AUTH_FLUSH_MAX_PENDING = 500
+
+# Jetons signés du client React (accounts.tokens) : accès court vérifié sans
+# requête SQL, rafraîchissement à usage unique ; durées en secondes. Actifs
+# seulement avec un cache partagé, qui porte la liste de révocation (sans lui,
+# un jeton révoqué ou consommé par un worker resterait valide dans les autres)
+TOKEN_AUTH_ENABLED = SHARED_CACHE
+TOKEN_ACCESS_LIFETIME = 300
+TOKEN_REFRESH_LIFETIME = 7 * 24 * 3600
+# Cache de la liste de révocation (AccountsConfig.ready refuse un cache par processus)
+TOKEN_CACHE_ALIAS = 'default'
+
+# Journalisation (backend.log) : lignes JSON formatées et écrites par un thread
+# dédié, champs sensibles masqués ; les lignes INFO des loggers de
+# LOG_SAMPLE_RATES ne sont gardées qu'en proportion du taux (1 = toutes)
+LOG_LEVEL = 'INFO'
+LOG_FILE = None  # None : stderr
+LOG_SAMPLE_RATES = {'accounts': 0.1}
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {'()': 'backend.log.JSONFormatter'},
+    },
+    'filters': {
+        'sample': {'()': 'backend.log.SampleFilter', 'rates': LOG_SAMPLE_RATES},
+        'redact': {'()': 'backend.log.RedactFilter'},
+    },
+    'handlers': {
+        'background': {
+            'class': 'backend.log.BackgroundHandler',
+            'filename': LOG_FILE,
+            'formatter': 'json',
+            'filters': ['sample', 'redact'],
+        },
+    },
+    'root': {'handlers': ['background'], 'level': LOG_LEVEL},
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -177,15 +328,38 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
+        # Jeton Bearer d'abord : la session n'est pas lue quand il est présent
+        'accounts.tokens.SignedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
+    # Pagination par curseur (keyset) : coût constant quelle que soit la page
+    'DEFAULT_PAGINATION_CLASS': 'base.pagination.KeysetPagination',
+    'PAGE_SIZE': 20,
+    # JSON encodé/décodé par orjson (repli sur la bibliothèque standard)
+    'DEFAULT_RENDERER_CLASSES': [
+        'backend.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'backend.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
+# MessagePack pour les consommateurs internes : uniquement sur demande
+# (Accept: application/msgpack ou ?format=msgpack), si msgpack est installé
+if find_spec('msgpack') is not None:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append('backend.renderers.MessagePackRenderer')
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'].append('backend.renderers.MessagePackParser')
+
 # Configuration CORS pour permettre à React de communiquer avec l'API
 CORS_ALLOW_ALL_ORIGINS = True  # En développement uniquement, à restreindre en production
 CORS_ALLOW_CREDENTIALS = True
 CORS_ALLOW_METHODS = ['GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS']
 CORS_ALLOW_HEADERS = ['Content-Type', 'X-Requested-With', 'Authorization']
+# En-tête du total optionnel renvoyé par la pagination (?with_count=1)
+CORS_EXPOSE_HEADERS = ['X-Total-Count']
 
 # Liste des origins autorisées pour le CORS - prioritaires si CORS_ALLOW_ALL_ORIGINS=False
 CORS_ALLOWED_ORIGINS = [
@@ -0,0 +1,30 @@
+"""
+Profil de benchmark : base SQLite locale (bench.sqlite3), sans DEBUG.
+
+    python manage.py migrate --settings=backend.settings_bench
+    python manage.py seed_data --settings=backend.settings_bench
+    python manage.py bench_endpoints --settings=backend.settings_bench
+"""
+from .settings import *  # noqa: F401,F403
+
+DEBUG = False
+ALLOWED_HOSTS = ['localhost', '127.0.0.1']
+
+# WAL : les lectures des clients simultanés ne bloquent pas sur une écriture ;
+# les transactions prennent le verrou d'écriture dès le début (pas d'échec
+# « database is locked » en cours de transaction)
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'bench.sqlite3',
+        'OPTIONS': {
+            'timeout': 30,
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
+        },
+    }
+}
+SEARCH_BACKEND = 'base.search.InMemorySearchBackend'
+
+# Le banc compte lui-même les requêtes SQL
+QUERY_BUDGET_ENABLED = False
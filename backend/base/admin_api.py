@@ -3,19 +3,26 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from django.contrib.auth.models import User
+from django.db import transaction
 from .models import Post, Comment, Likes
 from .serializers import PostSerializer, UserSerializer
+from .response_cache import cache_stats
+from .stats import STATS_FIELDS, get_stats
+from .export import ExportMixin
+from .fieldsets import Fieldset, SparseFieldsetMixin, SparseFieldsetViewMixin, narrow_queryset
+from .query_budget import query_budget
+from .pagination import PostPagination, CommentPagination, LikesPagination, UserPagination, paginate
 from django.utils.text import slugify
 
 # Serializers pour l'administration
 from rest_framework import serializers
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = '__all__'
 
-class LikesSerializer(serializers.ModelSerializer):
+class LikesSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     username = serializers.CharField(source='user.username', read_only=True)
     post_title = serializers.CharField(source='post.title', read_only=True)
     
@@ -23,80 +30,107 @@ class LikesSerializer(serializers.ModelSerializer):
         model = Likes
         fields = ['id', 'user', 'post', 'created_at', 'username', 'post_title']
 
-class PostAdminSerializer(serializers.ModelSerializer):
-    comments_count = serializers.SerializerMethodField()
-    likes_count = serializers.SerializerMethodField()
+class PostAdminSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    # Compteurs dénormalisés, maintenus par les signaux
+    comments_count = serializers.IntegerField(read_only=True)
+    likes_count = serializers.IntegerField(read_only=True)
     author_username = serializers.CharField(source='author.username', read_only=True)
     
     class Meta:
         model = Post
         fields = ['id', 'title', 'slug', 'body', 'created', 'updated', 'status', 
                  'publish', 'author', 'author_username', 'comments_count', 'likes_count']
-    
-    def get_comments_count(self, obj):
-        return obj.comments.count()
-    
-    def get_likes_count(self, obj):
-        return obj.total_likes()
+
+class AtomicWriteMixin:
+    """
+    Exécute chaque écriture dans une transaction, avec la mise à jour
+    des compteurs déclenchée par les signaux
+    """
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            super().perform_create(serializer)
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            super().perform_update(serializer)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            super().perform_destroy(instance)
 
 # ViewSets pour l'administration
-class PostAdminViewSet(viewsets.ModelViewSet):
+class PostAdminViewSet(SparseFieldsetViewMixin, ExportMixin, AtomicWriteMixin, viewsets.ModelViewSet):
     """
     API endpoint pour l'administration des posts
     """
     permission_classes = [IsAdminUser]
-    queryset = Post.objects.all().order_by('-created')
+    queryset = Post.objects.select_related('author').order_by('-created')
     serializer_class = PostAdminSerializer
+    pagination_class = PostPagination
+    query_budgets = {'list': 3, 'retrieve': 3, 'export': 2, 'create': 7, 'update': 7, 'partial_update': 7, 'destroy': 10}
+    export_fields = ('id', 'title', 'slug', 'body', 'created', 'updated', 'status', 'publish',
+                     'author', ('author_username', 'author__username'), 'comments_count', 'likes_count')
     
     def perform_create(self, serializer):
         # Création du slug automatiquement si non fourni
         if not serializer.validated_data.get('slug'):
             title = serializer.validated_data.get('title', '')
             serializer.validated_data['slug'] = slugify(title)
-        serializer.save()
+        super().perform_create(serializer)
 
-class CommentAdminViewSet(viewsets.ModelViewSet):
+class CommentAdminViewSet(SparseFieldsetViewMixin, ExportMixin, AtomicWriteMixin, viewsets.ModelViewSet):
     """
     API endpoint pour l'administration des commentaires
     """
     permission_classes = [IsAdminUser]
     queryset = Comment.objects.all().order_by('-created')
     serializer_class = CommentSerializer
+    pagination_class = CommentPagination
+    query_budgets = {'list': 3, 'retrieve': 3, 'export': 2, 'create': 8, 'update': 8, 'partial_update': 8, 'destroy': 8}
+    export_fields = ('id', 'post', 'username', 'email', 'author', 'body', 'created', 'updated')
 
-class LikesAdminViewSet(viewsets.ModelViewSet):
+class LikesAdminViewSet(SparseFieldsetViewMixin, ExportMixin, AtomicWriteMixin, viewsets.ModelViewSet):
     """
     API endpoint pour l'administration des likes
     """
     permission_classes = [IsAdminUser]
-    queryset = Likes.objects.all().order_by('-created_at')
+    queryset = Likes.objects.select_related('user', 'post').order_by('-created_at')
     serializer_class = LikesSerializer
+    pagination_class = LikesPagination
+    query_budgets = {'list': 3, 'retrieve': 3, 'export': 2, 'create': 7, 'update': 7, 'partial_update': 7, 'destroy': 7}
+    export_fields = ('id', 'user', 'post', 'created_at',
+                     ('username', 'user__username'), ('post_title', 'post__title'))
 
-class UserAdminViewSet(viewsets.ModelViewSet):
+class UserAdminViewSet(SparseFieldsetViewMixin, ExportMixin, AtomicWriteMixin, viewsets.ModelViewSet):
     """
     API endpoint pour l'administration des utilisateurs
     """
     permission_classes = [IsAdminUser]
     queryset = User.objects.all()
     serializer_class = UserSerializer
+    pagination_class = UserPagination
+    query_budgets = {'list': 3, 'retrieve': 3, 'export': 2, 'create': 6, 'update': 6, 'partial_update': 6, 'destroy': 12}
+    # Jamais le mot de passe : seulement les colonnes utiles à l'analyse
+    export_fields = ('id', 'username', 'email', 'first_name', 'last_name',
+                     'is_active', 'is_staff', 'date_joined', 'last_login')
 
 # API pour obtenir des statistiques
+@query_budget(3)
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
 def admin_stats(request):
     """
-    Fournit des statistiques générales pour le tableau de bord d'administration
+    Fournit des statistiques générales pour le tableau de bord d'administration,
+    lues dans la ligne SiteStats maintenue par les signaux (une requête)
     """
-    stats = {
-        'users_count': User.objects.count(),
-        'posts_count': Post.objects.count(),
-        'comments_count': Comment.objects.count(),
-        'likes_count': Likes.objects.count(),
-        'published_posts': Post.objects.filter(status='published').count(),
-        'draft_posts': Post.objects.filter(status='draft').count(),
-    }
+    site_stats = get_stats()
+    stats = {field: getattr(site_stats, field) for field in STATS_FIELDS}
+    stats['recomputed_at'] = site_stats.recomputed_at
+    stats['response_cache'] = cache_stats()
     return Response(stats)
 
 # Filtrage des posts par statut
+@query_budget(3)
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
 def filter_posts(request):
@@ -105,8 +139,9 @@ def filter_posts(request):
     """
     status_param = request.query_params.get('status', None)
     if status_param and status_param in ['published', 'draft']:
-        posts = Post.objects.filter(status=status_param).order_by('-created')
-        serializer = PostAdminSerializer(posts, many=True)
-        return Response(serializer.data)
+        fieldset = Fieldset.from_request(request)
+        posts = Post.objects.filter(status=status_param).select_related('author').order_by('-created')
+        posts = narrow_queryset(posts, PostAdminSerializer, fieldset, PostPagination.ordering)
+        return paginate(request, posts, PostAdminSerializer, PostPagination, fieldset=fieldset)
     
     return Response({'error': 'Invalid status parameter'}, status=status.HTTP_400_BAD_REQUEST)
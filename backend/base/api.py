@@ -2,30 +2,110 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
+from django.db import transaction
+from django.db.models import Q
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from .models import Post, Likes, Comment
-from .serializers import PostSerializer, UserSerializer, LikeSerializer, CommentSerializer
+from .serializers import PostSerializer, CommentSerializer
+from .pagination import (
+    PostPagination, SearchPagination, CommentPagination, EmbeddedCommentPagination,
+    LikesPagination, UserPagination,
+)
+from .row_serializers import (
+    PostRowSerializer, CommentRowSerializer, LikeRowSerializer, UserRowSerializer, paginate_rows,
+)
+from .search import get_search_backend
+from .fieldsets import Fieldset, SparseFieldsetViewMixin
+from .response_cache import cache_response
+from .conditional import conditional, post_list_validators, post_validators
+from django.utils.decorators import method_decorator
+from .liked_set import liked_snapshot
+from . import like_service
+from .like_buffer import get_like_buffer, write_behind_enabled
+from .query_budget import query_budget
+from .throttling import throttle
 from django.contrib.auth.models import User
 
-class PostViewSet(viewsets.ReadOnlyModelViewSet):
+class PostViewSet(SparseFieldsetViewMixin, viewsets.ReadOnlyModelViewSet):
     """
     Endpoint pour lister et récupérer les posts
     """
-    queryset = Post.objects.all().order_by('-created')
+    queryset = Post.objects.select_related('author').order_by('-created')
     serializer_class = PostSerializer
+    pagination_class = PostPagination
     lookup_field = 'slug'
+    # Compteur ajouté au détail par retrieve(), hors PostSerializer
+    fieldset_columns = {'comments_count': 'comments_count'}
+    query_budgets = {'list': 6, 'retrieve': 5}
     
+    def get_search_query(self):
+        if self.action != 'list':
+            return ''
+        return self.request.query_params.get('search', '').strip()
+    
+    @property
+    def paginator(self):
+        # Les résultats de recherche sont paginés par pertinence
+        if not hasattr(self, '_paginator'):
+            self._paginator = SearchPagination() if self.get_search_query() else self.pagination_class()
+        return self._paginator
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        query = self.get_search_query()
+        if query:
+            queryset = get_search_backend().search(queryset, query)
+        return queryset
+    
+    @cache_response('posts')
+    @method_decorator(conditional(post_list_validators))
+    def list(self, request, *args, **kwargs):
+        # Lignes values() plutôt que des instances : même JSON, bien moins de CPU
+        fieldset = self.get_fieldset()
+        queryset = PostRowSerializer.rows(self.filter_queryset(self.get_queryset()), self.paginator.ordering, fieldset)
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(PostRowSerializer(page, many=True, fieldset=fieldset).data)
+    
+    @cache_response('post:{slug}')
+    @method_decorator(conditional(post_validators))
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
         serializer = self.get_serializer(instance)
         data = serializer.data
+        fieldset = self.get_fieldset()
         
-        # Ajouter les commentaires au post
-        comments = Comment.objects.filter(post=instance).order_by('-created')
-        comments_serializer = CommentSerializer(comments, many=True)
-        data['comments'] = comments_serializer.data
+        # Seulement les premiers commentaires, avec le lien vers la suite
+        # (aucune requête si le client ne les demande pas)
+        if fieldset is None or fieldset.includes('comments'):
+            comments_fieldset = fieldset.nested('comments') if fieldset else None
+            paginator = EmbeddedCommentPagination()
+            comments = paginator.paginate_queryset(
+                CommentRowSerializer.rows(post_comments_queryset(instance), paginator.ordering, comments_fieldset), request
+            )
+            data['comments'] = CommentRowSerializer(comments, many=True, fieldset=comments_fieldset).data
+            data['comments_next'] = embedded_comments_next(paginator, request, instance.slug)
+        if fieldset is None or fieldset.includes('comments_count'):
+            data['comments_count'] = instance.comments_count
         
         return Response(data)
 
+
+def post_comments_queryset(post):
+    # Ordre (-created, id) servi par l'index base_comment_post_created_idx
+    return Comment.objects.filter(post=post)
+
+
+def embedded_comments_next(paginator, request, slug, url_name='post-comments'):
+    """
+    Lien vers la page suivante des commentaires intégrés, sur l'endpoint
+    des commentaires plutôt que sur le détail du post
+    """
+    paginator.base_url = request.build_absolute_uri(reverse(url_name, args=[slug]))
+    return paginator.get_next_link()
+
+@query_budget(2)
 @api_view(['GET'])
 def api_overview(request):
     """
@@ -39,62 +119,64 @@ def api_overview(request):
     }
     return Response(api_urls)
 
+@query_budget(3)
 @api_view(['GET'])
 def user_list(request):
     """
     Liste tous les utilisateurs
     """
     users = User.objects.all()
-    serializer = UserSerializer(users, many=True)
-    return Response(serializer.data)
+    return paginate_rows(request, users, UserRowSerializer, UserPagination, Fieldset.from_request(request))
 
+@query_budget(3)
 @api_view(['GET'])
 def user_detail(request, pk):
     """
     Détail d'un utilisateur spécifique
     """
-    user = get_object_or_404(User, pk=pk)
-    serializer = UserSerializer(user)
-    return Response(serializer.data)
+    fieldset = Fieldset.from_request(request)
+    user = get_object_or_404(UserRowSerializer.rows(User.objects.all(), fieldset=fieldset), pk=pk)
+    return Response(UserRowSerializer(user, fieldset=fieldset).data)
 
+@query_budget(8)
+@throttle('like')
 @api_view(['POST', 'DELETE'])
 @permission_classes([permissions.IsAuthenticated])
 def toggle_like(request, slug):
     """
-    Ajouter ou supprimer un like sur un post
+    Ajouter (POST) ou supprimer (DELETE) un like sur un post.
+    Une seule instruction SQL pour le like, sans course possible entre deux clics.
     """
-    post = get_object_or_404(Post, slug=slug)
-    user = request.user
+    post = get_object_or_404(Post.objects.only('id', 'slug', 'likes_count'), slug=slug)
     
-    # Vérifier si l'utilisateur a déjà liké ce post
-    try:
-        like = Likes.objects.get(user=user, post=post)
-        # Si DELETE request, supprimer le like
-        if request.method == 'DELETE':
-            like.delete()
-            post.likes.remove(user)  # Gérer aussi le ManyToManyField
-            return Response({'status': 'like removed'}, status=status.HTTP_200_OK)
-        # Si POST request sur un like existant, ne rien faire
-        return Response({'status': 'already liked'}, status=status.HTTP_200_OK)
-    except Likes.DoesNotExist:
-        # Si POST request, créer un nouveau like
-        if request.method == 'POST':
-            Likes.objects.create(user=user, post=post)
-            post.likes.add(user)  # Gérer aussi le ManyToManyField
-            return Response({'status': 'like added'}, status=status.HTTP_201_CREATED)
-        # Si DELETE request sur un like inexistant, ne rien faire
-        return Response({'status': 'not liked'}, status=status.HTTP_200_OK)
+    if request.method == 'POST':
+        result = like_service.like(request.user, post)
+        label = 'like added' if result.changed else 'already liked'
+        code = status.HTTP_201_CREATED if result.changed else status.HTTP_200_OK
+    else:
+        result = like_service.unlike(request.user, post)
+        label = 'like removed' if result.changed else 'not liked'
+        code = status.HTTP_200_OK
+    
+    return Response({
+        'status': label,
+        'liked': result.liked,
+        'likes_count': result.likes_count,
+    }, status=code)
 
+@query_budget(5)
 @api_view(['GET'])
+@cache_response('post:{slug}')
+@conditional(post_validators)
 def post_likes(request, slug):
     """
     Liste tous les likes pour un post spécifique
     """
     post = get_object_or_404(Post, slug=slug)
     likes = Likes.objects.filter(post=post)
-    serializer = LikeSerializer(likes, many=True)
-    return Response(serializer.data)
+    return paginate_rows(request, likes, LikeRowSerializer, LikesPagination, Fieldset.from_request(request))
 
+@query_budget(3)
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def user_liked_posts(request):
@@ -102,31 +184,117 @@ def user_liked_posts(request):
     Liste tous les posts likés par l'utilisateur authentifié
     """
     likes = Likes.objects.filter(user=request.user)
-    serializer = LikeSerializer(likes, many=True)
-    return Response(serializer.data)
+    return paginate_rows(request, likes, LikeRowSerializer, LikesPagination, Fieldset.from_request(request))
 
+@query_budget(4)
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def check_like_status(request, slug):
     """
     Vérifie si l'utilisateur authentifié a liké un post spécifique
     """
-    post = get_object_or_404(Post, slug=slug)
-    liked = Likes.objects.filter(user=request.user, post=post).exists()
-    return Response({'liked': liked})
+    post = get_object_or_404(Post.objects.only('id'), slug=slug)
+    return Response({'liked': like_service.is_liked(request.user.pk, post.pk)})
+
+# Nombre maximal de posts par requête de statut groupée
+LIKE_STATUS_BATCH_LIMIT = 100
+
+def _batch_values(request, name):
+    # Accepte ?slugs=a,b,c en GET ou {"slugs": [...]} en POST
+    if request.method == 'POST':
+        values = request.data.get(name) or []
+        if isinstance(values, str):
+            values = values.split(',')
+    else:
+        values = request.query_params.get(name, '').split(',')
+    return [str(value).strip() for value in values if str(value).strip()]
 
+def _overlay_pending(user_id, liked, slugs):
+    # Mode écriture différée : appliquer les intentions pas encore écrites en base
+    if not write_behind_enabled():
+        return liked
+    pending = get_like_buffer().pending_for_user(user_id)
+    if not pending:
+        return liked
+    slug_by_id = dict(Post.objects.filter(pk__in=pending).values_list('id', 'slug')) if slugs else {}
+    for post_id, is_liked in pending.items():
+        keys = {post_id, slug_by_id.get(post_id)} - {None}
+        if is_liked:
+            liked |= keys
+        else:
+            liked -= keys
+    return liked
+
+@query_budget(3)
+@api_view(['GET', 'POST'])
+@permission_classes([permissions.IsAuthenticated])
+def batch_like_status(request):
+    """
+    Vérifie en une seule requête SQL (IN) si l'utilisateur a liké plusieurs posts,
+    identifiés par slug (slugs) et/ou par id (ids)
+    """
+    slugs = _batch_values(request, 'slugs')
+    try:
+        ids = [int(value) for value in _batch_values(request, 'ids')]
+    except ValueError:
+        return Response({'detail': 'Les ids doivent être des entiers.'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(slugs) + len(ids) > LIKE_STATUS_BATCH_LIMIT:
+        return Response(
+            {'detail': f'{LIKE_STATUS_BATCH_LIMIT} posts maximum par requête.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    liked = set()
+    if slugs or ids:
+        rows = Likes.objects.filter(user=request.user).filter(
+            Q(post__slug__in=slugs) | Q(post_id__in=ids)
+        ).values_list('post_id', 'post__slug')
+        for post_id, slug in rows:
+            liked.update((post_id, slug))
+        liked = _overlay_pending(request.user.pk, liked, slugs)
+    
+    return Response({
+        'slugs': {slug: slug in liked for slug in slugs},
+        'ids': {post_id: post_id in liked for post_id in ids},
+    })
+
+@query_budget(3)
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def liked_post_ids(request):
+    """
+    Ensemble compact des ids de posts likés par l'utilisateur, avec un jeton de version.
+    Avec ?since=<version>, renvoie seulement les ajouts et suppressions depuis cette version.
+    """
+    return Response(liked_snapshot(request.user, since=request.query_params.get('since')))
+
+@query_budget(5)
 @api_view(['GET'])
+@cache_response('post:{slug}')
+@conditional(post_validators)
 def post_comments(request, slug):
     """
-    Liste tous les commentaires pour un post spécifique
+    Commentaires d'un post, du plus récent au plus ancien, paginés par curseur.
+    Avec ?since=<date ISO>, seulement les commentaires publiés après cette date
+    (pour interroger périodiquement les nouveaux commentaires).
     """
-    post = get_object_or_404(Post, slug=slug)
-    comments = Comment.objects.filter(post=post).order_by('-created')
-    serializer = CommentSerializer(comments, many=True)
-    return Response(serializer.data)
+    post = get_object_or_404(Post.objects.only('id'), slug=slug)
+    comments = post_comments_queryset(post)
+    since = request.query_params.get('since')
+    if since:
+        since = parse_datetime(since)
+        if since is None:
+            return Response({'error': 'Invalid since parameter'}, status=status.HTTP_400_BAD_REQUEST)
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        comments = comments.filter(created__gt=since)
+    return paginate_rows(request, comments, CommentRowSerializer, CommentPagination, Fieldset.from_request(request))
 
+@query_budget(9)
+@throttle('comment')
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
+@transaction.atomic
 def add_comment(request, slug):
     """
     Ajouter un commentaire à un post spécifique
@@ -148,8 +316,10 @@ def add_comment(request, slug):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+@query_budget(9)
 @api_view(['DELETE'])
 @permission_classes([permissions.IsAuthenticated])
+@transaction.atomic
 def delete_comment(request, comment_id):
     """
     Supprimer un commentaire
@@ -2,6 +2,7 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from . import api
 from . import admin_api
+from . import async_api
 
 # Configuration du router pour les viewsets standards
 router = DefaultRouter()
@@ -25,12 +26,21 @@ urlpatterns = [
     path('posts/<slug:slug>/toggle-like/', api.toggle_like, name='toggle-like'),
     path('posts/<slug:slug>/like-status/', api.check_like_status, name='check-like-status'),
     path('user/liked-posts/', api.user_liked_posts, name='user-liked-posts'),
+    path('user/like-status/', api.batch_like_status, name='batch-like-status'),
+    path('user/liked-post-ids/', api.liked_post_ids, name='liked-post-ids'),
     
     # Endpoints de commentaires
     path('posts/<slug:slug>/comments/', api.post_comments, name='post-comments'),
     path('posts/<slug:slug>/add-comment/', api.add_comment, name='add-comment'),
     path('comments/<int:comment_id>/', api.delete_comment, name='delete-comment'),
     
+    # Lectures asynchrones (ASGI), mêmes réponses que les endpoints ci-dessus
+    path('async/posts/', async_api.post_list, name='async-post-list'),
+    path('async/posts/<slug:slug>/', async_api.post_detail, name='async-post-detail'),
+    path('async/posts/<slug:slug>/comments/', async_api.post_comments, name='async-post-comments'),
+    path('async/posts/<slug:slug>/likes/', async_api.post_likes, name='async-post-likes'),
+    path('async/posts/<slug:slug>/like-status/', async_api.like_status, name='async-like-status'),
+    
     # Endpoints d'administration
     path('admin/', include(admin_router.urls)),
     path('admin/stats/', admin_api.admin_stats, name='admin-stats'),
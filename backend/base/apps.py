@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class BaseConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'base'
+
+    def ready(self):
+        # Connexion des signaux (compteurs dénormalisés, index de recherche)
+        from . import signals  # noqa: F401
+        # Comptage des requêtes SQL installé sur chaque connexion ouverte
+        from . import query_budget  # noqa: F401
@@ -0,0 +1,230 @@
+"""
+Versions asynchrones (ASGI) des lectures publiques de base.api : même
+authentification, mêmes corps JSON et mêmes curseurs de pagination, mais
+lecture via l'ORM asynchrone et requêtes indépendantes lancées ensemble.
+
+Les méthodes a*() de l'ORM de Django 5.2 passent toutes par l'unique
+thread des appels thread_sensitive : rassemblées par asyncio.gather, elles
+s'exécutent encore l'une après l'autre. Les lectures indépendantes passent
+donc par _read(), qui les exécute chacune dans un thread du pool, sur sa
+propre connexion (ASYNC_PARALLEL_READS).
+"""
+import asyncio
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from backend.json_codec import dumps
+
+from .api import embedded_comments_next
+from .fieldsets import Fieldset, narrow_queryset
+from .like_buffer import get_like_buffer, write_behind_enabled
+from .models import Post, Likes, Comment
+from .query_budget import query_budget
+from .pagination import (
+    PostPagination, SearchPagination, CommentPagination, EmbeddedCommentPagination, LikesPagination,
+)
+from .row_serializers import PostRowSerializer, CommentRowSerializer, LikeRowSerializer
+from .search import get_search_backend
+from .serializers import PostSerializer
+
+
+def _json(data, status_code=status.HTTP_200_OK):
+    return HttpResponse(dumps(data), status=status_code, content_type='application/json')
+
+
+def _not_found(model):
+    # Même message que get_object_or_404 via le gestionnaire d'erreurs de DRF
+    return _json({'detail': f'No {model._meta.object_name} matches the given query.'}, status.HTTP_404_NOT_FOUND)
+
+
+def _read(func, *args):
+    """
+    Attend la lecture ORM synchrone func(*args). Avec ASYNC_PARALLEL_READS,
+    elle s'exécute dans un thread du pool, sur la connexion de ce thread,
+    et se chevauche avec les autres lectures de asyncio.gather ; sinon sur
+    le thread des appels thread_sensitive, comme l'ORM asynchrone.
+    """
+    if not getattr(settings, 'ASYNC_PARALLEL_READS', False):
+        return sync_to_async(func)(*args)
+
+    def run():
+        try:
+            return func(*args)
+        finally:
+            # Comme en fin de requête : fermer la connexion du thread si
+            # CONN_MAX_AGE est dépassé (0 : après chaque lecture)
+            close_old_connections()
+    return sync_to_async(run, thread_sensitive=False)()
+
+
+def _authenticate(drf_request):
+    # Authentification DRF configurée (session...), la permission par défaut
+    # étant IsAuthenticated ; exécutée hors de la boucle car elle lit la session
+    user = drf_request.user
+    return user if user and user.is_authenticated else None
+
+
+def _denied(drf_request, detail):
+    # Comme APIView : 401 avec WWW-Authenticate si le premier authentificateur
+    # en fournit un (jeton Bearer présenté), 403 sinon
+    header = drf_request.authenticators[0].authenticate_header(drf_request) if drf_request.authenticators else None
+    if not header:
+        return _json({'detail': detail}, status.HTTP_403_FORBIDDEN)
+    response = _json({'detail': detail}, status.HTTP_401_UNAUTHORIZED)
+    response['WWW-Authenticate'] = header
+    return response
+
+
+def async_api_view(view):
+    """
+    Équivalent de @api_view(['GET']) pour une vue `async def` : authentifie
+    la requête, refuse les autres méthodes et rend le dict retourné en JSON
+    comme le renderer JSON de DRF (même contenu octet par octet)
+    """
+    @wraps(view)
+    async def wrapped(request, *args, **kwargs):
+        if request.method != 'GET':
+            return _json({'detail': f'Method "{request.method}" not allowed.'}, status.HTTP_405_METHOD_NOT_ALLOWED)
+        drf_request = Request(request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+        try:
+            user = await sync_to_async(_authenticate)(drf_request)
+        except exceptions.AuthenticationFailed as error:
+            return _denied(drf_request, error.detail)
+        if user is None:
+            return _denied(drf_request, exceptions.NotAuthenticated.default_detail)
+        result = await view(drf_request, *args, **kwargs)
+        return result if isinstance(result, HttpResponse) else _json(result)
+    return wrapped
+
+
+@query_budget(4)
+@async_api_view
+async def post_list(request):
+    """
+    Liste paginée des posts (comme GET /api/posts/, recherche comprise)
+    """
+    queryset = Post.objects.all()
+    query = request.query_params.get('search', '').strip()
+    if query:
+        # L'index de recherche se construit avec l'ORM synchrone
+        queryset = await sync_to_async(get_search_backend().search)(queryset, query)
+        paginator = SearchPagination()
+    else:
+        paginator = PostPagination()
+    fieldset = Fieldset.from_request(request)
+    page = await paginator.apaginate_queryset(PostRowSerializer.rows(queryset, paginator.ordering, fieldset), request)
+    data = paginator.get_paginated_data(PostRowSerializer(page, many=True, fieldset=fieldset).data)
+    if paginator.total_count is None:
+        return data
+    response = _json(data)
+    response[paginator.count_header] = str(paginator.total_count)
+    return response
+
+
+@query_budget(4)
+@async_api_view
+async def post_detail(request, slug):
+    """
+    Détail d'un post avec ses premiers commentaires : le post et les
+    commentaires sont lus par deux requêtes indépendantes, qui se
+    chevauchent en base avec ASYNC_PARALLEL_READS (voir _read)
+    """
+    fieldset = Fieldset.from_request(request)
+    with_comments = fieldset is None or fieldset.includes('comments')
+    with_count = fieldset is None or fieldset.includes('comments_count')
+    comments_fieldset = fieldset.nested('comments') if fieldset else None
+    posts = narrow_queryset(
+        Post.objects.select_related('author'), PostSerializer, fieldset, ['comments_count'] if with_count else []
+    )
+    paginator = EmbeddedCommentPagination()
+    reads = [_read(posts.filter(slug=slug).first)]
+    if with_comments:
+        rows = CommentRowSerializer.rows(_comments(slug), paginator.ordering, comments_fieldset)
+        reads.append(_read(paginator.paginate_queryset, rows, request))
+    post, *comments = await asyncio.gather(*reads)
+    if post is None:
+        return _not_found(Post)
+    data = PostSerializer(post, fieldset=fieldset).data
+    if with_comments:
+        data['comments'] = CommentRowSerializer(comments[0], many=True, fieldset=comments_fieldset).data
+        data['comments_next'] = embedded_comments_next(paginator, request, slug, 'async-post-comments')
+    if with_count:
+        data['comments_count'] = post.comments_count
+    return data
+
+
+@query_budget(4)
+@async_api_view
+async def post_comments(request, slug):
+    """
+    Commentaires paginés d'un post, ?since= compris
+    (comme GET /api/posts/<slug>/comments/)
+    """
+    fieldset = Fieldset.from_request(request)
+    comments = _comments(slug)
+    since = request.query_params.get('since')
+    if since:
+        since = parse_datetime(since)
+        if since is None:
+            return _json({'error': 'Invalid since parameter'}, status.HTTP_400_BAD_REQUEST)
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        comments = comments.filter(created__gt=since)
+    paginator = CommentPagination()
+    exists, page = await asyncio.gather(
+        _read(Post.objects.filter(slug=slug).exists),
+        _read(paginator.paginate_queryset, CommentRowSerializer.rows(comments, paginator.ordering, fieldset), request),
+    )
+    if not exists:
+        return _not_found(Post)
+    return paginator.get_paginated_data(CommentRowSerializer(page, many=True, fieldset=fieldset).data)
+
+
+@query_budget(4)
+@async_api_view
+async def post_likes(request, slug):
+    """
+    Likes paginés d'un post (comme GET /api/posts/<slug>/likes/)
+    """
+    paginator = LikesPagination()
+    fieldset = Fieldset.from_request(request)
+    likes = LikeRowSerializer.rows(Likes.objects.filter(post__slug=slug), paginator.ordering, fieldset)
+    exists, page = await asyncio.gather(
+        _read(Post.objects.filter(slug=slug).exists),
+        _read(paginator.paginate_queryset, likes, request),
+    )
+    if not exists:
+        return _not_found(Post)
+    return paginator.get_paginated_data(LikeRowSerializer(page, many=True, fieldset=fieldset).data)
+
+
+@query_budget(4)
+@async_api_view
+async def like_status(request, slug):
+    """
+    L'utilisateur a-t-il liké ce post ? (comme GET /api/posts/<slug>/like-status/)
+    """
+    post_id, liked = await asyncio.gather(
+        _read(Post.objects.filter(slug=slug).values_list('id', flat=True).first),
+        _read(Likes.objects.filter(user_id=request.user.pk, post__slug=slug).exists),
+    )
+    if post_id is None:
+        return _not_found(Post)
+    if write_behind_enabled():
+        pending = await sync_to_async(get_like_buffer().get)(request.user.pk, post_id)
+        if pending is not None:
+            liked = pending
+    return {'liked': liked}
+
+
+def _comments(slug):
+    return Comment.objects.filter(post__slug=slug)
@@ -0,0 +1,152 @@
+"""
+Banc de charge des endpoints réels (manage.py bench_endpoints) : chaque
+scénario est rejoué en processus à travers l'application WSGI complète
+(middlewares compris) par N clients simultanés. On mesure le débit, les
+latences p50/p95/p99 et le nombre de requêtes SQL par requête HTTP, puis
+on compare à un fichier de référence pour repérer les régressions.
+"""
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from django.core.wsgi import get_wsgi_application
+from django.utils.crypto import get_random_string
+
+from backend.json_codec import dumps
+
+from .query_budget import record_queries
+
+# (nom, méthode, chemin, corps JSON) ; {slug} parcourt les posts les plus
+# populaires, {word} des mots présents dans les posts, {username} et
+# {password} désignent l'utilisateur du banc
+SCENARIOS = [
+    ('api-overview', 'GET', '/api/', None),
+    ('post-list', 'GET', '/api/posts/', None),
+    ('post-search', 'GET', '/api/posts/?search={word}', None),
+    ('post-detail', 'GET', '/api/posts/{slug}/', None),
+    ('post-comments', 'GET', '/api/posts/{slug}/comments/', None),
+    ('post-likes', 'GET', '/api/posts/{slug}/likes/', None),
+    ('like-status', 'GET', '/api/posts/{slug}/like-status/', None),
+    ('batch-like-status', 'POST', '/api/user/like-status/', {'slugs': ['{slug}']}),
+    ('liked-posts', 'GET', '/api/user/liked-posts/', None),
+    ('liked-post-ids', 'GET', '/api/user/liked-post-ids/', None),
+    ('like', 'POST', '/api/posts/{slug}/toggle-like/', None),
+    ('unlike', 'DELETE', '/api/posts/{slug}/toggle-like/', None),
+    ('add-comment', 'POST', '/api/posts/{slug}/add-comment/', {'body': 'Commentaire du banc de charge'}),
+    ('user-list', 'GET', '/api/users/', None),
+    ('async-post-list', 'GET', '/api/async/posts/', None),
+    ('admin-posts', 'GET', '/api/admin/posts/', None),
+    ('admin-stats', 'GET', '/api/admin/stats/', None),
+    ('admin-filter-posts', 'GET', '/api/admin/filter-posts/?status=published', None),
+    ('blog-list', 'GET', '/blog/', None),
+    ('blog-detail', 'GET', '/blog/post/{slug}/', None),
+    ('blog-search', 'GET', '/blog/search/?q={word}', None),
+    ('current-user', 'GET', '/accounts/api/user/', None),
+    ('login', 'POST', '/accounts/api/login/', {'username': '{username}', 'password': '{password}'}),
+]
+
+# Scénarios joués sans la session du banc (une connexion la renouvellerait)
+ANONYMOUS = {'login'}
+
+
+def percentile(latencies, percent):
+    ordered = sorted(latencies)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+class Bench:
+    """
+    Client WSGI minimal partagé par les threads : session et jeton CSRF
+    fixes, une requête = un appel de l'application
+    """
+    def __init__(self, session_key, values):
+        self.app = get_wsgi_application()
+        self.values = values
+        self.csrf_token = get_random_string(32)
+        self.cookie = f'sessionid={session_key}; csrftoken={self.csrf_token}'
+
+    def _fill(self, text, index):
+        # replace() plutôt que format() : les corps JSON contiennent des accolades
+        for name, choices in self.values.items():
+            text = text.replace(f'{{{name}}}', str(choices[index % len(choices)]))
+        return text
+
+    def environ(self, method, path, data, index, anonymous=False):
+        url = urlsplit(self._fill(path, index))
+        body = self._fill(dumps(data).decode(), index).encode() if data is not None else b''
+        return {
+            'REQUEST_METHOD': method, 'PATH_INFO': url.path, 'QUERY_STRING': url.query,
+            'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'HTTP_HOST': 'localhost',
+            'HTTP_COOKIE': f'csrftoken={self.csrf_token}' if anonymous else self.cookie,
+            'HTTP_X_CSRFTOKEN': self.csrf_token,
+            'CONTENT_TYPE': 'application/json', 'CONTENT_LENGTH': str(len(body)),
+            'wsgi.input': BytesIO(body), 'wsgi.url_scheme': 'http', 'SCRIPT_NAME': '',
+        }
+
+    def request(self, method, path, data, index, anonymous=False):
+        """
+        Latence (s), nombre de requêtes SQL et statut HTTP
+        """
+        statuses = []
+        with record_queries() as stats:
+            started = time.perf_counter()
+            body = self.app(self.environ(method, path, data, index, anonymous),
+                            lambda status, headers: statuses.append(status))
+            b''.join(body)
+            body.close()
+            latency = time.perf_counter() - started
+        return latency, stats.count, int(statuses[0].split()[0])
+
+    def run(self, method, path, data, clients, total, warmup=0, anonymous=False):
+        for index in range(warmup):
+            self.request(method, path, data, index, anonymous)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            results = list(pool.map(lambda index: self.request(method, path, data, index, anonymous), range(total)))
+        elapsed = time.perf_counter() - started
+        latencies = [latency for latency, _, _ in results]
+        return {
+            'requests': total,
+            'rps': round(total / elapsed, 1),
+            'p50_ms': round(statistics.median(latencies) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+            'queries': round(sum(queries for _, queries, _ in results) / total, 2),
+            'errors': sum(status >= 400 for _, _, status in results),
+        }
+
+
+def load_baseline(path):
+    try:
+        with open(path, encoding='utf-8') as baseline:
+            return json.load(baseline)
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(path, meta, results):
+    with open(path, 'w', encoding='utf-8') as baseline:
+        json.dump({'meta': meta, 'results': results}, baseline, indent=2, sort_keys=True)
+        baseline.write('\n')
+
+
+def regressions(result, reference, tolerance):
+    """
+    Écarts d'un scénario par rapport à la référence : débit ou p95 au-delà
+    de la tolérance relative, toute requête SQL supplémentaire, nouvelles erreurs
+    """
+    problems = []
+    if result['rps'] < reference['rps'] * (1 - tolerance):
+        problems.append(f"débit {result['rps']:.0f} req/s < {reference['rps']:.0f}")
+    if result['p95_ms'] > reference['p95_ms'] * (1 + tolerance):
+        problems.append(f"p95 {result['p95_ms']:.1f} ms > {reference['p95_ms']:.1f}")
+    # Moyenne : les scénarios d'écriture alternent des chemins de coûts différents
+    if result['queries'] > reference['queries'] + 0.5:
+        problems.append(f"{result['queries']:g} requêtes SQL > {reference['queries']:g}")
+    if result['errors'] > reference['errors']:
+        problems.append(f"{result['errors']} erreurs > {reference['errors']}")
+    return problems
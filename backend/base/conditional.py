@@ -0,0 +1,89 @@
+import hashlib
+from functools import wraps
+
+from django.db.models import OuterRef, Subquery
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from .models import Post, Likes, Comment
+from .response_cache import generations
+
+# Politique par défaut des lectures d'API : le navigateur peut garder la
+# réponse mais doit la revalider (ETag / Last-Modified) à chaque utilisation
+DEFAULT_CACHE_POLICY = {'private': True, 'no_cache': True}
+
+
+def _etag(*parts):
+    return hashlib.md5('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+
+def _latest(*dates):
+    dates = [date for date in dates if date is not None]
+    return max(dates) if dates else None
+
+
+def post_list_validators(request, *args, **kwargs):
+    """
+    Validateurs de la liste des posts : la génération du groupe 'posts' du
+    cache de réponses, incrémentée par toute écriture qui change la liste
+    (posts, likes et unlikes, compteurs recalculés en lot). Une lecture de
+    cache, aucune requête SQL. Pas de Last-Modified : les compteurs changent
+    sans toucher à Post.updated, un unlike passerait inaperçu.
+    """
+    generation, = generations('posts')
+    return _etag('posts', generation), None
+
+
+def post_validators(request, slug, *args, **kwargs):
+    """
+    Validateurs d'un post (détail, commentaires, likes), en une requête :
+    la ligne du post, ses compteurs et les dates du dernier commentaire
+    et du dernier like
+    """
+    state = (
+        Post.objects.filter(slug=slug)
+        .annotate(
+            last_comment=Subquery(
+                Comment.objects.filter(post=OuterRef('pk')).order_by('-updated').values('updated')[:1]
+            ),
+            last_like=Subquery(
+                Likes.objects.filter(post=OuterRef('pk')).order_by('-created_at').values('created_at')[:1]
+            ),
+        )
+        .values('id', 'updated', 'likes_count', 'comments_count', 'last_comment', 'last_like')
+        .first()
+    )
+    if state is None:
+        # Laisser la vue répondre 404
+        return None, None
+    etag = _etag(*state.values())
+    return etag, _latest(state['updated'], state['last_comment'], state['last_like'])
+
+
+def conditional(compute_validators, **cache_policy):
+    """
+    Répond 304 quand If-None-Match / If-Modified-Since correspondent aux
+    validateurs, sans exécuter la vue ni sérialiser le corps, puis applique
+    la politique Cache-Control de la vue. `compute_validators` retourne
+    (etag, last_modified) et n'est appelé qu'une fois par requête.
+    """
+    policy = cache_policy or DEFAULT_CACHE_POLICY
+
+    def validators(request, *args, **kwargs):
+        if not hasattr(request, '_conditional_validators'):
+            request._conditional_validators = compute_validators(request, *args, **kwargs)
+        return request._conditional_validators
+
+    def decorator(view):
+        conditioned = condition(
+            etag_func=lambda request, *args, **kwargs: validators(request, *args, **kwargs)[0],
+            last_modified_func=lambda request, *args, **kwargs: validators(request, *args, **kwargs)[1],
+        )(view)
+
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            response = conditioned(request, *args, **kwargs)
+            patch_cache_control(response, **policy)
+            return response
+        return wrapped
+    return decorator
@@ -0,0 +1,58 @@
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+from .models import Post, Likes, Comment
+
+
+def shifted(field, delta):
+    """
+    Expression F(field) + delta qui ne descend jamais sous zéro, même si le
+    compteur a dérivé. Le test précède la soustraction : sur une colonne
+    UNSIGNED (PositiveIntegerField sous MySQL), 0 + -1 est une erreur
+    (1690) avant même qu'un GREATEST(..., 0) puisse s'appliquer.
+    """
+    if delta >= 0:
+        return F(field) + delta
+    return Case(When(**{f'{field}__gte': -delta}, then=F(field) + delta), default=Value(0))
+
+
+def _adjust(post_id, field, delta):
+    """
+    Incrémente (ou décrémente) un compteur dénormalisé de Post en une seule
+    requête UPDATE, sans lire la ligne au préalable
+    """
+    if not post_id or not delta:
+        return
+    Post.objects.filter(pk=post_id).update(**{field: shifted(field, delta)})
+
+
+def adjust_likes(post_id, delta):
+    _adjust(post_id, 'likes_count', delta)
+
+
+def adjust_comments(post_id, delta):
+    _adjust(post_id, 'comments_count', delta)
+
+
+def _count_subquery(model):
+    counts = (
+        model.objects.filter(post=OuterRef('pk'))
+        .order_by()
+        .values('post')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def rebuild_counters(queryset=None):
+    """
+    Recalcule likes_count et comments_count depuis les tables Likes et Comment
+    en une seule requête UPDATE. Retourne le nombre de posts mis à jour.
+    """
+    if queryset is None:
+        queryset = Post.objects.all()
+    return queryset.update(
+        likes_count=_count_subquery(Likes),
+        comments_count=_count_subquery(Comment),
+    )
@@ -0,0 +1,168 @@
+"""
+Sélection partielle des champs d'une réponse (sparse fieldsets) :
+
+    ?fields=id,slug,author.username   seulement ces champs
+    ?omit=post.author                 tous les champs sauf ceux-ci
+
+Les chemins pointés désignent les champs des objets imbriqués. La
+sélection réduit aussi le SQL : colonnes limitées par only() ou values(),
+et aucune jointure pour une relation omise. Les noms inconnus sont ignorés.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+
+def _paths(value):
+    return frozenset(tuple(path.split('.')) for path in value.replace(' ', '').split(',') if path)
+
+
+class Fieldset:
+    """
+    Champs demandés (`fields`, None = tous) et champs omis (`omit`), sous
+    forme de chemins (tuples de noms) ; hashable pour servir de clé de cache
+    """
+    def __init__(self, fields=None, omit=frozenset()):
+        self.fields = fields
+        self.omit = omit
+
+    @classmethod
+    def from_request(cls, request):
+        """
+        Sélection portée par la query string, ou None si elle n'en a pas
+        """
+        params = request.query_params if hasattr(request, 'query_params') else request.GET
+        fields, omit = params.get(FIELDS_PARAM), params.get(OMIT_PARAM)
+        if not fields and not omit:
+            return None
+        return cls(_paths(fields) if fields else None, _paths(omit or ''))
+
+    def __eq__(self, other):
+        return isinstance(other, Fieldset) and (self.fields, self.omit) == (other.fields, other.omit)
+
+    def __hash__(self):
+        return hash((self.fields, self.omit))
+
+    def includes(self, name):
+        if (name,) in self.omit:
+            return False
+        return self.fields is None or any(path[0] == name for path in self.fields)
+
+    def nested(self, name):
+        """
+        Sélection à appliquer à l'objet imbriqué `name` (None = tous ses champs)
+        """
+        fields = None
+        if self.fields is not None and (name,) not in self.fields:
+            fields = frozenset(path[1:] for path in self.fields if path[0] == name and len(path) > 1)
+        omit = frozenset(path[1:] for path in self.omit if path[0] == name and len(path) > 1)
+        if fields is None and not omit:
+            return None
+        return Fieldset(fields, omit)
+
+
+def select(fields, fieldset):
+    """
+    Filtre un dict {nom: champ} ordonné selon la sélection
+    """
+    if fieldset is None:
+        return fields
+    return {name: field for name, field in fields.items() if fieldset.includes(name)}
+
+
+class SparseFieldsetMixin:
+    """
+    Pour les serializers : le kwarg `fieldset` retire les champs non
+    demandés, y compris dans les serializers imbriqués. Les champs
+    write_only restent, les écritures ne sont pas concernées.
+    """
+    def __init__(self, *args, fieldset=None, **kwargs):
+        self.fieldset = fieldset
+        super().__init__(*args, **kwargs)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.fieldset is None:
+            return fields
+        fields = {
+            name: field for name, field in fields.items()
+            if field.write_only or self.fieldset.includes(name)
+        }
+        for name, field in fields.items():
+            nested = field.child if isinstance(field, serializers.ListSerializer) else field
+            if isinstance(nested, SparseFieldsetMixin):
+                nested.fieldset = self.fieldset.nested(name)
+        return fields
+
+
+def _model_paths(serializer, model, prefix, columns, relations):
+    # Colonnes et relations lues par les champs (non write_only) du serializer
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*':
+            continue
+        nested = field.child if isinstance(field, serializers.ListSerializer) else field
+        attributes = field.source.split('.')
+        current, path = model, prefix
+        for index, attribute in enumerate(attributes):
+            try:
+                model_field = current._meta.get_field(attribute)
+            except FieldDoesNotExist:
+                # Propriété ou valeur par défaut : aucune colonne à lire
+                break
+            if not model_field.concrete or model_field.many_to_many:
+                break
+            last = index == len(attributes) - 1
+            if model_field.is_relation and (not last or isinstance(nested, serializers.BaseSerializer)):
+                relations.add(path + attribute)
+                current, path = model_field.related_model, f'{path}{attribute}__'
+                if last:
+                    _model_paths(nested, current, path, columns, relations)
+            else:
+                columns.add(path + attribute)
+
+
+def narrow_queryset(queryset, serializer_class, fieldset, extra=()):
+    """
+    Restreint le queryset aux colonnes et jointures utilisées par les champs
+    sélectionnés du serializer, plus les colonnes `extra` (champs de tri de
+    la pagination...)
+    """
+    if fieldset is None:
+        return queryset
+    columns, relations = set(), set()
+    _model_paths(serializer_class(fieldset=fieldset), queryset.model, '', columns, relations)
+    columns.update(name.lstrip('-') for name in extra if name.lstrip('-') != 'pk')
+    queryset = queryset.select_related(None)
+    if relations:
+        queryset = queryset.select_related(*relations)
+    # only() exige au moins une colonne ; la clé primaire est toujours lue
+    return queryset.only(*(columns | relations) or [queryset.model._meta.pk.name])
+
+
+class SparseFieldsetViewMixin:
+    """
+    Pour les viewsets : applique ?fields= / ?omit= aux lectures (serializer
+    et queryset). `fieldset_columns` associe les clés ajoutées par la vue
+    hors serializer aux colonnes qu'elles lisent.
+    """
+    fieldset_actions = ('list', 'retrieve')
+    fieldset_columns = {}
+
+    def get_fieldset(self):
+        if self.action not in self.fieldset_actions:
+            return None
+        return Fieldset.from_request(self.request)
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('fieldset', self.get_fieldset())
+        return super().get_serializer(*args, **kwargs)
+
+    def get_queryset(self):
+        fieldset = self.get_fieldset()
+        if fieldset is None:
+            return super().get_queryset()
+        extra = list(getattr(self.paginator, 'ordering', None) or ())
+        extra += [column for name, column in self.fieldset_columns.items() if fieldset.includes(name)]
+        return narrow_queryset(super().get_queryset(), self.get_serializer_class(), fieldset, extra)
@@ -0,0 +1,203 @@
+import atexit
+import logging
+import threading
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.db.models import Q, Sum
+from django.dispatch import receiver
+from django.test.signals import setting_changed
+from django.utils.module_loading import import_string
+
+from .counters import rebuild_counters
+from .models import Post, Likes
+from .response_cache import invalidate
+from .stats import adjust_stats
+
+logger = logging.getLogger(__name__)
+
+
+class LocalLikeBuffer:
+    """
+    Tampon en mémoire du processus : (user_id, post_id) -> dernière
+    intention (True = like, False = unlike). Un like suivi d'un unlike
+    se réduit à une seule intention.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._intents = {}
+
+    def record(self, user_id, post_id, liked):
+        with self._lock:
+            self._intents[(user_id, post_id)] = liked
+            return len(self._intents)
+
+    def pending_for_user(self, user_id):
+        with self._lock:
+            return {post_id: liked for (owner, post_id), liked in self._intents.items() if owner == user_id}
+
+    def get(self, user_id, post_id):
+        with self._lock:
+            return self._intents.get((user_id, post_id))
+
+    def drain(self):
+        with self._lock:
+            intents, self._intents = self._intents, {}
+            return intents
+
+    def __len__(self):
+        return len(self._intents)
+
+
+class CacheLikeBuffer:
+    """
+    Tampon partagé entre processus via un backend de cache (Redis,
+    Memcached...) ; LocMemCache sert de remplaçant local. Les intentions
+    sont stockées dans une seule entrée protégée par un verrou cache.add().
+    """
+    key = 'likes:buffer'
+    lock_key = 'likes:buffer:lock'
+    lock_timeout = 5
+
+    def __init__(self):
+        self.cache = caches[getattr(settings, 'LIKES_BUFFER_CACHE_ALIAS', 'default')]
+
+    def _locked(self, update):
+        deadline = time.monotonic() + self.lock_timeout
+        while not self.cache.add(self.lock_key, 1, timeout=self.lock_timeout):
+            if time.monotonic() > deadline:
+                raise TimeoutError('Verrou du tampon de likes indisponible')
+            time.sleep(0.005)
+        try:
+            intents = self.cache.get(self.key) or {}
+            result = update(intents)
+            self.cache.set(self.key, intents, timeout=None)
+            return result
+        finally:
+            self.cache.delete(self.lock_key)
+
+    def record(self, user_id, post_id, liked):
+        def update(intents):
+            intents[(user_id, post_id)] = liked
+            return len(intents)
+        return self._locked(update)
+
+    def pending_for_user(self, user_id):
+        intents = self.cache.get(self.key) or {}
+        return {post_id: liked for (owner, post_id), liked in intents.items() if owner == user_id}
+
+    def get(self, user_id, post_id):
+        return (self.cache.get(self.key) or {}).get((user_id, post_id))
+
+    def drain(self):
+        def update(intents):
+            drained = dict(intents)
+            intents.clear()
+            return drained
+        return self._locked(update)
+
+    def __len__(self):
+        return len(self.cache.get(self.key) or {})
+
+
+def write_behind_enabled():
+    return getattr(settings, 'LIKES_WRITE_BEHIND', False)
+
+
+@lru_cache(maxsize=None)
+def get_like_buffer():
+    buffer = import_string(settings.LIKES_BUFFER_BACKEND)()
+    atexit.register(flush, buffer)
+    return buffer
+
+
+@receiver(setting_changed)
+def reset_like_buffer(setting, **kwargs):
+    if setting in ('LIKES_WRITE_BEHIND', 'LIKES_BUFFER_BACKEND'):
+        get_like_buffer.cache_clear()
+
+
+def flush(buffer=None):
+    """
+    Applique les intentions en attente : un bulk_create(ignore_conflicts=True)
+    pour les likes, un DELETE groupé pour les unlikes, puis recalcule les
+    compteurs des posts touchés. Retourne le nombre d'intentions appliquées.
+    """
+    buffer = buffer or get_like_buffer()
+    intents = buffer.drain()
+    if not intents:
+        return 0
+
+    to_like = [key for key, liked in intents.items() if liked]
+    to_unlike = {}
+    for (user_id, post_id), liked in intents.items():
+        if not liked:
+            to_unlike.setdefault(post_id, []).append(user_id)
+    post_ids = {post_id for _, post_id in intents}
+
+    try:
+        with transaction.atomic():
+            if to_like:
+                Likes.objects.bulk_create(
+                    [Likes(user_id=user_id, post_id=post_id) for user_id, post_id in to_like],
+                    ignore_conflicts=True,
+                    batch_size=500,
+                )
+            if to_unlike:
+                condition = Q()
+                for post_id, user_ids in to_unlike.items():
+                    condition |= Q(post_id=post_id, user_id__in=user_ids)
+                # Suppression en une instruction, sans charger les lignes ni
+                # déclencher les signaux par ligne (les compteurs sont recalculés)
+                unliked = Likes.objects.filter(condition)
+                unliked._raw_delete(unliked.db)
+            posts = Post.objects.filter(pk__in=post_ids)
+            before = posts.aggregate(total=Sum('likes_count'))['total'] or 0
+            rebuild_counters(posts)
+            # Les écritures groupées ne déclenchent pas les signaux : le total
+            # global varie comme la somme des compteurs des posts touchés
+            after = posts.aggregate(total=Sum('likes_count'))['total'] or 0
+            adjust_stats(likes_count=after - before)
+            slugs = list(posts.values_list('slug', flat=True))
+            invalidate('posts', *(f'post:{slug}' for slug in slugs))
+    except Exception:
+        # Remettre les intentions dans le tampon pour le prochain passage
+        for (user_id, post_id), liked in intents.items():
+            if buffer.get(user_id, post_id) is None:
+                buffer.record(user_id, post_id, liked)
+        raise
+    return len(intents)
+
+
+_flusher_lock = threading.Lock()
+_flusher = None
+
+
+def _flush_loop(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            flush()
+        except Exception:
+            logger.exception('Échec du vidage du tampon de likes')
+        finally:
+            connection.close()
+
+
+def ensure_flusher():
+    """
+    Démarre (une fois par processus) le thread qui vide le tampon toutes
+    les LIKES_FLUSH_INTERVAL secondes ; sans intervalle, seul
+    `manage.py flush_likes` ou le seuil LIKES_FLUSH_MAX_PENDING vident le tampon
+    """
+    global _flusher
+    interval = getattr(settings, 'LIKES_FLUSH_INTERVAL', None)
+    if not interval or _flusher is not None:
+        return
+    with _flusher_lock:
+        if _flusher is None:
+            _flusher = threading.Thread(target=_flush_loop, args=(interval,), name='likes-flusher', daemon=True)
+            _flusher.start()
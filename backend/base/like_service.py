@@ -0,0 +1,141 @@
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models.constants import OnConflict
+from django.utils import timezone
+
+from .counters import adjust_likes
+from .like_buffer import ensure_flusher, flush, get_like_buffer, write_behind_enabled
+from .liked_set import record_change
+from .models import Likes
+from .response_cache import invalidate
+from .stats import adjust_stats
+
+
+@dataclass
+class LikeResult:
+    liked: bool
+    changed: bool
+    likes_count: int
+
+
+def _execute(sql, params):
+    using = router.db_for_write(Likes)
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
+
+
+def _insert_ignore(user_id, post_id):
+    """
+    INSERT qui ignore le conflit sur (user, post) : une seule instruction,
+    sans IntegrityError même en cas de double clic concurrent.
+    Retourne le nombre de lignes insérées (0 ou 1).
+    """
+    connection = connections[router.db_for_write(Likes)]
+    ops = connection.ops
+    meta = Likes._meta
+    fields = [meta.get_field('user'), meta.get_field('post'), meta.get_field('created_at')]
+    columns = ', '.join(ops.quote_name(field.column) for field in fields)
+    suffix = ops.on_conflict_suffix_sql(fields, OnConflict.IGNORE, None, None) or ''
+    sql = (
+        f'{ops.insert_statement(on_conflict=OnConflict.IGNORE)} {ops.quote_name(meta.db_table)} '
+        f'({columns}) VALUES (%s, %s, %s) {suffix}'
+    )
+    created_at = ops.adapt_datetimefield_value(timezone.now())
+    return _execute(sql, [user_id, post_id, created_at])
+
+
+def _delete(user_id, post_id):
+    """
+    DELETE direct ; retourne le nombre de lignes supprimées (0 ou 1)
+    """
+    connection = connections[router.db_for_write(Likes)]
+    quote = connection.ops.quote_name
+    meta = Likes._meta
+    sql = (
+        f'DELETE FROM {quote(meta.db_table)} '
+        f'WHERE {quote(meta.get_field("user").column)} = %s AND {quote(meta.get_field("post").column)} = %s'
+    )
+    return _execute(sql, [user_id, post_id])
+
+
+def _apply(post, user_id, liked, changed):
+    # Les écritures SQL directes ne déclenchent pas les signaux de Likes :
+    # on applique ici les mêmes effets (compteurs, cache, journal)
+    if changed:
+        delta = 1 if liked else -1
+        adjust_likes(post.pk, delta)
+        adjust_stats(likes_count=delta)
+        invalidate('posts', f'post:{post.slug}')
+        transaction.on_commit(lambda: record_change(user_id, post.pk, liked))
+        # Relire le compteur après le F() : post.likes_count ± 1 ignorerait
+        # les likes des autres utilisateurs écrits depuis la lecture du post
+        post.refresh_from_db(fields=['likes_count'])
+    return LikeResult(liked=liked, changed=changed, likes_count=post.likes_count)
+
+
+def is_liked(user_id, post_id):
+    """
+    État du like vu par l'utilisateur : l'intention en attente dans le
+    tampon d'écriture différée prime sur la base
+    """
+    if write_behind_enabled():
+        pending = get_like_buffer().get(user_id, post_id)
+        if pending is not None:
+            return pending
+    return Likes.objects.filter(user_id=user_id, post_id=post_id).exists()
+
+
+def _buffer(user, post, liked):
+    """
+    Mode écriture différée : enregistre l'intention, qui sera appliquée
+    en lot par like_buffer.flush()
+    """
+    was_liked = is_liked(user.pk, post.pk)
+    buffer = get_like_buffer()
+    pending = buffer.record(user.pk, post.pk, liked)
+    changed = was_liked != liked
+    if changed:
+        record_change(user.pk, post.pk, liked)
+    if pending >= settings.LIKES_FLUSH_MAX_PENDING:
+        flush(buffer)
+    else:
+        ensure_flusher()
+    count = max(0, post.likes_count + (liked - was_liked))
+    return LikeResult(liked=liked, changed=changed, likes_count=count)
+
+
+def like(user, post):
+    """
+    Ajoute le like de l'utilisateur (idempotent)
+    """
+    if write_behind_enabled():
+        return _buffer(user, post, True)
+    with transaction.atomic():
+        return _apply(post, user.pk, True, _insert_ignore(user.pk, post.pk) > 0)
+
+
+def unlike(user, post):
+    """
+    Retire le like de l'utilisateur (idempotent)
+    """
+    if write_behind_enabled():
+        return _buffer(user, post, False)
+    with transaction.atomic():
+        return _apply(post, user.pk, False, _delete(user.pk, post.pk) > 0)
+
+
+def toggle(user, post):
+    """
+    Inverse l'état du like : tente d'abord la suppression, puis l'insertion
+    si aucun like n'existait (deux instructions dans ce cas). Quand l'état
+    est connu de l'appelant, appeler like() ou unlike(), une instruction.
+    """
+    if write_behind_enabled():
+        return _buffer(user, post, not is_liked(user.pk, post.pk))
+    with transaction.atomic():
+        if _delete(user.pk, post.pk):
+            return _apply(post, user.pk, False, True)
+        return _apply(post, user.pk, True, _insert_ignore(user.pk, post.pk) > 0)
@@ -0,0 +1,85 @@
+import uuid
+
+from django.core.cache import cache
+
+from .like_buffer import get_like_buffer, write_behind_enabled
+from .models import Likes
+
+# Nombre de changements conservés par utilisateur pour servir des deltas ;
+# au-delà, le client reçoit un instantané complet
+JOURNAL_SIZE = 200
+KEY_PREFIX = 'liked'
+
+
+def _key(user_id):
+    return f'{KEY_PREFIX}:{user_id}'
+
+
+def _new_state():
+    return {'epoch': uuid.uuid4().hex[:12], 'seq': 0, 'events': []}
+
+
+def _version(state):
+    return f"{state['epoch']}.{state['seq']}"
+
+
+def record_change(user_id, post_id, liked):
+    """
+    Ajoute un like (liked=True) ou un unlike au journal de l'utilisateur
+    """
+    state = cache.get(_key(user_id)) or _new_state()
+    state['seq'] += 1
+    state['events'].append((state['seq'], post_id, liked))
+    del state['events'][:-JOURNAL_SIZE]
+    cache.set(_key(user_id), state, timeout=None)
+
+
+def _delta(state, since):
+    """
+    Changements nets depuis la version `since`, ou None si elle est
+    inconnue ou trop ancienne pour le journal
+    """
+    try:
+        epoch, seq = since.split('.')
+        seq = int(seq)
+    except (AttributeError, ValueError):
+        return None
+    if epoch != state['epoch'] or seq > state['seq']:
+        return None
+    oldest = state['events'][0][0] if state['events'] else state['seq'] + 1
+    if seq < oldest - 1:
+        return None
+    latest = {}
+    for event_seq, post_id, liked in state['events']:
+        if event_seq > seq:
+            latest[post_id] = liked
+    return {
+        'added': sorted(post_id for post_id, liked in latest.items() if liked),
+        'removed': sorted(post_id for post_id, liked in latest.items() if not liked),
+    }
+
+
+def liked_snapshot(user, since=None):
+    """
+    Ensemble des ids de posts likés par l'utilisateur avec un jeton de
+    version ; avec `since`, seulement les ajouts/suppressions depuis
+    """
+    state = cache.get(_key(user.pk))
+    if state is not None and since:
+        delta = _delta(state, since)
+        if delta is not None:
+            return {'version': _version(state), 'full': False, **delta}
+
+    if state is None:
+        state = _new_state()
+        cache.set(_key(user.pk), state, timeout=None)
+    ids = set(Likes.objects.filter(user=user).values_list('post_id', flat=True))
+    if write_behind_enabled():
+        # Intentions pas encore écrites en base
+        for post_id, liked in get_like_buffer().pending_for_user(user.pk).items():
+            if liked:
+                ids.add(post_id)
+            else:
+                ids.discard(post_id)
+    ids = sorted(ids)
+    return {'version': _version(state), 'full': True, 'ids': ids}
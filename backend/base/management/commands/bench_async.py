@@ -0,0 +1,117 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.contrib.auth.models import User
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+from django.test import Client, override_settings
+from base.benchmark import percentile
+from base.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare les lectures WSGI (base.api) et ASGI (base.async_api) en processus : '
+        'requêtes/s et latences p50/p99 avec N clients simultanés'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=16, help='Clients simultanés')
+        parser.add_argument('--requests', type=int, default=400, help='Requêtes par endpoint et par mode')
+        parser.add_argument('--username', help='Utilisateur authentifié (par défaut le premier)')
+        parser.add_argument('--with-cache', action='store_true',
+                            help='Garde le cache de réponses des endpoints WSGI (désactivé par défaut)')
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(**({'username': options['username']} if options['username'] else {})).first()
+        slug = Post.objects.order_by('-likes_count').values_list('slug', flat=True).first()
+        if user is None or slug is None:
+            raise CommandError('Il faut au moins un utilisateur et un post')
+
+        client = Client()
+        client.force_login(user)
+        self.cookie = f"sessionid={client.cookies['sessionid'].value}"
+        endpoints = ['posts/', f'posts/{slug}/', f'posts/{slug}/comments/',
+                     f'posts/{slug}/likes/', f'posts/{slug}/like-status/']
+
+        overrides = {'DEBUG': False, 'ALLOWED_HOSTS': ['localhost']}
+        if not options['with_cache']:
+            overrides['RESPONSE_CACHE_TIMEOUT'] = 0
+        with override_settings(**overrides):
+            wsgi, asgi = get_wsgi_application(), get_asgi_application()
+            self.stdout.write(f"{'endpoint':<40} {'mode':<5} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'erreurs':>8}")
+            for endpoint in endpoints:
+                for mode, run in (('wsgi', self._run_wsgi), ('asgi', self._run_asgi)):
+                    path = f'/api/{endpoint}' if mode == 'wsgi' else f'/api/async/{endpoint}'
+                    app = wsgi if mode == 'wsgi' else asgi
+                    elapsed, latencies, errors = run(app, path, options['clients'], options['requests'])
+                    self.stdout.write(
+                        f"{endpoint:<40} {mode:<5} {len(latencies) / elapsed:>8.0f} "
+                        f"{statistics.median(latencies) * 1000:>8.1f} {percentile(latencies, 99) * 1000:>8.1f} "
+                        f"{errors:>8}"
+                    )
+        connections.close_all()
+
+    def _run_wsgi(self, app, path, clients, total):
+        environ = {
+            'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '',
+            'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'HTTP_HOST': 'localhost',
+            'HTTP_COOKIE': self.cookie, 'wsgi.url_scheme': 'http', 'SCRIPT_NAME': '',
+        }
+
+        def one(_):
+            started = time.perf_counter()
+            statuses = []
+            body = app({**environ, 'wsgi.input': BytesIO()}, lambda status, headers: statuses.append(status))
+            b''.join(body)
+            body.close()
+            return time.perf_counter() - started, not statuses[0].startswith('200')
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            results = list(pool.map(one, range(total)))
+        return time.perf_counter() - started, [latency for latency, _ in results], sum(error for _, error in results)
+
+    def _run_asgi(self, app, path, clients, total):
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+            'headers': [(b'host', b'localhost'), (b'cookie', self.cookie.encode())],
+            'server': ('localhost', 80), 'client': ('127.0.0.1', 50000),
+        }
+
+        async def one():
+            started = time.perf_counter()
+            messages = []
+            request_sent = asyncio.Event()
+
+            async def receive():
+                if request_sent.is_set():
+                    # Le client ne se déconnecte jamais : Django annule cette attente
+                    await asyncio.Future()
+                request_sent.set()
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+            async def send(message):
+                messages.append(message)
+
+            await app(dict(scope), receive, send)
+            status = next(message['status'] for message in messages if message['type'] == 'http.response.start')
+            return time.perf_counter() - started, status != 200
+
+        async def main():
+            semaphore = asyncio.Semaphore(clients)
+
+            async def limited():
+                async with semaphore:
+                    return await one()
+            return await asyncio.gather(*(limited() for _ in range(total)))
+
+        started = time.perf_counter()
+        results = asyncio.run(main())
+        return time.perf_counter() - started, [latency for latency, _ in results], sum(error for _, error in results)
@@ -0,0 +1,109 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client, override_settings
+
+from base.benchmark import ANONYMOUS, SCENARIOS, Bench, load_baseline, regressions, save_baseline
+from base.models import Post, Likes, Comment
+from base.seed import DEFAULT_PASSWORD, WORDS
+
+
+class Command(BaseCommand):
+    help = (
+        'Banc de charge des endpoints de base/api_urls.py, base/urls.py et accounts/urls.py : '
+        'req/s, latences p50/p95/p99 et requêtes SQL par requête, comparés à un fichier de référence. '
+        'À lancer sur une base remplie par seed_data (profil --settings=backend.settings_bench)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=8, help='Clients simultanés')
+        parser.add_argument('--requests', type=int, default=200, help='Requêtes mesurées par scénario')
+        parser.add_argument('--warmup', type=int, default=10, help='Requêtes non mesurées avant chaque scénario')
+        parser.add_argument('--only', help='Scénarios à jouer, séparés par des virgules')
+        parser.add_argument('--username', help='Utilisateur du banc (par défaut le premier membre du staff)')
+        parser.add_argument('--password', default=DEFAULT_PASSWORD, help='Son mot de passe, pour le scénario login')
+        parser.add_argument('--baseline', default=str(settings.BASE_DIR / 'bench_baseline.json'),
+                            help='Fichier de référence')
+        parser.add_argument('--save-baseline', action='store_true', help='Remplace la référence par ces mesures')
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='Écart relatif toléré sur le débit et le p95 (0.2 = 20 %%)')
+        parser.add_argument('--fail-on-regression', action='store_true',
+                            help='Code de sortie non nul en cas de régression')
+        parser.add_argument('--with-cache', action='store_true',
+                            help='Garde le cache de réponses (désactivé par défaut)')
+        parser.add_argument('--with-throttling', action='store_true',
+                            help='Garde la limitation de débit (désactivée par défaut : un seul client la déclencherait)')
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(username=options['username']) if options['username'] else \
+            User.objects.filter(is_staff=True).order_by('pk')
+        user = users.first()
+        slugs = list(Post.published.order_by('-likes_count', 'pk').values_list('slug', flat=True)[:20])
+        if user is None or not slugs:
+            raise CommandError('Il faut un utilisateur (staff par défaut) et des posts publiés : lancer seed_data')
+
+        scenarios = SCENARIOS
+        if options['only']:
+            names = set(options['only'].split(','))
+            scenarios = [scenario for scenario in SCENARIOS if scenario[0] in names]
+            if len(scenarios) != len(names):
+                known = ', '.join(name for name, *_ in SCENARIOS)
+                raise CommandError(f'Scénario inconnu ; disponibles : {known}')
+
+        client = Client()
+        client.force_login(user)
+        values = {
+            'slug': slugs, 'word': WORDS[:10],
+            'username': [user.username], 'password': [options['password']],
+        }
+        meta = {
+            'database': connection.vendor, 'clients': options['clients'], 'requests': options['requests'],
+            'users': User.objects.count(), 'posts': Post.objects.count(),
+            'comments': Comment.objects.count(), 'likes': Likes.objects.count(),
+        }
+
+        overrides = {'DEBUG': False, 'ALLOWED_HOSTS': ['localhost'], 'QUERY_BUDGET_ENABLED': False}
+        if not options['with_cache']:
+            overrides['RESPONSE_CACHE_TIMEOUT'] = 0
+        if not options['with_throttling']:
+            overrides['THROTTLE_ENABLED'] = False
+        results = {}
+        with override_settings(**overrides):
+            bench = Bench(client.cookies['sessionid'].value, values)
+            baseline = None if options['save_baseline'] else load_baseline(options['baseline'])
+            # Les volumes sont indicatifs : les scénarios d'écriture les font varier
+            if baseline and any(baseline['meta'].get(key) != meta[key] for key in ('database', 'clients', 'requests')):
+                self.stdout.write(self.style.WARNING(
+                    f"Référence mesurée dans d'autres conditions : {baseline['meta']}"
+                ))
+            self.stdout.write(
+                f"{'scénario':<20} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'SQL':>6} {'erreurs':>8}"
+            )
+            problems = []
+            for name, method, path, data in scenarios:
+                result = results[name] = bench.run(
+                    method, path, data, options['clients'], options['requests'],
+                    warmup=options['warmup'], anonymous=name in ANONYMOUS,
+                )
+                line = (
+                    f"{name:<20} {result['rps']:>8.0f} {result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} "
+                    f"{result['p99_ms']:>8.1f} {result['queries']:>6g} {result['errors']:>8}"
+                )
+                reference = (baseline or {}).get('results', {}).get(name)
+                found = regressions(result, reference, options['tolerance']) if reference else []
+                problems.extend(f'{name} : {problem}' for problem in found)
+                self.stdout.write(self.style.ERROR(line) if found else line)
+        connections.close_all()
+
+        if options['save_baseline']:
+            save_baseline(options['baseline'], meta, results)
+            self.stdout.write(self.style.SUCCESS(f"Référence enregistrée dans {options['baseline']}"))
+        elif baseline is None:
+            self.stdout.write(f"Aucune référence ({options['baseline']}) : relancer avec --save-baseline")
+        elif problems:
+            self.stdout.write(self.style.ERROR('Régressions :\n  ' + '\n  '.join(problems)))
+            if options['fail_on_regression']:
+                raise CommandError(f'{len(problems)} régression(s) par rapport à la référence')
+        else:
+            self.stdout.write(self.style.SUCCESS('Aucune régression par rapport à la référence'))
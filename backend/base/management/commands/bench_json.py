@@ -0,0 +1,58 @@
+import json
+import time
+from itertools import cycle, islice
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from backend import json_codec
+from backend.renderers import FastJSONRenderer, MessagePackRenderer, msgpack
+from base.models import Post
+from base.row_serializers import PostRowSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare l'encodage d'une grande liste de posts : JSONRenderer de DRF, "
+        "FastJSONRenderer (orjson) et MessagePack ; temps d'encodage, de décodage et taille"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Posts dans la liste (les posts existants sont répétés)')
+        parser.add_argument('--repeat', type=int, default=50, help="Nombre d'encodages par format")
+
+    def handle(self, *args, **options):
+        posts = PostRowSerializer(PostRowSerializer.rows(Post.objects.order_by('-created', 'id')[:options['rows']]),
+                                  many=True).data
+        if not posts:
+            raise CommandError('Il faut au moins un post')
+        data = {'next': None, 'previous': None, 'results': list(islice(cycle(posts), options['rows']))}
+
+        formats = [
+            ('drf-json', JSONRenderer(), json.loads),
+            ('orjson' if json_codec.orjson else 'json-stdlib', FastJSONRenderer(), json_codec.loads),
+        ]
+        if msgpack is not None:
+            formats.append(('msgpack', MessagePackRenderer(), lambda content: msgpack.unpackb(content, raw=False)))
+        else:
+            self.stdout.write('msgpack non installé : format ignoré')
+
+        reference = None
+        self.stdout.write(f"{'format':<12} {'encodage ms':>12} {'décodage ms':>12} {'octets':>10}")
+        for name, renderer, decode in formats:
+            content = renderer.render(data)
+            reference = reference or content
+            if decode(content) != json.loads(reference):
+                raise CommandError(f'{name} : le contenu décodé diffère')
+
+            started = time.perf_counter()
+            for _ in range(options['repeat']):
+                renderer.render(data)
+            encode_ms = (time.perf_counter() - started) * 1000 / options['repeat']
+
+            started = time.perf_counter()
+            for _ in range(options['repeat']):
+                decode(content)
+            decode_ms = (time.perf_counter() - started) * 1000 / options['repeat']
+
+            self.stdout.write(f'{name:<12} {encode_ms:>12.2f} {decode_ms:>12.2f} {len(content):>10}')
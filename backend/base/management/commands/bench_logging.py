@@ -0,0 +1,84 @@
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from backend.log import BackgroundHandler, JSONFormatter, RedactFilter, SampleFilter
+
+BODY = '{"username": "lecteur", "password": "motdepasse123"}'
+
+
+def legacy_login(logger, index):
+    # Journalisation d'avant : lignes synchrones, corps brut compris
+    logger.info("=== NOUVELLE TENTATIVE DE CONNEXION ===")
+    logger.info("Méthode: POST")
+    logger.info("Content-Type: application/json")
+    logger.info(f"Données JSON brutes: {BODY}")
+    logger.info(f"Tentative de connexion pour l'utilisateur: lecteur{index}")
+    logger.info(f"Connexion réussie pour l'utilisateur: lecteur{index}")
+
+
+def structured_login(logger, index):
+    logger.info('login', extra={'event': 'login', 'outcome': 'success', 'username': f'lecteur{index}',
+                                'ip': '127.0.0.1'})
+
+
+def _lines(path):
+    with open(path, encoding='utf-8') as output:
+        return sum(1 for _ in output)
+
+
+class Command(BaseCommand):
+    help = (
+        "Coût de journalisation par connexion, mesuré dans le thread de la requête : "
+        "ancien schéma (basicConfig, 6 lignes synchrones) contre BackgroundHandler "
+        "(une ligne JSON échantillonnée, écrite par un thread dédié)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20000, help='Connexions simulées par mode')
+        parser.add_argument('--threads', type=int, default=8, help='Threads de requêtes simultanés')
+        parser.add_argument('--sample-rate', type=float, default=0.1, help='Taux gardé des lignes INFO')
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            legacy_path = os.path.join(directory, 'avant.log')
+            legacy = logging.FileHandler(legacy_path, encoding='utf-8')
+            legacy.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+
+            structured_path = os.path.join(directory, 'apres.log')
+            structured = BackgroundHandler(filename=structured_path)
+            structured.setFormatter(JSONFormatter())
+            structured.addFilter(SampleFilter({'bench': options['sample_rate']}))
+            structured.addFilter(RedactFilter())
+
+            self.stdout.write(f"{'mode':<8} {'µs/requête (thread)':>20} {'µs/requête (total)':>19} {'lignes':>8}")
+            for name, handler, path, log in (
+                ('avant', legacy, legacy_path, legacy_login),
+                ('après', structured, structured_path, structured_login),
+            ):
+                logger = logging.getLogger(f'bench.{name}')
+                logger.handlers, logger.propagate = [handler], False
+                logger.setLevel(logging.INFO)
+                per_request, total = self._run(logger, handler, log, options['requests'], options['threads'])
+                handler.close()
+                self.stdout.write(f'{name:<8} {per_request:>20.1f} {total:>19.1f} {_lines(path):>8}')
+
+    def _run(self, logger, handler, log, total, threads):
+        def worker(indexes):
+            started = time.perf_counter()
+            for index in indexes:
+                log(logger, index)
+            return time.perf_counter() - started
+
+        chunks = [range(start, total, threads) for start in range(threads)]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            busy = sum(pool.map(worker, chunks))
+        # Temps jusqu'à ce que tout soit sur disque, écriture en arrière-plan comprise
+        handler.flush()
+        elapsed = time.perf_counter() - started
+        return busy / total * 1e6, elapsed / total * 1e6
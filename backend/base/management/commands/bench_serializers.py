@@ -0,0 +1,57 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from base.models import Post, Likes, Comment
+from base.row_serializers import PostRowSerializer, CommentRowSerializer, LikeRowSerializer, UserRowSerializer
+from base.serializers import PostSerializer, CommentSerializer, LikeSerializer, UserSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare la sérialisation des listes par ModelSerializer (instances) et par '
+        'RowSerializer (lignes values()) : lignes/s, lecture SQL comprise, et JSON identique'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100, help='Lignes par liste (taille de page)')
+        parser.add_argument('--repeat', type=int, default=50, help='Nombre de listes sérialisées par mode')
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        cases = [
+            ('posts', Post.objects.select_related('author').order_by('-created', 'id'),
+             PostSerializer, PostRowSerializer),
+            ('comments', Comment.objects.select_related('author').order_by('-created', 'id'),
+             CommentSerializer, CommentRowSerializer),
+            ('likes', Likes.objects.select_related('user', 'post__author').order_by('-created_at', 'id'),
+             LikeSerializer, LikeRowSerializer),
+            ('users', User.objects.order_by('-date_joined', 'id'), UserSerializer, UserRowSerializer),
+        ]
+        renderer = JSONRenderer()
+        self.stdout.write(f"{'liste':<10} {'lignes':>7} {'serializer/s':>13} {'values()/s':>11} {'gain':>6}")
+        for name, queryset, serializer_class, row_serializer_class in cases:
+            queryset = queryset[:rows]
+            expected = renderer.render(serializer_class(queryset, many=True).data)
+            if renderer.render(row_serializer_class(row_serializer_class.rows(queryset), many=True).data) != expected:
+                raise CommandError(f'{name} : le JSON des deux sérialisations diffère')
+            count = len(queryset)
+            if not count:
+                self.stdout.write(f'{name:<10} {0:>7} (aucune ligne, ignoré)')
+                continue
+
+            started = time.perf_counter()
+            for _ in range(repeat):
+                renderer.render(serializer_class(queryset.all(), many=True).data)
+            model_rate = count * repeat / (time.perf_counter() - started)
+
+            started = time.perf_counter()
+            for _ in range(repeat):
+                renderer.render(row_serializer_class(row_serializer_class.rows(queryset.all()), many=True).data)
+            row_rate = count * repeat / (time.perf_counter() - started)
+
+            self.stdout.write(
+                f'{name:<10} {count:>7} {model_rate:>13.0f} {row_rate:>11.0f} {row_rate / model_rate:>5.1f}x'
+            )
@@ -0,0 +1,114 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from base.models import Post, Likes, Comment
+
+
+def hot_queries():
+    """
+    Requêtes des chemins les plus sollicités, avec des valeurs réelles
+    de la base quand elle contient des données
+    """
+    post = Post.objects.order_by('pk').values('pk', 'slug').first() or {'pk': 0, 'slug': 'inconnu'}
+    user_id = User.objects.order_by('pk').values_list('pk', flat=True).first() or 0
+    return [
+        ('Post par slug', Post.objects.filter(slug=post['slug'])),
+        ('Liste publiée (-publish)', Post.published.order_by('-publish')[:20]),
+        ('Liste de l\'API (-created, id)', Post.objects.order_by('-created', 'id')[:20]),
+        ('Administration par statut (-created)', Post.objects.filter(status='draft').order_by('-created')[:20]),
+        ('Commentaires d\'un post', Comment.objects.filter(post_id=post['pk']).order_by('-created', 'id')[:20]),
+        ('Likes d\'un post', Likes.objects.filter(post_id=post['pk']).order_by('-created_at', 'id')[:20]),
+        ('Likes d\'un utilisateur', Likes.objects.filter(user_id=user_id).order_by('-created_at', 'id')[:20]),
+    ]
+
+
+def hot_path_indexes():
+    # Index ajoutés par la migration 0010, par table
+    return {
+        model._meta.db_table: [index.name for index in model._meta.indexes]
+        for model in (Post, Comment, Likes)
+    }
+
+
+def hot_path_unique_constraints(cursor):
+    """
+    Contraintes d'unicité ajoutées par la migration 0010 (Post.slug), par
+    table, avec le nom que leur a donné la base
+    """
+    table = Post._meta.db_table
+    column = Post._meta.get_field('slug').column
+    constraints = connection.introspection.get_constraints(cursor, table)
+    return {table: [
+        name for name, constraint in constraints.items()
+        if constraint['unique'] and not constraint['primary_key'] and constraint['columns'] == [column]
+    ]}
+
+
+class Command(BaseCommand):
+    help = (
+        'Affiche le plan EXPLAIN de chaque requête critique, sans puis avec les index '
+        'de la migration 0010 (IGNORE INDEX sur MySQL, DROP INDEX annulé par rollback ailleurs)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--after-only', action='store_true', help='N\'affiche que les plans avec les index')
+
+    def handle(self, *args, **options):
+        if not connection.features.supports_explaining_query_execution:
+            raise CommandError(f'EXPLAIN n\'est pas disponible pour la base {connection.vendor}')
+        queries = hot_queries()
+        indexes = hot_path_indexes()
+
+        if not options['after_only']:
+            self.stdout.write(self.style.MIGRATE_HEADING('=== Avant : index des chemins critiques ignorés ==='))
+            quote = connection.ops.quote_name
+            with connection.cursor() as cursor:
+                uniques = hot_path_unique_constraints(cursor)
+            if connection.vendor == 'mysql':
+                # L'index d'une contrainte UNIQUE porte le nom de la contrainte
+                ignored = {table: names + uniques.get(table, []) for table, names in indexes.items()}
+                self._print_plans(queries, ignored=ignored)
+            elif connection.features.can_rollback_ddl:
+                with transaction.atomic():
+                    with connection.cursor() as cursor:
+                        for names in indexes.values():
+                            for name in names:
+                                cursor.execute(f'DROP INDEX {quote(name)}')
+                        if connection.vendor != 'sqlite':
+                            for table, names in uniques.items():
+                                for name in names:
+                                    cursor.execute(f'ALTER TABLE {quote(table)} DROP CONSTRAINT {quote(name)}')
+                    # SQLite ne supprime pas l'index d'une contrainte UNIQUE
+                    # (sqlite_autoindex_*) : ces tables sont lues NOT INDEXED
+                    # (aucune requête du rapport n'y sert d'un index antérieur)
+                    self._print_plans(queries, not_indexed=set(uniques) if connection.vendor == 'sqlite' else None)
+                    transaction.set_rollback(True)
+            else:
+                self.stdout.write(self.style.WARNING('Comparaison impossible sur cette base'))
+
+        self.stdout.write(self.style.MIGRATE_HEADING('=== Après : index des chemins critiques ==='))
+        self._print_plans(queries)
+
+    def _print_plans(self, queries, ignored=None, not_indexed=None):
+        for label, queryset in queries:
+            self.stdout.write(self.style.SUCCESS(f'-- {label}'))
+            for line in self._explain(queryset, ignored, not_indexed):
+                self.stdout.write(f'   {line}')
+
+    def _explain(self, queryset, ignored=None, not_indexed=None):
+        sql, params = queryset.query.sql_with_params()
+        table = queryset.model._meta.db_table
+        quoted = connection.ops.quote_name(table)
+        if ignored and ignored.get(table):
+            # Indice MySQL : planifier comme si les nouveaux index n'existaient pas
+            names = ', '.join(connection.ops.quote_name(name) for name in ignored[table])
+            sql = sql.replace(f'FROM {quoted}', f'FROM {quoted} IGNORE INDEX ({names})', 1)
+        if not_indexed and table in not_indexed:
+            sql = sql.replace(f'FROM {quoted}', f'FROM {quoted} NOT INDEXED', 1)
+        with connection.cursor() as cursor:
+            cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+            rows = cursor.fetchall()
+        if connection.vendor == 'sqlite':
+            # EXPLAIN QUERY PLAN : (id, parent, notused, detail)
+            return [row[-1] for row in rows]
+        return [' | '.join(str(value) for value in row) for row in rows]
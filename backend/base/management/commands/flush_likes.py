@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from base.like_buffer import flush
+
+
+class Command(BaseCommand):
+    help = 'Écrit en base les likes/unlikes en attente dans le tampon d\'écriture différée'
+
+    def handle(self, *args, **options):
+        applied = flush()
+        self.stdout.write(self.style.SUCCESS(f'{applied} intentions de like appliquées'))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from base.counters import rebuild_counters
+from base.response_cache import invalidate
+
+
+class Command(BaseCommand):
+    help = 'Recalcule les compteurs likes_count et comments_count des posts depuis les tables Likes et Comment'
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('Recalcul des compteurs...'))
+        with transaction.atomic():
+            updated = rebuild_counters()
+            # UPDATE groupé sans signaux : la liste (réponses en cache, ETag) change
+            invalidate('posts')
+        self.stdout.write(self.style.SUCCESS(f'Compteurs recalculés pour {updated} posts'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from base.stats import STATS_FIELDS, recompute_stats
+
+
+class Command(BaseCommand):
+    help = 'Recalcule entièrement la ligne de statistiques du tableau de bord (à lancer périodiquement)'
+
+    def handle(self, *args, **options):
+        stats = recompute_stats()
+        summary = ', '.join(f'{field}={getattr(stats, field)}' for field in STATS_FIELDS)
+        self.stdout.write(self.style.SUCCESS(f'Statistiques recalculées : {summary}'))
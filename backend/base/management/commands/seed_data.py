@@ -0,0 +1,41 @@
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from base.seed import DEFAULT_PASSWORD, seed
+
+
+class Command(BaseCommand):
+    help = (
+        'Insère des données synthétiques en volume (bulk_create) pour les benchmarks : '
+        'utilisateurs, posts, commentaires et likes, avec une popularité inégale (Zipf)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--comments', type=int, default=10000)
+        parser.add_argument('--likes', type=int, default=20000)
+        parser.add_argument('--skew', type=float, default=1.1,
+                            help='Exposant de la loi de Zipf (0 = popularité uniforme)')
+        parser.add_argument('--prefix', default='seed', help='Préfixe des noms d\'utilisateur et des slugs')
+        parser.add_argument('--password', default=DEFAULT_PASSWORD, help='Mot de passe de tous les utilisateurs créés')
+        parser.add_argument('--seed', type=int, default=0, help='Graine aléatoire (mêmes données à chaque exécution)')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--flush', action='store_true',
+                            help='Vide d\'abord toute la base (manage.py flush) : à réserver à la base de benchmark')
+        parser.add_argument('--noinput', '--no-input', action='store_false', dest='interactive',
+                            help='Ne demande pas de confirmation pour --flush')
+
+    def handle(self, *args, **options):
+        if options['flush']:
+            call_command('flush', interactive=options['interactive'], verbosity=0)
+        started = time.perf_counter()
+        created = seed(
+            users=options['users'], posts=options['posts'], comments=options['comments'],
+            likes=options['likes'], skew=options['skew'], prefix=options['prefix'],
+            password=options['password'], random_seed=options['seed'], batch_size=options['batch_size'],
+        )
+        summary = ', '.join(f'{count} {table}' for table, count in created.items())
+        self.stdout.write(self.style.SUCCESS(f'Créés en {time.perf_counter() - started:.1f} s : {summary}'))
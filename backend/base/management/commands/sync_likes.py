@@ -1,51 +1,168 @@
-from django.core.management.base import BaseCommand
-from django.db import transaction
-from base.models import Post, Likes
+import json
+import os
+import time
+
+from django.conf import settings
 from django.contrib.auth.models import User
-import logging
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Exists, F, OuterRef, Q
+from django.db.models.constants import OnConflict
+from django.utils import timezone
+from base.counters import _count_subquery, rebuild_counters
+from base.models import Post, Likes, Comment
+from base.response_cache import invalidate
+from base.stats import recompute_stats
+
+# Table de l'ancien ManyToManyField Post.likes, supprimé par la migration 0005
+LEGACY_TABLE = 'base_post_likes'
+
 
 class Command(BaseCommand):
-    help = 'Synchronise les likes existants depuis le champ ManyToManyField vers le modèle Likes'
+    help = (
+        'Vérifie et répare les likes par lots de posts (ordre des ids) : import des likes '
+        'de l\'ancienne table ManyToMany si elle existe encore, suppression des likes orphelins '
+        'et correction des compteurs likes_count / comments_count. Reprend au dernier lot validé.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Nombre de posts par lot (et par transaction)')
+        parser.add_argument('--dry-run', action='store_true', help='Affiche les corrections sans rien écrire')
+        parser.add_argument(
+            '--checkpoint',
+            default=os.path.join(settings.BASE_DIR, '.sync_likes.checkpoint'),
+            help='Fichier de reprise (dernier id de post traité)'
+        )
+        parser.add_argument('--restart', action='store_true', help='Ignore le point de reprise existant')
 
     def handle(self, *args, **options):
-        self.stdout.write(self.style.SUCCESS('Début de la synchronisation des likes...'))
-        
-        # Compteurs pour le rapport
-        likes_total = 0
-        likes_created = 0
-        posts_processed = 0
-        
+        self.dry_run = options['dry_run']
+        chunk_size = options['chunk_size']
+        checkpoint = options['checkpoint']
+        self.has_legacy_table = LEGACY_TABLE in connection.introspection.table_names()
+
+        last_id = 0 if options['restart'] else self._read_checkpoint(checkpoint)
+        if last_id:
+            self.stdout.write(f'Reprise après le post #{last_id}')
+        self.stdout.write(self.style.SUCCESS(
+            'Début de la vérification des likes' + (' (simulation)' if self.dry_run else '') + '...'
+        ))
+
+        totals = {'posts': 0, 'legacy_likes': 0, 'orphan_likes': 0, 'counters': 0}
+        started = time.monotonic()
+
+        while True:
+            # Pagination par clé (id > dernier id traité) : chaque lot coûte le même prix
+            post_ids = list(
+                Post.objects.filter(pk__gt=last_id).order_by('pk')
+                .values_list('pk', flat=True)[:chunk_size]
+            )
+            if not post_ids:
+                break
+            is_last = len(post_ids) < chunk_size
+            with transaction.atomic():
+                report = self._process_chunk(last_id, post_ids, is_last)
+                if self.dry_run:
+                    transaction.set_rollback(True)
+            last_id = post_ids[-1]
+            if not self.dry_run:
+                self._write_checkpoint(checkpoint, last_id)
+
+            for key, value in report.items():
+                totals[key] += value
+            elapsed = max(time.monotonic() - started, 1e-6)
+            self.stdout.write(
+                f'  posts jusqu\'à #{last_id}: {totals["posts"]} traités '
+                f'({totals["posts"] / elapsed:.0f} posts/s)'
+            )
+            if is_last:
+                break
+
+        if not self.dry_run:
+            # Les corrections en SQL direct contournent les signaux des stats
+            recompute_stats()
+            if os.path.exists(checkpoint):
+                os.remove(checkpoint)
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        verb = 'à corriger' if self.dry_run else 'corrigés'
+        self.stdout.write(self.style.SUCCESS(
+            f'Vérification terminée en {elapsed:.1f}s!\n'
+            f'- Posts traités: {totals["posts"]} ({totals["posts"] / elapsed:.0f} posts/s)\n'
+            f'- Likes importés de l\'ancienne table: {totals["legacy_likes"]}\n'
+            f'- Likes orphelins {verb}: {totals["orphan_likes"]}\n'
+            f'- Compteurs {verb}: {totals["counters"]}'
+        ))
+
+    def _process_chunk(self, previous_id, post_ids, is_last):
+        first, last = post_ids[0], post_ids[-1]
+        return {
+            'posts': len(post_ids),
+            'legacy_likes': self._import_legacy_likes(first, last) if self.has_legacy_table else 0,
+            'orphan_likes': self._remove_orphan_likes(previous_id, post_ids, is_last),
+            'counters': self._repair_counters(post_ids),
+        }
+
+    def _import_legacy_likes(self, first, last):
+        """
+        INSERT ... SELECT des likes de l'ancienne table absents de Likes
+        """
+        ops = connection.ops
+        likes_table = ops.quote_name(Likes._meta.db_table)
+        legacy = ops.quote_name(LEGACY_TABLE)
+        if self.dry_run:
+            sql = (
+                f'SELECT COUNT(*) FROM {legacy} l WHERE l.post_id BETWEEN %s AND %s AND NOT EXISTS '
+                f'(SELECT 1 FROM {likes_table} k WHERE k.user_id = l.user_id AND k.post_id = l.post_id)'
+            )
+            with connection.cursor() as cursor:
+                cursor.execute(sql, [first, last])
+                return cursor.fetchone()[0]
+        suffix = ops.on_conflict_suffix_sql([], OnConflict.IGNORE, None, None) or ''
+        sql = (
+            f'{ops.insert_statement(on_conflict=OnConflict.IGNORE)} {likes_table} (user_id, post_id, created_at) '
+            f'SELECT l.user_id, l.post_id, %s FROM {legacy} l WHERE l.post_id BETWEEN %s AND %s {suffix}'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [ops.adapt_datetimefield_value(timezone.now()), first, last])
+            return max(cursor.rowcount, 0)
+
+    def _remove_orphan_likes(self, previous_id, post_ids, is_last):
+        """
+        Likes dont le post (dans l'intervalle du lot) ou l'utilisateur n'existe plus
+        """
+        in_range = Q(post_id__gt=previous_id) if is_last else Q(post_id__gt=previous_id, post_id__lte=post_ids[-1])
+        orphans = Likes.objects.filter(in_range).filter(
+            ~Q(post_id__in=post_ids) | ~Exists(User.objects.filter(pk=OuterRef('user_id')))
+        )
+        if self.dry_run:
+            return orphans.count()
+        # Suppression ensembliste, sans charger les lignes
+        return orphans._raw_delete(orphans.db)
+
+    def _repair_counters(self, post_ids):
+        """
+        Corrige les compteurs dénormalisés qui ne correspondent plus aux tables
+        """
+        drifted = (
+            Post.objects.filter(pk__in=post_ids)
+            .annotate(actual_likes=_count_subquery(Likes), actual_comments=_count_subquery(Comment))
+            .filter(~Q(likes_count=F('actual_likes')) | ~Q(comments_count=F('actual_comments')))
+            .values_list('pk', 'slug')
+        )
+        drifted = list(drifted)
+        if drifted and not self.dry_run:
+            rebuild_counters(Post.objects.filter(pk__in=[pk for pk, _ in drifted]))
+            invalidate('posts', *(f'post:{slug}' for _, slug in drifted))
+        return len(drifted)
+
+    def _read_checkpoint(self, path):
         try:
-            with transaction.atomic():  # Utilisation d'une transaction pour garantir l'atomicité
-                # Parcourir tous les posts qui ont des likes
-                for post in Post.objects.prefetch_related('likes').all():
-                    posts_processed += 1
-                    likes_count = post.likes.count()
-                    likes_total += likes_count
-                    
-                    if likes_count > 0:
-                        self.stdout.write(f'Traitement du post "{post.title}" avec {likes_count} likes')
-                        
-                        # Pour chaque utilisateur qui a aimé le post
-                        for user in post.likes.all():
-                            # Vérifiez si le like existe déjà dans le nouveau modèle
-                            like, created = Likes.objects.get_or_create(
-                                user=user,
-                                post=post
-                            )
-                            
-                            if created:
-                                likes_created += 1
-                                self.stdout.write(f'  - Like créé pour {user.username}')
-        
-            # Afficher un résumé
-            self.stdout.write(self.style.SUCCESS(
-                f'Synchronisation terminée!\n'
-                f'- Posts traités: {posts_processed}\n'
-                f'- Likes existants: {likes_total}\n'
-                f'- Nouveaux likes créés: {likes_created}'
-            ))
-            
-        except Exception as e:
-            self.stderr.write(self.style.ERROR(f'Une erreur est survenue: {str(e)}'))
-            raise
+            with open(path) as handle:
+                return int(json.load(handle)['last_post_id'])
+        except (OSError, ValueError, KeyError):
+            return 0
+
+    def _write_checkpoint(self, path, last_id):
+        with open(path, 'w') as handle:
+            json.dump({'last_post_id': last_id, 'updated': timezone.now().isoformat()}, handle)
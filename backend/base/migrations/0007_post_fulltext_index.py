@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-18 10:05
+
+from django.db import migrations
+
+
+def add_fulltext_index(apps, schema_editor):
+    # Index FULLTEXT propre à MySQL ; les autres bases utilisent l'index en mémoire
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    schema_editor.execute(
+        'ALTER TABLE base_post ADD FULLTEXT INDEX base_post_title_body_ft (title, body)'
+    )
+
+
+def remove_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    schema_editor.execute('ALTER TABLE base_post DROP INDEX base_post_title_body_ft')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0006_post_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_fulltext_index, remove_fulltext_index),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2 on 2026-10-18 17:20
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def dedupe_slugs(apps, schema_editor):
+    # Préalable à la contrainte d'unicité : le plus ancien post garde son
+    # slug, les suivants reçoivent le suffixe -<id> (puis -<id>-2, -<id>-3...
+    # si un autre post porte déjà ce slug)
+    Post = apps.get_model('base', 'Post')
+    duplicated = (
+        Post.objects.values('slug')
+        .annotate(total=Count('id'))
+        .filter(total__gt=1)
+        .values_list('slug', flat=True)
+    )
+    for slug in list(duplicated):
+        for post in Post.objects.filter(slug=slug).order_by('id')[1:]:
+            candidate, attempt = None, 1
+            while candidate is None or Post.objects.filter(slug=candidate).exists():
+                suffix = f'-{post.pk}' if attempt == 1 else f'-{post.pk}-{attempt}'
+                candidate = slug[:200 - len(suffix)] + suffix
+                attempt += 1
+            Post.objects.filter(pk=post.pk).update(slug=candidate)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0008_site_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_slugs, migrations.RunPython.noop),
+    ]
@@ -16,21 +16,36 @@ class Post(models.Model):
     )
 
     title = models.CharField(max_length=200)
-    slug = models.SlugField(max_length=200)
+    # Clé de toutes les URLs publiques : unique (et donc indexé)
+    slug = models.SlugField(max_length=200, unique=True)
     body = models.TextField()
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
     status = models.CharField(choices=STATUS_CHOICES, default='draft', max_length=10)
     publish = models.DateTimeField(default=timezone.now)
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='posted')
+    # Compteurs dénormalisés, maintenus par les signaux de base.signals
+    likes_count = models.PositiveIntegerField(default=0, editable=False)
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
     objects = models.Manager()
     published = PublishedManager()
+
+    class Meta:
+        indexes = [
+            # Liste publique (PublishedManager, tri par date de publication)
+            models.Index(fields=['status', '-publish'], name='base_post_status_publish_idx'),
+            # Filtre par statut de l'administration, trié par date de création
+            models.Index(fields=['status', '-created'], name='base_post_status_created_idx'),
+            # Pagination par curseur de l'API (-created, id)
+            models.Index(fields=['-created', 'id'], name='base_post_created_id_idx'),
+        ]
+
     def __str__(self):
         return self.title
         
     def total_likes(self):
-        # Utilise le nouveau modèle Likes au lieu du ManyToManyField
-        return Likes.objects.filter(post=self).count()
+        # Lit le compteur dénormalisé au lieu de compter les lignes de Likes
+        return self.likes_count
 
 class Comment(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='comments')
@@ -40,6 +55,12 @@ class Comment(models.Model):
     body = models.TextField()
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Commentaires d'un post, du plus récent au plus ancien (pagination par curseur)
+            models.Index(fields=['post', '-created', 'id'], name='base_comment_post_created_idx'),
+        ]
     
     def __str__(self):
         return self.post.title
@@ -58,6 +79,32 @@ class Likes(models.Model):
         verbose_name_plural = _('Likes')
         unique_together = ('user', 'post')  # Ensure a user can like a post only once
         ordering = ['-created_at']
+        indexes = [
+            # Likes d'un post et likes d'un utilisateur, du plus récent au plus ancien
+            models.Index(fields=['post', '-created_at', 'id'], name='base_likes_post_created_idx'),
+            models.Index(fields=['user', '-created_at', 'id'], name='base_likes_user_created_idx'),
+        ]
     
     def __str__(self):
-        return f"{self.user.username} likes {self.post.title}"
\ No newline at end of file
+        return f"{self.user.username} likes {self.post.title}"
+
+class SiteStats(models.Model):
+    """
+    Ligne unique (pk=1) des totaux du tableau de bord d'administration,
+    tenue à jour par les signaux de base.signals et recalculée
+    périodiquement par base.stats.recompute_stats()
+    """
+    users_count = models.PositiveIntegerField(default=0)
+    posts_count = models.PositiveIntegerField(default=0)
+    published_posts = models.PositiveIntegerField(default=0)
+    draft_posts = models.PositiveIntegerField(default=0)
+    comments_count = models.PositiveIntegerField(default=0)
+    likes_count = models.PositiveIntegerField(default=0)
+    recomputed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = _('Site stats')
+        verbose_name_plural = _('Site stats')
+
+    def __str__(self):
+        return f"Stats ({self.recomputed_at})"
@@ -0,0 +1,119 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Pagination par curseur opaque : chaque page est lue avec un filtre sur la
+    clé de tri au lieu d'un OFFSET, donc une page profonde coûte autant que
+    la première
+    """
+    ordering = ('-created', 'id')
+    page_size_query_param = 'size'
+    max_page_size = 100
+
+    # Le total n'est calculé que sur demande (?with_count=1), car il
+    # impose un COUNT(*) sur toute la table
+    count_query_param = 'with_count'
+    count_header = 'X-Total-Count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.total_count = None
+        if request.query_params.get(self.count_query_param) in ('1', 'true'):
+            self.total_count = queryset.order_by().count()
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.total_count is not None:
+            response[self.count_header] = str(self.total_count)
+        return response
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Version asynchrone de paginate_queryset (même algorithme que DRF,
+        mêmes curseurs), qui lit la page avec l'ORM asynchrone
+        """
+        self.total_count = None
+        if request.query_params.get(self.count_query_param) in ('1', 'true'):
+            self.total_count = await queryset.order_by().acount()
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        offset, reverse, current_position = self.cursor or (0, False, None)
+
+        ordering = _reverse_ordering(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if current_position is not None:
+            order = self.ordering[0]
+            lookup = 'lt' if self.cursor.reverse != order.startswith('-') else 'gt'
+            queryset = queryset.filter(**{f"{order.lstrip('-')}__{lookup}": current_position})
+
+        results = [item async for item in queryset[offset:offset + self.page_size + 1]]
+        self.page = results[:self.page_size]
+        has_following_position = len(results) > len(self.page)
+        following_position = (
+            self._get_position_from_instance(results[-1], self.ordering) if has_following_position else None
+        )
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = current_position is not None or offset > 0
+            self.has_previous = has_following_position
+            self.next_position = current_position
+            self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None or offset > 0
+            self.next_position = following_position
+            self.previous_position = current_position
+        return self.page
+
+    def get_paginated_data(self, data):
+        # Corps de get_paginated_response, pour les vues hors DRF
+        return {'next': self.get_next_link(), 'previous': self.get_previous_link(), 'results': data}
+
+
+class PostPagination(KeysetPagination):
+    ordering = ('-created', 'id')
+
+
+class SearchPagination(KeysetPagination):
+    # Résultats de recherche : tri par pertinence (annotation search_rank)
+    ordering = ('-search_rank', 'id')
+
+
+class CommentPagination(KeysetPagination):
+    ordering = ('-created', 'id')
+
+
+class EmbeddedCommentPagination(CommentPagination):
+    """
+    Premiers commentaires intégrés au détail d'un post : COMMENTS_EMBED_LIMIT
+    commentaires, la suite se lit sur l'endpoint paginé des commentaires
+    """
+    page_size_query_param = None
+
+    def get_page_size(self, request):
+        return settings.COMMENTS_EMBED_LIMIT
+
+
+class LikesPagination(KeysetPagination):
+    ordering = ('-created_at', 'id')
+
+
+class UserPagination(KeysetPagination):
+    ordering = ('-date_joined', 'id')
+
+
+def paginate(request, queryset, serializer_class, pagination_class, **serializer_kwargs):
+    """
+    Applique la pagination par curseur dans une vue fonction (@api_view)
+    """
+    paginator = pagination_class()
+    page = paginator.paginate_queryset(queryset, request)
+    serializer = serializer_class(page, many=True, **serializer_kwargs)
+    return paginator.get_paginated_response(serializer.data)
@@ -0,0 +1,167 @@
+"""
+Instrumentation SQL par requête HTTP : nombre de requêtes, durée totale
+en base et formes de requêtes répétées (N+1), comparés au budget déclaré
+par l'endpoint.
+
+    @query_budget(4)                       # vue fonction, au-dessus de @api_view
+    class PostViewSet(...):
+        query_budgets = {'list': 4, 'retrieve': 5}
+
+QueryBudgetMiddleware (backend.middleware) applique ces budgets quand
+QUERY_BUDGET_ENABLED est vrai : avertissement ou exception selon
+QUERY_BUDGET_MODE.
+"""
+import logging
+import re
+import time
+import warnings
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+# Enregistreurs actifs dans le contexte courant (requêtes imbriquées comprises)
+_recorders = ContextVar('query_recorders', default=())
+
+_IN_LIST_RE = re.compile(r'\bIN \((?:%s, )*%s\)', re.IGNORECASE)
+_SPACES_RE = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryBudgetWarning(RuntimeWarning):
+    pass
+
+
+def fingerprint(sql):
+    """
+    Forme d'une requête : SQL paramétré, espaces normalisés et listes
+    IN (...) réduites, pour reconnaître la même requête répétée
+    """
+    return _IN_LIST_RE.sub('IN (...)', _SPACES_RE.sub(' ', sql.strip()))
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def add(self, sql, duration):
+        self.count += 1
+        self.duration += duration
+        self.shapes[fingerprint(sql)] += 1
+
+    def duplicates(self, threshold):
+        """
+        Formes exécutées au moins `threshold` fois, les plus fréquentes d'abord
+        """
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+def _record(execute, sql, params, many, context):
+    recorders = _recorders.get()
+    if not recorders:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - started
+        for stats in recorders:
+            stats.add(sql, duration)
+
+
+@receiver(connection_created)
+def install(connection, **kwargs):
+    # Le wrapper ne coûte qu'une lecture de ContextVar hors enregistrement
+    if _record not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record)
+
+
+def start_recording():
+    """
+    Commence à compter les requêtes SQL du contexte courant, sur toutes les
+    bases et dans les threads de sync_to_async (le contexte y est propagé) ;
+    retourne les statistiques et le jeton à passer à stop_recording
+    """
+    for connection in connections.all(initialized_only=True):
+        install(connection)
+    stats = QueryStats()
+    return stats, _recorders.set(_recorders.get() + (stats,))
+
+
+def stop_recording(token):
+    _recorders.reset(token)
+
+
+@contextmanager
+def record_queries():
+    stats, token = start_recording()
+    try:
+        yield stats
+    finally:
+        stop_recording(token)
+
+
+def query_budget(queries, duplicates=None):
+    """
+    Déclare le budget d'une vue fonction : `queries` requêtes au plus, et
+    une même forme de requête au plus `duplicates` fois (par défaut
+    QUERY_BUDGET_DUPLICATES). À placer au-dessus de @api_view.
+    """
+    def decorator(view):
+        view.query_budget = (queries, duplicates)
+        return view
+    return decorator
+
+
+def get_budget(view_func, request):
+    """
+    Budget (requêtes, répétitions) déclaré pour la vue, ou None
+    """
+    budget = getattr(view_func, 'query_budget', None)
+    if budget is not None:
+        return budget
+    view_class = getattr(view_func, 'cls', None)
+    actions = getattr(view_func, 'actions', None) or {}
+    budgets = getattr(view_class, 'query_budgets', None)
+    if budgets is None:
+        return None
+    action = actions.get(request.method.lower())
+    if action is None and request.method == 'HEAD':
+        action = actions.get('get')
+    queries = budgets.get(action)
+    return None if queries is None else (queries, None)
+
+
+def check_budget(stats, budget, label):
+    """
+    Dépassements constatés, sous forme de messages
+    """
+    queries, duplicates = budget or (None, None)
+    duplicates = duplicates or settings.QUERY_BUDGET_DUPLICATES
+    problems = []
+    if queries is not None and stats.count > queries:
+        problems.append(f'{label} : {stats.count} requêtes SQL pour un budget de {queries}')
+    for shape, count in stats.duplicates(duplicates):
+        problems.append(f'{label} : requête répétée {count} fois (N+1 ?) : {shape}')
+    return problems
+
+
+def enforce(problems):
+    if not problems:
+        return
+    if settings.QUERY_BUDGET_MODE == 'raise':
+        raise QueryBudgetExceeded('\n'.join(problems))
+    for problem in problems:
+        logger.warning(problem)
+        warnings.warn(problem, QueryBudgetWarning, stacklevel=2)
@@ -2,9 +2,11 @@ import os
 import json
 from django.shortcuts import render
 from django.views.decorators.csrf import ensure_csrf_cookie
+from django.views.decorators.cache import cache_control
 from django.conf import settings
 
 @ensure_csrf_cookie
+@cache_control(no_cache=True)
 def react_app(request):
     """
     Vue principale pour servir l'application React depuis Django
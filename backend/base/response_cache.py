@@ -0,0 +1,166 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import parse_http_date_safe
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from backend.db_router import reads_pinned
+
+KEY_PREFIX = 'resp'
+STATS_KEYS = {
+    'hits': f'{KEY_PREFIX}:stats:hits',
+    'misses': f'{KEY_PREFIX}:stats:misses',
+}
+
+
+def get_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def _generation_key(group):
+    return f'{KEY_PREFIX}:gen:{group}'
+
+
+def _incr(cache, key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Clé absente (premier appel ou éviction) : on repart de 1
+        cache.set(key, 1, timeout=None)
+        return 1
+
+
+def _new_generation():
+    # Point de départ d'une génération absente (premier appel, éviction) :
+    # l'horloge en millisecondes, pour ne pas reprendre une valeur déjà
+    # servie dans un ETag
+    return int(time.time() * 1000)
+
+
+def _bump(cache, key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        generation = _new_generation()
+        cache.set(key, generation, timeout=None)
+        return generation
+
+
+def generations(*groups):
+    """
+    Génération courante de chaque groupe, en une lecture de cache ; sert de
+    validateur bon marché (ETag) aux vues dont invalidate() suit les écritures
+    """
+    cache = get_cache()
+    keys = [_generation_key(group) for group in groups]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, _new_generation(), timeout=None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+def _response_key(cache, groups, request):
+    """
+    Clé dérivée du chemin, de la query string, du profil (anonyme ou
+    authentifié) et de la génération courante de chaque groupe
+    """
+    generation_keys = [_generation_key(group) for group in groups]
+    generations = cache.get_many(generation_keys)
+    versions = ':'.join(str(generations.get(key, 0)) for key in generation_keys)
+    audience = 'auth' if request.user.is_authenticated else 'anon'
+    raw = f'{request.path}?{request.META.get("QUERY_STRING", "")}|{audience}'
+    digest = hashlib.md5(raw.encode('utf-8')).hexdigest()
+    return f'{KEY_PREFIX}:{"+".join(groups)}:{versions}:{digest}'
+
+
+def _cache_control(headers):
+    # Reprendre la politique Cache-Control de la réponse d'origine
+    if 'Cache-Control' not in headers:
+        return {}
+    return {
+        directive.strip().split('=')[0].replace('-', '_'): True
+        for directive in headers['Cache-Control'].split(',')
+    }
+
+
+def cache_response(*groups):
+    """
+    Met en cache les données des réponses 200 d'une vue de lecture DRF.
+    Les groupes peuvent référencer les arguments d'URL, ex. 'post:{slug}' ;
+    invalidate() sur un groupe rend obsolètes toutes ses entrées. Les
+    validateurs (ETag, Last-Modified) sont mis en cache avec la réponse :
+    un hit conditionnel répond 304 sans aucune requête SQL.
+    À placer sous @api_view ou sur une méthode de ViewSet, après
+    l'authentification et les permissions.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(*args, **kwargs):
+            request = next(arg for arg in args if isinstance(arg, Request))
+            if request.method != 'GET':
+                return view(*args, **kwargs)
+
+            cache = get_cache()
+            key = _response_key(cache, [group.format(**kwargs) for group in groups], request)
+            # Un client épinglé sur la base principale (lecture après écriture)
+            # ne doit pas recevoir une réponse construite depuis un réplica en retard
+            cached = None if reads_pinned() else cache.get(key)
+            if cached is not None:
+                _incr(cache, STATS_KEYS['hits'])
+                data, headers = cached
+                # Requête conditionnelle : comparer aux validateurs mis en cache
+                response = get_conditional_response(
+                    request,
+                    etag=headers.get('ETag'),
+                    last_modified=parse_http_date_safe(headers.get('Last-Modified')),
+                )
+                if response is None:
+                    response = Response(data, headers=headers)
+                else:
+                    patch_cache_control(response, **_cache_control(headers))
+                response['X-Cache'] = 'HIT'
+                return response
+
+            _incr(cache, STATS_KEYS['misses'])
+            response = view(*args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                cache.set(key, (response.data, dict(response.items())), settings.RESPONSE_CACHE_TIMEOUT)
+            response['X-Cache'] = 'MISS'
+            return response
+        return wrapped
+    return decorator
+
+
+def invalidate(*groups):
+    """
+    Invalide les groupes immédiatement puis de nouveau après la validation
+    de la transaction, pour ne pas laisser une lecture concurrente remettre
+    en cache l'état antérieur
+    """
+    def bump():
+        cache = get_cache()
+        for group in groups:
+            _bump(cache, _generation_key(group))
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def cache_stats():
+    """
+    Compteurs de hits/misses du cache de réponses
+    """
+    values = get_cache().get_many(list(STATS_KEYS.values()))
+    stats = {name: values.get(key, 0) for name, key in STATS_KEYS.items()}
+    total = stats['hits'] + stats['misses']
+    stats['hit_ratio'] = round(stats['hits'] / total, 3) if total else 0.0
+    return stats
@@ -0,0 +1,191 @@
+"""
+Sérialisation rapide des listes en lecture seule : les lignes sont lues
+avec `.values()` (seulement les colonnes utiles, jointures comprises) puis
+converties par une fonction générée une fois pour toutes à la définition
+de la classe, sans instancier de modèle ni parcourir les champs DRF.
+Avec une sélection de champs (base.fieldsets), seules les colonnes et
+jointures utiles sont lues.
+
+Le JSON produit est identique octet par octet à celui des serializers de
+base.serializers (mêmes clés, même ordre, mêmes formats de date).
+"""
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+from .fieldsets import select
+
+
+class Field:
+    """
+    Colonne lue telle quelle (`source` : chemin values(), par défaut le nom
+    de la clé) ; les dates passent par la même conversion que DRF
+    """
+    def __init__(self, source=None, datetime=False):
+        self.source = source
+        self.datetime = datetime
+
+    def expression(self, name, prefix, lookups, fieldset):
+        lookup = prefix + (self.source or name)
+        lookups.append(lookup)
+        value = f'row[{lookup!r}]'
+        return f'datetime({value})' if self.datetime else value
+
+
+class Constant:
+    """
+    Valeur fixe, pour les champs DRF sans colonne (read_only avec default)
+    """
+    def __init__(self, value):
+        self.value = value
+
+    def expression(self, name, prefix, lookups, fieldset):
+        return repr(self.value)
+
+
+class Nested:
+    """
+    Objet imbriqué lu par jointure ; la relation ne doit pas être nullable
+    """
+    def __init__(self, row_serializer, source=None):
+        self.row_serializer = row_serializer
+        self.source = source
+
+    def expression(self, name, prefix, lookups, fieldset):
+        return _dict_expression(
+            self.row_serializer.fields, f'{prefix}{self.source or name}__', lookups,
+            fieldset.nested(name) if fieldset else None,
+        )
+
+
+def _dict_expression(fields, prefix, lookups, fieldset):
+    items = (
+        f'{name!r}: {field.expression(name, prefix, lookups, fieldset)}'
+        for name, field in select(fields, fieldset).items()
+    )
+    return '{' + ', '.join(items) + '}'
+
+
+@lru_cache(maxsize=256)
+def _compile(row_serializer_class, fieldset):
+    """
+    Colonnes values() et fonction de conversion d'une ligne, pour une
+    sélection de champs donnée
+    """
+    lookups = []
+    expression = _dict_expression(row_serializer_class.fields, '', lookups, fieldset)
+    source = f'lambda row, datetime: {expression}'
+    mapper = eval(compile(source, f'<{row_serializer_class.__name__}>', 'eval'), {'__builtins__': {}})
+    return tuple(dict.fromkeys(lookups)), mapper
+
+
+def _iso_datetime(value):
+    # DateTimeField.to_representation de DRF avec USE_TZ et le format ISO 8601
+    if not value:
+        return None
+    value = value.astimezone(timezone.get_current_timezone()).isoformat()
+    return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+
+def _datetime_converter():
+    if settings.USE_TZ and (api_settings.DATETIME_FORMAT or '').lower() == ISO_8601:
+        return _iso_datetime
+    return serializers.DateTimeField().to_representation
+
+
+class RowSerializer:
+    """
+    Équivalent en lecture seule d'un ModelSerializer, à partir de lignes
+    values() : `fields` associe chaque clé de sortie (dans l'ordre du
+    serializer d'origine) à un Field, un Constant ou un Nested.
+
+        rows = PostRowSerializer.rows(queryset, fieldset=fieldset)
+        PostRowSerializer(rows, many=True, fieldset=fieldset).data
+    """
+    fields = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Compilé à la définition de la classe pour la réponse complète
+        cls.lookups = _compile(cls, None)[0]
+
+    def __init__(self, instance, many=False, fieldset=None):
+        self.instance = instance
+        self.many = many
+        self.fieldset = fieldset
+
+    @classmethod
+    def rows(cls, queryset, ordering=(), fieldset=None):
+        """
+        Lignes values() du queryset ; les champs de tri de la pagination
+        (ex. search_rank) sont ajoutés pour le calcul des curseurs
+        """
+        lookups = _compile(cls, fieldset)[0]
+        extra = [name.lstrip('-') for name in ordering if name.lstrip('-') not in lookups]
+        return queryset.values(*lookups, *extra) if lookups or extra else queryset.values('pk')
+
+    @property
+    def data(self):
+        mapper, datetime = _compile(type(self), self.fieldset)[1], _datetime_converter()
+        if self.many:
+            return [mapper(row, datetime) for row in self.instance]
+        return mapper(self.instance, datetime)
+
+
+class UserRowSerializer(RowSerializer):
+    # base.serializers.UserSerializer
+    fields = {
+        'id': Field(),
+        'username': Field(),
+        'email': Field(),
+    }
+
+
+class PostRowSerializer(RowSerializer):
+    # base.serializers.PostSerializer
+    fields = {
+        'id': Field(),
+        'title': Field(),
+        'content': Field('body'),
+        'created': Field(datetime=True),
+        'slug': Field(),
+        'featured': Constant(False),
+        'author': Nested(UserRowSerializer),
+        'likes_count': Field(),
+    }
+
+
+class CommentRowSerializer(RowSerializer):
+    # base.serializers.CommentSerializer (sans les champs write_only)
+    fields = {
+        'id': Field(),
+        'username': Field(),
+        'email': Field(),
+        'author': Nested(UserRowSerializer),
+        'body': Field(),
+        'created': Field(datetime=True),
+        'updated': Field(datetime=True),
+    }
+
+
+class LikeRowSerializer(RowSerializer):
+    # base.serializers.LikeSerializer (sans les champs write_only)
+    fields = {
+        'id': Field(),
+        'user': Nested(UserRowSerializer),
+        'post': Nested(PostRowSerializer),
+        'created_at': Field(datetime=True),
+    }
+
+
+def paginate_rows(request, queryset, row_serializer_class, pagination_class, fieldset=None):
+    """
+    Comme pagination.paginate, mais sur les lignes values() d'un RowSerializer
+    """
+    paginator = pagination_class()
+    rows = row_serializer_class.rows(queryset, paginator.ordering, fieldset)
+    page = paginator.paginate_queryset(rows, request)
+    return paginator.get_paginated_response(row_serializer_class(page, many=True, fieldset=fieldset).data)
@@ -0,0 +1,257 @@
+import bisect
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import Case, FloatField, IntegerField, Value, When
+from django.db.models.expressions import RawSQL
+from django.dispatch import receiver
+from django.test.signals import setting_changed
+from django.utils.module_loading import import_string
+
+from .models import Post
+
+TOKEN_RE = re.compile(r'\w+')
+
+# Poids de chaque champ dans le score d'un post
+FIELD_WEIGHTS = {
+    'title': 3,
+    'author': 2,
+    'body': 1,
+}
+
+
+def tokenize(text):
+    """
+    Découpe un texte en termes normalisés (minuscules, sans accents)
+    """
+    if not text:
+        return []
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return TOKEN_RE.findall(text)
+
+
+class InvertedIndex:
+    """
+    Index inversé en mémoire : terme -> {id du document: poids}
+    """
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings = defaultdict(dict)
+        self._documents = {}
+        # Vocabulaire trié, pour la recherche par préfixe
+        self._vocabulary = []
+
+    def __len__(self):
+        return len(self._documents)
+
+    def add(self, doc_id, fields):
+        """
+        Indexe (ou réindexe) un document ; `fields` associe un nom de champ
+        de FIELD_WEIGHTS à son texte
+        """
+        weights = defaultdict(int)
+        for name, text in fields.items():
+            for term in tokenize(text):
+                weights[term] += FIELD_WEIGHTS[name]
+        with self._lock:
+            self._remove(doc_id)
+            for term, weight in weights.items():
+                if term not in self._postings:
+                    bisect.insort(self._vocabulary, term)
+                self._postings[term][doc_id] = weight
+            self._documents[doc_id] = set(weights)
+
+    def remove(self, doc_id):
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id):
+        for term in self._documents.pop(doc_id, ()):
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, term)]
+
+    def _expand(self, term):
+        # Le dernier terme de la requête est traité comme un préfixe
+        start = bisect.bisect_left(self._vocabulary, term)
+        end = bisect.bisect_left(self._vocabulary, term + '\uffff')
+        return self._vocabulary[start:end]
+
+    def search(self, query, limit=None):
+        """
+        Retourne les couples (id, score) des documents contenant tous les
+        termes de la requête, du plus pertinent au moins pertinent
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+        with self._lock:
+            scores = None
+            for position, term in enumerate(terms):
+                if position == len(terms) - 1:
+                    candidates = self._expand(term)
+                else:
+                    candidates = [term] if term in self._postings else []
+                matches = defaultdict(int)
+                for candidate in candidates:
+                    for doc_id, weight in self._postings[candidate].items():
+                        matches[doc_id] += weight
+                if scores is None:
+                    scores = matches
+                else:
+                    scores = {doc_id: score + matches[doc_id] for doc_id, score in scores.items() if doc_id in matches}
+                if not scores:
+                    return []
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+        return ranked[:limit] if limit else ranked
+
+
+class BaseSearchBackend:
+    """
+    Interface commune des moteurs de recherche de posts. `search` annote
+    chaque post retenu avec `search_rank` (plus grand = plus pertinent)
+    et trie par pertinence.
+    """
+    def search(self, queryset, query):
+        raise NotImplementedError
+
+    def empty(self, queryset):
+        # Garder l'annotation pour que le tri par pertinence reste valide
+        return queryset.annotate(search_rank=Value(0)).none()
+
+    def index_post(self, post):
+        pass
+
+    def remove_post(self, post_id):
+        pass
+
+
+class InMemorySearchBackend(BaseSearchBackend):
+    """
+    Index inversé en mémoire du processus, construit au premier appel puis
+    tenu à jour par les signaux de Post. Sert pour SQLite et les tests.
+    """
+    max_results = 1000
+
+    def __init__(self):
+        self.index = InvertedIndex()
+        self._built = False
+        self._build_lock = threading.Lock()
+        # author_id -> username, pour réindexer sans relire auth_user
+        self._usernames = {}
+
+    def _ensure_built(self):
+        if self._built:
+            return
+        with self._build_lock:
+            if self._built:
+                return
+            rows = Post.objects.values_list('id', 'title', 'body', 'author_id', 'author__username')
+            for post_id, title, body, author_id, username in rows.iterator(chunk_size=500):
+                self._usernames[author_id] = username
+                self.index.add(post_id, {'title': title, 'body': body, 'author': username})
+            self._built = True
+
+    def reset(self):
+        self.index = InvertedIndex()
+        self._built = False
+        self._usernames = {}
+
+    def _username(self, post):
+        # Auteur déjà chargé, sinon déjà connu de l'index : pas de requête
+        if Post._meta.get_field('author').is_cached(post):
+            self._usernames[post.author_id] = post.author.username
+        elif post.author_id not in self._usernames:
+            self._usernames[post.author_id] = (
+                User.objects.filter(pk=post.author_id).values_list('username', flat=True).first()
+            )
+        return self._usernames[post.author_id]
+
+    def index_post(self, post):
+        if self._built:
+            self.index.add(post.pk, {'title': post.title, 'body': post.body, 'author': self._username(post)})
+
+    def remove_post(self, post_id):
+        if self._built:
+            self.index.remove(post_id)
+
+    def search(self, queryset, query):
+        self._ensure_built()
+        ranked = self.index.search(query, limit=self.max_results)
+        if not ranked:
+            return self.empty(queryset)
+        rank = Case(
+            *[When(pk=post_id, then=Value(score)) for post_id, score in ranked],
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+        return (
+            queryset.filter(pk__in=[post_id for post_id, _ in ranked])
+            .annotate(search_rank=rank)
+            .order_by('-search_rank', 'id')
+        )
+
+
+class MySQLFulltextSearchBackend(BaseSearchBackend):
+    """
+    Recherche via l'index FULLTEXT (title, body) de MySQL, en mode langage
+    naturel ; le nom d'auteur exact est aussi accepté.
+
+    Un OR entre MATCH et le nom d'auteur (via la jointure auth_user)
+    empêcherait MySQL d'utiliser l'index FULLTEXT : les deux recherches
+    sont faites séparément, chacune sur son index (FULLTEXT, puis unique
+    de username et clé étrangère author_id), et leurs ids fusionnés.
+    """
+    max_results = 1000
+
+    def _score(self, query):
+        table = connection.ops.quote_name(Post._meta.db_table)
+        return RawSQL(
+            f'MATCH ({table}.`title`, {table}.`body`) AGAINST (%s IN NATURAL LANGUAGE MODE)',
+            (query,),
+            output_field=FloatField(),
+        )
+
+    def search(self, queryset, query):
+        if not tokenize(query):
+            return self.empty(queryset)
+        matched = list(
+            Post.objects.annotate(search_rank=self._score(query))
+            .filter(search_rank__gt=0)
+            .order_by('-search_rank')
+            .values_list('id', flat=True)[:self.max_results]
+        )
+        author_ids = list(User.objects.filter(username__iexact=query).values_list('id', flat=True))
+        if author_ids:
+            matched += Post.objects.filter(author_id__in=author_ids).values_list('id', flat=True)[:self.max_results]
+        if not matched:
+            return self.empty(queryset)
+        return (
+            queryset.filter(pk__in=set(matched))
+            .annotate(search_rank=self._score(query))
+            .order_by('-search_rank', 'id')
+        )
+
+
+@lru_cache(maxsize=None)
+def get_search_backend():
+    """
+    Retourne l'instance (unique par processus) du moteur configuré par
+    settings.SEARCH_BACKEND
+    """
+    return import_string(settings.SEARCH_BACKEND)()
+
+
+@receiver(setting_changed)
+def reset_search_backend(setting, **kwargs):
+    if setting == 'SEARCH_BACKEND':
+        get_search_backend.cache_clear()
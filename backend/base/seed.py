@@ -0,0 +1,133 @@
+"""
+Données synthétiques en volume pour les benchmarks (manage.py seed_data) :
+utilisateurs, posts, commentaires et likes insérés par bulk_create, sans
+passer par les signaux. La popularité suit une loi de Zipf : quelques
+posts concentrent la plupart des likes et des commentaires, quelques
+utilisateurs écrivent la plupart des posts. Les compteurs dénormalisés,
+les statistiques et l'index de recherche sont recalculés à la fin.
+"""
+import random
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from accounts.backends import forget_users
+
+from .counters import rebuild_counters
+from .models import Post, Likes, Comment
+from .response_cache import invalidate
+from .search import get_search_backend
+from .stats import recompute_stats
+
+DEFAULT_PASSWORD = 'bench-motdepasse'
+
+WORDS = (
+    'django', 'python', 'react', 'cache', 'requête', 'index', 'serveur', 'client', 'latence',
+    'débit', 'mémoire', 'thread', 'async', 'curseur', 'pagination', 'recherche', 'session',
+    'jeton', 'profil', 'base', 'données', 'réplica', 'transaction', 'verrou', 'signal',
+    'compteur', 'commentaire', 'article', 'blog', 'auteur', 'lecture', 'écriture', 'mesure',
+    'rapide', 'lent', 'simple', 'nouveau', 'ancien', 'grand', 'petit', 'premier', 'dernier',
+    'projet', 'code', 'test', 'version', 'module', 'vue', 'modèle', 'route', 'réponse',
+)
+
+
+def zipf_weights(count, skew):
+    """
+    Poids cumulés des rangs 0..count-1, le rang r pesant 1 / (r + 1) ** skew
+    (skew = 0 : distribution uniforme)
+    """
+    return list(accumulate(1 / (rank + 1) ** skew for rank in range(count)))
+
+
+def _text(rng, low, high):
+    return ' '.join(rng.choices(WORDS, k=rng.randint(low, high)))
+
+
+def _new_ids(model, after):
+    # bulk_create ne renvoie pas les clés primaires sur MySQL : on les relit
+    return list(model.objects.filter(pk__gt=after).order_by('pk').values_list('pk', flat=True))
+
+
+def _last_pk(model):
+    return model.objects.aggregate(last=Max('pk'))['last'] or 0
+
+
+def seed(users=200, posts=1000, comments=10000, likes=20000, skew=1.1, prefix='seed',
+         password=DEFAULT_PASSWORD, random_seed=0, batch_size=1000):
+    """
+    Ajoute les volumes demandés et retourne le nombre de lignes créées par
+    table. Le premier utilisateur créé est membre du staff (endpoints
+    d'administration) ; tous partagent le mot de passe `password`.
+    """
+    rng = random.Random(random_seed)
+    now = timezone.now()
+    offset = User.objects.filter(username__startswith=prefix).count()
+
+    with transaction.atomic():
+        after = _last_pk(User)
+        hashed = make_password(password)
+        User.objects.bulk_create(
+            [User(username=f'{prefix}{offset + index}', email=f'{prefix}{offset + index}@example.com',
+                  password=hashed, is_staff=index == 0, date_joined=now)
+             for index in range(users)],
+            batch_size=batch_size,
+        )
+        usernames = dict(User.objects.filter(pk__gt=after).values_list('pk', 'username'))
+        user_ids = sorted(usernames)
+        user_weights = zipf_weights(len(user_ids), skew)
+
+        after = _last_pk(Post)
+        post_offset = Post.objects.filter(slug__startswith=f'{prefix}-').count()
+        authors = rng.choices(user_ids, cum_weights=user_weights, k=posts) if user_ids else []
+        Post.objects.bulk_create(
+            [Post(title=_text(rng, 3, 8).capitalize(), slug=f'{prefix}-{post_offset + index}',
+                  body=_text(rng, 40, 120), author_id=author,
+                  status='published' if rng.random() < 0.9 else 'draft',
+                  publish=now - timedelta(minutes=rng.randrange(525600)))
+             for index, author in enumerate(authors)],
+            batch_size=batch_size,
+        )
+        post_ids = _new_ids(Post, after)
+        # Popularité indépendante de l'ordre de création
+        popular = post_ids[:]
+        rng.shuffle(popular)
+        post_weights = zipf_weights(len(popular), skew)
+
+        created_comments = 0
+        if popular and user_ids:
+            for start in range(0, comments, batch_size):
+                size = min(batch_size, comments - start)
+                targets = zip(rng.choices(popular, cum_weights=post_weights, k=size),
+                              rng.choices(user_ids, cum_weights=user_weights, k=size))
+                created_comments += len(Comment.objects.bulk_create([
+                    Comment(post_id=post_id, author_id=author_id, username=usernames[author_id],
+                            email=f'{usernames[author_id]}@example.com', body=_text(rng, 5, 40))
+                    for post_id, author_id in targets
+                ]))
+
+        # Un like par couple (utilisateur, post) : on tire jusqu'à atteindre la
+        # cible, borné pour les distributions très concentrées
+        target = min(likes, len(user_ids) * len(popular))
+        pairs, attempts = set(), 0
+        while len(pairs) < target and attempts < target * 20:
+            size = target - len(pairs)
+            attempts += size
+            pairs.update(zip(rng.choices(user_ids, k=size), rng.choices(popular, cum_weights=post_weights, k=size)))
+        Likes.objects.bulk_create([Likes(user_id=user_id, post_id=post_id) for user_id, post_id in pairs],
+                                  batch_size=batch_size)
+
+        if post_ids:
+            rebuild_counters(Post.objects.filter(pk__gte=post_ids[0]))
+
+    recompute_stats()
+    get_search_backend().reset()
+    invalidate('posts')
+    # bulk_create ne déclenche pas post_save : un utilisateur resté en cache
+    # (accounts.backends) sous un id réutilisé serait servi à la place du nouveau
+    forget_users(user_ids)
+    return {'users': len(user_ids), 'posts': len(post_ids), 'comments': created_comments, 'likes': len(pairs)}
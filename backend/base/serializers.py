@@ -1,24 +1,26 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from .models import Post, Likes, Comment
+from .fieldsets import SparseFieldsetMixin
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'email']
 
-class PostSerializer(serializers.ModelSerializer):
+class PostSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
-    likes_count = serializers.SerializerMethodField()
+    # Le client React lit `content` : on l'alimente depuis le champ body du modèle
+    content = serializers.CharField(source='body', read_only=True)
+    featured = serializers.BooleanField(read_only=True, default=False)
+    # Compteur dénormalisé, aucune requête COUNT par post
+    likes_count = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = Post
         fields = ['id', 'title', 'content', 'created', 'slug', 'featured', 'author', 'likes_count']
-    
-    def get_likes_count(self, obj):
-        return obj.total_likes()
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
     author_id = serializers.PrimaryKeyRelatedField(source='author', queryset=User.objects.all(), write_only=True)
     post_id = serializers.PrimaryKeyRelatedField(source='post', queryset=Post.objects.all(), write_only=True)
@@ -28,7 +30,7 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = ['id', 'post_id', 'username', 'email', 'author', 'author_id', 'body', 'created', 'updated']
         read_only_fields = ['id', 'created', 'updated']
 
-class LikeSerializer(serializers.ModelSerializer):
+class LikeSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     post = PostSerializer(read_only=True)
     post_id = serializers.PrimaryKeyRelatedField(source='post', queryset=Post.objects.all(), write_only=True)
@@ -0,0 +1,227 @@
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import QuerySet
+from django.dispatch import receiver
+
+from .counters import adjust_likes, adjust_comments
+from .models import Post, Likes, Comment
+from .search import get_search_backend
+from .response_cache import invalidate
+from .liked_set import record_change
+from .stats import adjust_stats, status_field
+
+
+def _remember_previous_post(instance):
+    # Mémoriser l'ancien post pour gérer le déplacement d'un like/commentaire
+    if instance._state.adding or instance.pk is None:
+        instance._previous_post_id = None
+        return
+    instance._previous_post_id = (
+        type(instance).objects.filter(pk=instance.pk)
+        .values_list('post_id', flat=True)
+        .first()
+    )
+
+
+def _apply_save(instance, created, adjust):
+    if created:
+        adjust(instance.post_id, 1)
+        return
+    previous = getattr(instance, '_previous_post_id', None)
+    if previous and previous != instance.post_id:
+        adjust(previous, -1)
+        adjust(instance.post_id, 1)
+
+
+@receiver(pre_delete, sender=Post)
+def post_pre_delete_remember(sender, instance, origin=None, **kwargs):
+    # Posts de la suppression en cours (post, utilisateur, QuerySet...) : le
+    # pre_delete de tous les objets collectés précède tout post_delete
+    if origin is not None:
+        origin.__dict__.setdefault('_deleted_post_ids', set()).add(instance.pk)
+
+
+def _cascaded_from_post(instance, origin):
+    # Like ou commentaire supprimé dans la même opération que son post,
+    # quel que soit le modèle à son origine : les receveurs du post mettent
+    # à jour stats et cache une seule fois, sans requête par ligne
+    # supprimée (et le compteur du post disparaît avec lui)
+    if origin is None:
+        return False
+    return instance.post_id in origin.__dict__.get('_deleted_post_ids', ())
+
+
+@receiver(pre_save, sender=Likes)
+def likes_pre_save(sender, instance, **kwargs):
+    _remember_previous_post(instance)
+
+
+@receiver(post_save, sender=Likes)
+def likes_post_save(sender, instance, created, **kwargs):
+    _apply_save(instance, created, adjust_likes)
+
+
+@receiver(post_delete, sender=Likes)
+def likes_post_delete(sender, instance, origin=None, **kwargs):
+    if not _cascaded_from_post(instance, origin):
+        adjust_likes(instance.post_id, -1)
+
+
+@receiver(pre_save, sender=Comment)
+def comment_pre_save(sender, instance, **kwargs):
+    _remember_previous_post(instance)
+
+
+@receiver(post_save, sender=Comment)
+def comment_post_save(sender, instance, created, **kwargs):
+    _apply_save(instance, created, adjust_comments)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_post_delete(sender, instance, origin=None, **kwargs):
+    if not _cascaded_from_post(instance, origin):
+        adjust_comments(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Post)
+def post_saved_reindex(sender, instance, **kwargs):
+    # Mise à jour incrémentale de l'index de recherche, une fois la transaction validée
+    transaction.on_commit(lambda: get_search_backend().index_post(instance))
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted_unindex(sender, instance, **kwargs):
+    post_id = instance.pk
+    transaction.on_commit(lambda: get_search_backend().remove_post(post_id))
+
+
+def _post_slug(instance):
+    # Slug du post lié, sans requête si le post est déjà chargé
+    field = type(instance)._meta.get_field('post')
+    if field.is_cached(instance):
+        return instance.post.slug
+    return Post.objects.filter(pk=instance.post_id).values_list('slug', flat=True).first()
+
+
+@receiver(pre_save, sender=Post)
+def post_pre_save_remember_previous(sender, instance, **kwargs):
+    # Un changement de slug doit aussi invalider les réponses de l'ancien slug,
+    # un changement de statut déplace le post entre publiés et brouillons
+    instance._previous_slug = instance._previous_status = None
+    if not instance._state.adding and instance.pk is not None:
+        previous = Post.objects.filter(pk=instance.pk).values_list('slug', 'status').first()
+        if previous:
+            instance._previous_slug, instance._previous_status = previous
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_changed_invalidate_cache(sender, instance, **kwargs):
+    groups = {'posts', f'post:{instance.slug}'}
+    previous = getattr(instance, '_previous_slug', None)
+    if previous:
+        groups.add(f'post:{previous}')
+    invalidate(*groups)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed_invalidate_cache(sender, instance, origin=None, **kwargs):
+    if _cascaded_from_post(instance, origin):
+        return
+    slug = _post_slug(instance)
+    if slug:
+        invalidate(f'post:{slug}')
+
+
+@receiver(post_save, sender=Likes)
+@receiver(post_delete, sender=Likes)
+def likes_changed_invalidate_cache(sender, instance, origin=None, **kwargs):
+    # Le compteur de likes apparaît dans la liste et dans le détail
+    if _cascaded_from_post(instance, origin):
+        return
+    groups = ['posts']
+    slug = _post_slug(instance)
+    if slug:
+        groups.append(f'post:{slug}')
+    invalidate(*groups)
+
+
+@receiver(post_save, sender=Likes)
+def likes_saved_record_change(sender, instance, created, **kwargs):
+    # Journal des likes de l'utilisateur, pour les deltas de /api/user/liked-post-ids/
+    if created:
+        transaction.on_commit(lambda: record_change(instance.user_id, instance.post_id, True))
+
+
+@receiver(post_delete, sender=Likes)
+def likes_deleted_record_change(sender, instance, **kwargs):
+    user_id, post_id = instance.user_id, instance.post_id
+    transaction.on_commit(lambda: record_change(user_id, post_id, False))
+
+
+# Ligne de stats du tableau de bord (base.stats), mise à jour par deltas
+
+@receiver(post_save, sender=User)
+def user_saved_stats(sender, instance, created, **kwargs):
+    if created:
+        adjust_stats(users_count=1)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted_stats(sender, instance, **kwargs):
+    adjust_stats(users_count=-1)
+
+
+@receiver(post_save, sender=Post)
+def post_saved_stats(sender, instance, created, **kwargs):
+    current = status_field(instance.status)
+    if created:
+        deltas = {'posts_count': 1}
+        if current:
+            deltas[current] = 1
+        adjust_stats(**deltas)
+        return
+    previous = status_field(getattr(instance, '_previous_status', None))
+    if previous != current:
+        deltas = {}
+        if previous:
+            deltas[previous] = -1
+        if current:
+            deltas[current] = 1
+        adjust_stats(**deltas)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted_stats(sender, instance, **kwargs):
+    # Likes et commentaires supprimés en cascade, d'après les compteurs du post
+    deltas = {'posts_count': -1, 'comments_count': -instance.comments_count, 'likes_count': -instance.likes_count}
+    current = status_field(instance.status)
+    if current:
+        deltas[current] = -1
+    adjust_stats(**deltas)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved_stats(sender, instance, created, **kwargs):
+    if created:
+        adjust_stats(comments_count=1)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted_stats(sender, instance, origin=None, **kwargs):
+    if not _cascaded_from_post(instance, origin):
+        adjust_stats(comments_count=-1)
+
+
+@receiver(post_save, sender=Likes)
+def likes_saved_stats(sender, instance, created, **kwargs):
+    if created:
+        adjust_stats(likes_count=1)
+
+
+@receiver(post_delete, sender=Likes)
+def likes_deleted_stats(sender, instance, origin=None, **kwargs):
+    if not _cascaded_from_post(instance, origin):
+        adjust_stats(likes_count=-1)
@@ -0,0 +1,147 @@
+import logging
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.signals import request_finished
+from django.db import transaction
+from django.db.models import Count, IntegerField, Q, Subquery, Value
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .counters import shifted
+from .models import Post, Likes, Comment, SiteStats
+
+STATS_PK = 1
+STATS_FIELDS = ('users_count', 'posts_count', 'published_posts', 'draft_posts', 'comments_count', 'likes_count')
+
+logger = logging.getLogger(__name__)
+
+# Deltas validés en attente d'écriture dans la ligne SiteStats (par processus)
+_lock = threading.Lock()
+_pending = Counter()
+_flushed_at = time.monotonic()
+
+
+def _total(queryset, **count_options):
+    # COUNT(*) scalaire (sans GROUP BY) utilisable comme sous-requête
+    counts = (
+        queryset.order_by()
+        .annotate(_all=Value(1))
+        .values('_all')
+        .annotate(total=Count('pk', **count_options))
+        .values('total')
+    )
+    return Subquery(counts, output_field=IntegerField())
+
+
+def _full_counts():
+    return {
+        'users_count': _total(User.objects.all()),
+        'posts_count': _total(Post.objects.all()),
+        'published_posts': _total(Post.objects.all(), filter=Q(status='published')),
+        'draft_posts': _total(Post.objects.all(), filter=Q(status='draft')),
+        'comments_count': _total(Comment.objects.all()),
+        'likes_count': _total(Likes.objects.all()),
+    }
+
+
+def recompute_stats():
+    """
+    Recalcul complet de la ligne de stats en une seule instruction UPDATE
+    (une sous-requête COUNT par colonne) pour corriger toute dérive. Les
+    deltas en attente dans ce processus sont déjà comptés et abandonnés ;
+    ceux des autres processus s'y ajouteront (dérive d'au plus un
+    intervalle d'écritures, corrigée au recalcul suivant).
+    """
+    with _lock:
+        _pending.clear()
+    with transaction.atomic():
+        SiteStats.objects.get_or_create(pk=STATS_PK)
+        SiteStats.objects.filter(pk=STATS_PK).update(recomputed_at=timezone.now(), **_full_counts())
+    return SiteStats.objects.get(pk=STATS_PK)
+
+
+def get_stats():
+    """
+    Lit la ligne de stats (une requête) après avoir écrit les deltas en
+    attente de ce processus ; la recalcule si elle n'existe pas encore ou
+    date de plus de ADMIN_STATS_MAX_AGE secondes
+    """
+    flush_stats()
+    stats = SiteStats.objects.filter(pk=STATS_PK).first()
+    max_age = getattr(settings, 'ADMIN_STATS_MAX_AGE', None)
+    stale = (
+        stats is None or stats.recomputed_at is None
+        or (max_age and timezone.now() - stats.recomputed_at > timedelta(seconds=max_age))
+    )
+    return recompute_stats() if stale else stats
+
+
+def _apply_deltas(deltas):
+    changes = {field: shifted(field, delta) for field, delta in deltas.items() if delta}
+    if changes:
+        SiteStats.objects.filter(pk=STATS_PK).update(**changes)
+
+
+def _record(deltas):
+    with _lock:
+        _pending.update(deltas)
+
+
+def adjust_stats(**deltas):
+    """
+    Mise à jour incrémentale : après la validation de la transaction, les
+    deltas s'accumulent en mémoire du processus et flush_stats() les
+    écrit en un seul UPDATE (F() + somme) toutes les
+    ADMIN_STATS_FLUSH_INTERVAL secondes. Les écritures ne se disputent
+    donc plus le verrou de la ligne unique. Des deltas perdus (arrêt du
+    processus) sont corrigés au prochain recalcul.
+    """
+    transaction.on_commit(lambda: _record(deltas))
+
+
+def _nonzero(deltas):
+    return {field: delta for field, delta in deltas.items() if delta}
+
+
+def pending_stats():
+    with _lock:
+        return _nonzero(_pending)
+
+
+def flush_stats():
+    """
+    Écrit les deltas en attente ; retourne le nombre de colonnes modifiées
+    """
+    global _pending, _flushed_at
+    with _lock:
+        deltas, _pending, _flushed_at = _nonzero(_pending), Counter(), time.monotonic()
+    if not deltas:
+        return 0
+    try:
+        _apply_deltas(deltas)
+    except Exception:
+        # Remettre les deltas, cumulés avec ceux arrivés entre-temps
+        with _lock:
+            _pending.update(deltas)
+        raise
+    return len(deltas)
+
+
+@receiver(request_finished)
+def flush_stats_if_due(**kwargs):
+    # Après l'envoi de la réponse : le client n'attend pas l'écriture
+    interval = getattr(settings, 'ADMIN_STATS_FLUSH_INTERVAL', 0) or 0
+    if _pending and time.monotonic() - _flushed_at >= interval:
+        try:
+            flush_stats()
+        except Exception:
+            logger.exception("Échec de l'écriture différée des stats")
+
+
+def status_field(status):
+    return {'published': 'published_posts', 'draft': 'draft_posts'}.get(status)
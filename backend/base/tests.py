@@ -1,3 +1,1458 @@
-from django.test import TestCase
+import json
+import os
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock, skipIf
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError, connection, connections, transaction
+from django.db.backends.signals import connection_created
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework import routers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from accounts.backends import forget_users
+from backend import json_codec
+from backend.renderers import msgpack
+
+from . import like_service
+from .benchmark import load_baseline, regressions, save_baseline
+from .counters import adjust_likes
+from .export import keyset_rows
+from .like_buffer import flush, get_like_buffer
+from .query_budget import QueryBudgetExceeded, check_budget, enforce, get_budget, record_queries
+from .models import Post, Likes, Comment, SiteStats
+from .stats import STATS_FIELDS, flush_stats, pending_stats, recompute_stats
+from .search import get_search_backend
+from .seed import DEFAULT_PASSWORD, seed
+from .response_cache import cache_stats
+from .row_serializers import PostRowSerializer, CommentRowSerializer, LikeRowSerializer, UserRowSerializer
+from .serializers import PostSerializer, CommentSerializer, LikeSerializer, UserSerializer
+from .throttling import CacheTokenBuckets, take
+
+
+def make_post(author, slug='premier-post', **extra):
+    return Post.objects.create(
+        title=extra.pop('title', slug.replace('-', ' ').title()),
+        slug=slug,
+        body=extra.pop('body', 'Contenu du post'),
+        author=author,
+        status=extra.pop('status', 'published'),
+        **extra
+    )
+
+
+def make_comment(post, author, body='Un commentaire'):
+    return Comment.objects.create(
+        post=post, author=author, username=author.username,
+        email=author.email, body=body,
+    )
+
+
+class PostCountersTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user('auteur', 'auteur@example.com', 'motdepasse123')
+        self.reader = User.objects.create_user('lecteur', 'lecteur@example.com', 'motdepasse123')
+        self.post = make_post(self.author)
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+
+    def test_like_and_unlike_update_counter(self):
+        self.client.post('/api/posts/premier-post/toggle-like/')
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.likes_count, 1)
+
+        self.client.delete('/api/posts/premier-post/toggle-like/')
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.likes_count, 0)
+
+    def test_comment_add_and_delete_update_counter(self):
+        response = self.client.post('/api/posts/premier-post/add-comment/', {'body': 'Bravo'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 1)
+
+        self.client.delete(f"/api/comments/{response.data['id']}/")
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 0)
+
+    def test_cascade_delete_of_user_updates_counters(self):
+        Likes.objects.create(user=self.reader, post=self.post)
+        make_comment(self.post, self.reader)
+        self.reader.delete()
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.likes_count, self.post.comments_count), (0, 0))
+
+    def test_decrement_stops_at_zero_without_negative_intermediate(self):
+        # Colonne UNSIGNED sous MySQL : le CASE teste avant de soustraire
+        Post.objects.update(likes_count=2)
+        with CaptureQueriesContext(connection) as queries:
+            adjust_likes(self.post.pk, -3)
+        self.assertIn('CASE WHEN', queries.captured_queries[0]['sql'])
+        adjust_likes(self.post.pk, -1)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.likes_count, 0)
+        adjust_likes(self.post.pk, 1)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.likes_count, 1)
+
+    def test_moving_a_like_to_another_post(self):
+        other = make_post(self.author, slug='second-post')
+        like = Likes.objects.create(user=self.reader, post=self.post)
+        like.post = other
+        like.save()
+        self.post.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual((self.post.likes_count, other.likes_count), (0, 1))
+
+    def test_rebuild_counters_repairs_drift(self):
+        Likes.objects.create(user=self.reader, post=self.post)
+        make_comment(self.post, self.reader)
+        Post.objects.update(likes_count=42, comments_count=7)
+
+        call_command('rebuild_counters', stdout=StringIO())
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.likes_count, self.post.comments_count), (1, 1))
+
+    def test_post_list_reads_counters_without_count_queries(self):
+        for index in range(5):
+            make_post(self.author, slug=f'post-{index}')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/posts/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 6)
+        self.assertFalse(any(
+            'COUNT(' in query['sql'] and 'base_likes' in query['sql']
+            for query in queries.captured_queries
+        ))
+
+
+class ConstantQueryCountTests(TestCase):
+    """
+    Le nombre de requêtes d'un endpoint ne doit pas dépendre du nombre de lignes
+    """
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'motdepasse123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def _seed(self, count):
+        for index in range(count):
+            author = User.objects.create(username=f'auteur{count}-{index}', email=f'a{count}-{index}@example.com')
+            post = make_post(author, slug=f'post-{count}-{index}')
+            make_comment(post, author)
+            Likes.objects.create(user=self.admin, post=post)
+            Likes.objects.create(user=author, post=post)
+
+    def _query_count(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return len(queries.captured_queries)
+
+    def assertConstantQueries(self, url):
+        self._seed(2)
+        small = self._query_count(url)
+        self._seed(6)
+        self.assertEqual(self._query_count(url), small, url)
+
+    def test_post_list(self):
+        self.assertConstantQueries('/api/posts/')
+
+    def test_user_liked_posts(self):
+        self.assertConstantQueries('/api/user/liked-posts/')
+
+    def test_admin_posts(self):
+        self.assertConstantQueries('/api/admin/posts/')
+
+    def test_admin_likes(self):
+        self.assertConstantQueries('/api/admin/likes/')
+
+    def test_admin_comments(self):
+        self.assertConstantQueries('/api/admin/comments/')
+
+    def test_post_detail_and_its_likes(self):
+        post = make_post(self.admin, slug='populaire')
+        for index in range(4):
+            user = User.objects.create(username=f'fan{index}', email=f'fan{index}@example.com')
+            make_comment(post, user)
+            Likes.objects.create(user=user, post=post)
+        # Validateurs conditionnels + post + commentaires / likes
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/posts/populaire/')
+        self.assertEqual(len(response.data['comments']), 4)
+        with self.assertNumQueries(3):
+            self.client.get('/api/posts/populaire/likes/')
+        with self.assertNumQueries(3):
+            self.client.get('/api/posts/populaire/comments/')
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'motdepasse123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        for index in range(7):
+            make_post(self.admin, slug=f'post-{index}')
+
+    def test_cursor_walks_every_post_once(self):
+        seen = []
+        url = '/api/posts/?size=3'
+        while url:
+            response = self.client.get(url)
+            self.assertLessEqual(len(response.data['results']), 3)
+            seen.extend(post['slug'] for post in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(len(set(seen)), 7)
+
+    def test_page_size_is_bounded(self):
+        response = self.client.get('/api/posts/?size=100000')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('count', response.data)
+
+    def test_total_count_header_is_opt_in(self):
+        response = self.client.get('/api/admin/posts/')
+        self.assertNotIn('X-Total-Count', response)
+        response = self.client.get('/api/admin/posts/?with_count=1')
+        self.assertEqual(response['X-Total-Count'], '7')
+
+    def test_function_views_are_paginated(self):
+        response = self.client.get('/api/users/?size=1')
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIsNone(response.data['previous'])
+
+
+@override_settings(SEARCH_BACKEND='base.search.InMemorySearchBackend')
+class SearchTests(TestCase):
+    def setUp(self):
+        get_search_backend().reset()
+        self.author = User.objects.create_user('marie', 'marie@example.com', 'motdepasse123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+        with self.captureOnCommitCallbacks(execute=True):
+            make_post(self.author, slug='django-orm', title='Optimiser Django', body='Les requêtes ORM')
+            make_post(self.author, slug='cuisine', title='Recette', body='Une tarte pour Django')
+            make_post(self.author, slug='voyage', title='Voyage', body='Été à Lisbonne')
+
+    def _slugs(self, response):
+        return [post['slug'] for post in response.data['results']]
+
+    def test_inverted_index_ranks_title_matches_first(self):
+        response = self.client.get('/api/posts/?search=django')
+        self.assertEqual(self._slugs(response), ['django-orm', 'cuisine'])
+
+    def test_accents_and_prefixes_are_normalized(self):
+        response = self.client.get('/api/posts/?search=ete lisb')
+        self.assertEqual(self._slugs(response), ['voyage'])
+
+    def test_author_username_matches(self):
+        response = self.client.get('/api/posts/?search=marie')
+        self.assertEqual(len(response.data['results']), 3)
+
+    def test_index_follows_saves_and_deletes(self):
+        post = Post.objects.get(slug='voyage')
+        with self.captureOnCommitCallbacks(execute=True):
+            post.title = 'Randonnée'
+            post.save()
+        self.assertEqual(self._slugs(self.client.get('/api/posts/?search=randonnee')), ['voyage'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            post.delete()
+        self.assertEqual(self._slugs(self.client.get('/api/posts/?search=randonnee')), [])
+
+    def test_reindexing_does_not_load_the_author(self):
+        self.client.get('/api/posts/?search=django')
+        post = Post.objects.get(slug='cuisine')
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            post.title = 'Tarte aux pommes'
+            post.save()
+        self.assertFalse([query for query in queries.captured_queries if 'auth_user' in query['sql']])
+        self.assertEqual(self._slugs(self.client.get('/api/posts/?search=pommes')), ['cuisine'])
+        self.assertEqual(len(self.client.get('/api/posts/?search=marie').data['results']), 3)
+
+    def test_template_search_view_uses_index(self):
+        response = self.client.get('/blog/search/?q=tarte')
+        self.assertEqual([post.slug for post in response.context['posts']], ['cuisine'])
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user('auteur', 'auteur@example.com', 'motdepasse123')
+        self.post = make_post(self.author)
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def test_second_read_is_served_from_cache(self):
+        self.assertEqual(self.client.get('/api/posts/premier-post/')['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/posts/premier-post/')
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.data['slug'], 'premier-post')
+
+    def test_like_invalidates_list_and_detail(self):
+        self.client.get('/api/posts/')
+        self.client.get('/api/posts/premier-post/')
+        Likes.objects.create(user=self.author, post=self.post)
+
+        response = self.client.get('/api/posts/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['likes_count'], 1)
+        self.assertEqual(self.client.get('/api/posts/premier-post/')['X-Cache'], 'MISS')
+
+    def test_comment_only_invalidates_its_post(self):
+        other = make_post(self.author, slug='autre-post')
+        self.client.get('/api/posts/premier-post/comments/')
+        self.client.get('/api/posts/autre-post/comments/')
+        make_comment(other, self.author)
+
+        self.assertEqual(self.client.get('/api/posts/premier-post/comments/')['X-Cache'], 'HIT')
+        self.assertEqual(self.client.get('/api/posts/autre-post/comments/')['X-Cache'], 'MISS')
+
+    def test_anonymous_and_authenticated_entries_are_separate(self):
+        self.client.get('/api/posts/')
+        anonymous = APIClient()
+        self.assertEqual(anonymous.get('/api/posts/').status_code, 403)
+
+    def test_stats_count_hits_and_misses(self):
+        self.client.get('/api/posts/premier-post/likes/')
+        self.client.get('/api/posts/premier-post/likes/')
+        stats = cache_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user('auteur', 'auteur@example.com', 'motdepasse123')
+        self.post = make_post(self.author)
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def test_matching_etag_returns_304_without_loading_the_post(self):
+        first = self.client.get('/api/posts/premier-post/')
+        self.assertIn('ETag', first)
+        self.assertIn('no-cache', first['Cache-Control'])
+        self.assertNotIn('no-store', first['Cache-Control'])
+
+        # Le validateur seul est calculé, sans charger ni sérialiser le post
+        cache.clear()
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/posts/premier-post/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+        # Depuis le cache de réponses : aucune requête
+        self.client.get('/api/posts/premier-post/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/posts/premier-post/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertIn('no-cache', response['Cache-Control'])
+
+    def test_new_comment_changes_the_etag(self):
+        etag = self.client.get('/api/posts/premier-post/comments/')['ETag']
+        make_comment(self.post, self.author)
+        response = self.client.get('/api/posts/premier-post/comments/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_unlike_changes_the_list_etag(self):
+        like = Likes.objects.create(user=self.author, post=self.post)
+        etag = self.client.get('/api/posts/')['ETag']
+        like.delete()
+        response = self.client.get('/api/posts/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_etag_needs_no_query_and_follows_counter_updates(self):
+        # Sans réponse en cache : le validateur est lu dans le cache, sans SQL
+        with override_settings(RESPONSE_CACHE_TIMEOUT=0):
+            first = self.client.get('/api/posts/')
+            self.assertNotIn('Last-Modified', first)
+            with self.assertNumQueries(0):
+                response = self.client.get('/api/posts/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        # like/unlike passent par un UPDATE du compteur, sans toucher à Post.updated
+        like_service.like(self.author, self.post)
+        response = self.client.get('/api/posts/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        like_service.unlike(self.author, self.post)
+        self.assertEqual(self.client.get('/api/posts/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_unknown_post_still_404(self):
+        self.assertEqual(self.client.get('/api/posts/inconnu/likes/').status_code, 404)
+
+
+class LikeStatusBatchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('lecteur', 'lecteur@example.com', 'motdepasse123')
+        self.posts = [make_post(self.user, slug=f'post-{index}') for index in range(4)]
+        Likes.objects.create(user=self.user, post=self.posts[0])
+        Likes.objects.create(user=self.user, post=self.posts[2])
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_batch_status_runs_a_single_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/user/like-status/?slugs=post-0,post-1,post-2')
+        self.assertEqual(response.data['slugs'], {'post-0': True, 'post-1': False, 'post-2': True})
+
+    def test_batch_status_accepts_ids_in_post_body(self):
+        ids = [post.id for post in self.posts]
+        response = self.client.post('/api/user/like-status/', {'ids': ids}, format='json')
+        self.assertEqual(response.data['ids'], {ids[0]: True, ids[1]: False, ids[2]: True, ids[3]: False})
+
+    def test_snapshot_then_delta(self):
+        snapshot = self.client.get('/api/user/liked-post-ids/').data
+        self.assertTrue(snapshot['full'])
+        self.assertEqual(snapshot['ids'], [self.posts[0].id, self.posts[2].id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Likes.objects.create(user=self.user, post=self.posts[3])
+            Likes.objects.filter(user=self.user, post=self.posts[0]).delete()
+
+        delta = self.client.get(f"/api/user/liked-post-ids/?since={snapshot['version']}").data
+        self.assertFalse(delta['full'])
+        self.assertEqual((delta['added'], delta['removed']), ([self.posts[3].id], [self.posts[0].id]))
+        self.assertNotEqual(delta['version'], snapshot['version'])
+
+    def test_unknown_version_falls_back_to_full_snapshot(self):
+        response = self.client.get('/api/user/liked-post-ids/?since=inconnu.3')
+        self.assertTrue(response.data['full'])
+
+
+class LikeServiceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('lecteur', 'lecteur@example.com', 'motdepasse123')
+        self.post = make_post(self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_like_is_idempotent_and_returns_the_count(self):
+        first = self.client.post('/api/posts/premier-post/toggle-like/')
+        second = self.client.post('/api/posts/premier-post/toggle-like/')
+        self.assertEqual((first.status_code, first.data['status']), (201, 'like added'))
+        self.assertEqual((second.status_code, second.data['status']), (200, 'already liked'))
+        self.assertEqual(second.data['likes_count'], 1)
+        self.assertEqual(Likes.objects.count(), 1)
+
+    def test_unlike_without_like(self):
+        response = self.client.delete('/api/posts/premier-post/toggle-like/')
+        self.assertEqual(response.data, {'status': 'not liked', 'liked': False, 'likes_count': 0})
+
+    def test_like_write_is_a_single_statement(self):
+        # Recherche du post, INSERT ... IGNORE, mise à jour puis relecture du compteur
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post('/api/posts/premier-post/toggle-like/')
+        statements = [query['sql'] for query in queries.captured_queries if 'SAVEPOINT' not in query['sql']]
+        self.assertEqual(len(statements), 4)
+
+    def test_returned_count_includes_concurrent_likes(self):
+        # Like d'un autre utilisateur écrit après la lecture du post
+        other = User.objects.create(username='autre')
+        like_service.like(other, Post.objects.get(pk=self.post.pk))
+        self.assertEqual(self.post.likes_count, 0)
+        self.assertEqual(like_service.like(self.user, self.post).likes_count, 2)
+        self.assertEqual(like_service.unlike(self.user, self.post).likes_count, 1)
+
+    def test_template_form_sends_the_action(self):
+        self.client.force_login(self.user)
+        self.assertContains(self.client.get('/blog/post/premier-post/'), 'name="action" value="like"')
+        for action, liked in (('like', True), ('like', True), ('unlike', False)):
+            with CaptureQueriesContext(connection) as queries:
+                self.client.post('/blog/like/premier-post/', {'action': action})
+            writes = [query['sql'] for query in queries.captured_queries
+                      if 'base_likes' in query['sql'] and query['sql'].startswith(('INSERT', 'DELETE'))]
+            self.assertEqual(len(writes), 1)
+            self.assertEqual(Likes.objects.filter(user=self.user, post=self.post).exists(), liked)
+
+    def test_template_view_toggles(self):
+        self.client.force_login(self.user)
+        self.client.get('/blog/like/premier-post/')
+        self.assertTrue(Likes.objects.filter(user=self.user, post=self.post).exists())
+        self.client.get('/blog/like/premier-post/')
+        self.assertFalse(Likes.objects.filter(user=self.user, post=self.post).exists())
+
+
+@skipIf(
+    connection.vendor == 'sqlite' and connection.is_in_memory_db(),
+    "SQLite en mémoire (cache partagé) ne supporte pas d'écritures concurrentes"
+)
+class ConcurrentToggleTests(TransactionTestCase):
+    def test_concurrent_toggles_keep_rows_and_counter_consistent(self):
+        users = [User.objects.create(username=f'fan{index}') for index in range(4)]
+        post = make_post(users[0])
+        errors = []
+
+        def worker(user, rounds):
+            try:
+                for index in range(rounds):
+                    if index % 2:
+                        like_service.unlike(user, post)
+                    else:
+                        like_service.like(user, post)
+                    like_service.toggle(user, post)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(user, 7)) for user in users for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        post.refresh_from_db()
+        self.assertEqual(post.likes_count, Likes.objects.filter(post=post).count())
+        self.assertLessEqual(post.likes_count, len(users))
+
+
+@override_settings(LIKES_WRITE_BEHIND=True, LIKES_FLUSH_INTERVAL=None, LIKES_FLUSH_MAX_PENDING=1000)
+class LikeWriteBehindTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_like_buffer().drain()
+        self.user = User.objects.create_user('lecteur', 'lecteur@example.com', 'motdepasse123')
+        self.post = make_post(self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_like_is_buffered_but_visible_to_the_user(self):
+        response = self.client.post('/api/posts/premier-post/toggle-like/')
+        self.assertEqual((response.data['liked'], response.data['likes_count']), (True, 1))
+        self.assertFalse(Likes.objects.exists())
+        self.assertTrue(self.client.get('/api/posts/premier-post/like-status/').data['liked'])
+        status = self.client.get('/api/user/like-status/?slugs=premier-post').data
+        self.assertEqual(status['slugs'], {'premier-post': True})
+
+    def test_like_then_unlike_collapses(self):
+        self.client.post('/api/posts/premier-post/toggle-like/')
+        self.client.delete('/api/posts/premier-post/toggle-like/')
+        self.assertEqual(len(get_like_buffer()), 1)
+        flush()
+        self.assertFalse(Likes.objects.exists())
+
+    def test_flush_writes_in_bulk_and_rebuilds_counters(self):
+        fans = [User.objects.create(username=f'fan{index}') for index in range(5)]
+        Likes.objects.create(user=fans[0], post=self.post)
+        for fan in fans:
+            like_service.like(fan, self.post)
+        like_service.unlike(fans[0], self.post)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(flush(), 5)
+        inserts = [query for query in queries.captured_queries if query['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 1)
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.likes_count, 4)
+        self.assertEqual(Likes.objects.filter(post=self.post).count(), 4)
+
+    def test_cache_buffer_backend(self):
+        with self.settings(LIKES_BUFFER_BACKEND='base.like_buffer.CacheLikeBuffer'):
+            self.client.post('/api/posts/premier-post/toggle-like/')
+            self.assertEqual(get_like_buffer().pending_for_user(self.user.pk), {self.post.pk: True})
+            flush()
+        self.assertTrue(Likes.objects.filter(user=self.user, post=self.post).exists())
+
+
+class SyncLikesCommandTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user('auteur', 'auteur@example.com', 'motdepasse123')
+        self.fan = User.objects.create(username='fan')
+        self.posts = [make_post(self.author, slug=f'post-{index}') for index in range(5)]
+        for post in self.posts[:3]:
+            Likes.objects.create(user=self.fan, post=post)
+        Post.objects.filter(pk__in=[self.posts[1].pk, self.posts[4].pk]).update(likes_count=7)
+        self.checkpoint = f'/tmp/sync_likes_test_{self.author.pk}.checkpoint'
+        self.addCleanup(lambda: os.path.exists(self.checkpoint) and os.remove(self.checkpoint))
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command('sync_likes', '--chunk-size=2', f'--checkpoint={self.checkpoint}', *args, stdout=out)
+        return out.getvalue()
+
+    def likes_counts(self):
+        return list(Post.objects.order_by('pk').values_list('likes_count', flat=True))
+
+    def test_dry_run_reports_without_writing(self):
+        output = self.run_command('--dry-run')
+        self.assertIn('Compteurs à corriger: 2', output)
+        self.assertEqual(self.likes_counts(), [1, 7, 1, 0, 7])
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_repairs_counters_chunk_by_chunk(self):
+        output = self.run_command()
+        self.assertIn('Posts traités: 5', output)
+        self.assertIn('Compteurs corrigés: 2', output)
+        self.assertIn('posts/s', output)
+        self.assertEqual(self.likes_counts(), [1, 1, 1, 0, 0])
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_resumes_after_the_checkpoint(self):
+        with open(self.checkpoint, 'w') as handle:
+            json.dump({'last_post_id': self.posts[2].pk}, handle)
+        output = self.run_command()
+        self.assertIn(f'Reprise après le post #{self.posts[2].pk}', output)
+        self.assertIn('Posts traités: 2', output)
+        # Le post 1, déjà traité avant l'interruption, n'est pas revisité
+        self.assertEqual(self.likes_counts(), [1, 7, 1, 0, 0])
+
+
+class AdminExportTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user('admin', 'admin@example.com', 'motdepasse123', is_staff=True)
+        self.posts = [make_post(self.admin, slug=f'post-{index}') for index in range(5)]
+        Likes.objects.create(user=self.admin, post=self.posts[0])
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def read(self, response):
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_posts_ndjson_matches_serializer_keys(self):
+        response = self.client.get('/api/admin/posts/export/')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual([row['id'] for row in rows], [post.pk for post in self.posts])
+        listed = self.client.get('/api/admin/posts/').data['results'][0]
+        self.assertEqual(list(rows[0]), list(listed))
+        self.assertEqual((rows[0]['author_username'], rows[0]['likes_count']), ('admin', 1))
+
+    def test_users_csv_never_contains_passwords(self):
+        response = self.client.get('/api/admin/users/export/?output=csv')
+        self.assertIn('attachment', response['Content-Disposition'])
+        lines = self.read(response).splitlines()
+        self.assertTrue(lines[0].startswith('id,username,email'))
+        self.assertNotIn('password', lines[0])
+        self.assertEqual(len(lines), 2)
+
+    def test_likes_export_resolves_related_names_without_joins_per_row(self):
+        with self.assertNumQueries(1):
+            content = self.read(self.client.get('/api/admin/likes/export/?output=csv'))
+        self.assertIn('admin,Post 0', content)
+
+    def test_rows_are_read_in_keyset_chunks(self):
+        with self.assertNumQueries(3):
+            rows = list(keyset_rows(Post.objects.all(), ['id', 'slug'], chunk_size=2))
+        self.assertEqual([row['slug'] for row in rows], [f'post-{index}' for index in range(5)])
+
+    def test_unknown_format(self):
+        response = self.client.get('/api/admin/comments/export/?output=xml')
+        self.assertEqual(response.status_code, 400)
+
+    def test_requires_admin(self):
+        self.client.force_authenticate(User.objects.create(username='lecteur'))
+        self.assertEqual(self.client.get('/api/admin/posts/export/').status_code, 403)
+
+
+class AdminStatsTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user('admin', 'admin@example.com', 'motdepasse123', is_staff=True)
+        self.post = make_post(self.admin)
+        make_post(self.admin, slug='brouillon', status='draft')
+        Likes.objects.create(user=self.admin, post=self.post)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def snapshot(self):
+        flush_stats()
+        return {field: getattr(SiteStats.objects.get(pk=1), field) for field in STATS_FIELDS}
+
+    def test_recompute_is_a_single_statement(self):
+        SiteStats.objects.create(pk=1)
+        with CaptureQueriesContext(connection) as queries:
+            recompute_stats()
+        updates = [query for query in queries.captured_queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(self.snapshot(), {
+            'users_count': 1, 'posts_count': 2, 'published_posts': 1,
+            'draft_posts': 1, 'comments_count': 0, 'likes_count': 1,
+        })
+
+    def test_dashboard_reads_one_row(self):
+        recompute_stats()
+        with self.assertNumQueries(1):
+            data = self.client.get('/api/admin/stats/').data
+        self.assertEqual((data['posts_count'], data['published_posts'], data['likes_count']), (2, 1, 1))
+
+    def test_signals_keep_the_row_in_sync(self):
+        recompute_stats()
+        with self.captureOnCommitCallbacks(execute=True):
+            fan = User.objects.create(username='fan')
+            draft = make_post(fan, slug='nouveau', status='draft')
+        with self.captureOnCommitCallbacks(execute=True):
+            draft.status = 'published'
+            draft.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            like_service.like(fan, draft)
+            like_service.unlike(self.admin, self.post)
+        with self.captureOnCommitCallbacks(execute=True):
+            make_comment(self.post, fan)
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.get(slug='brouillon').delete()
+        incremental = self.snapshot()
+        recompute_stats()
+        self.assertEqual(incremental, self.snapshot())
+
+    def test_deleting_an_author_counts_cascaded_rows_once(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            fan = User.objects.create(username='fan')
+            post = make_post(fan, slug='du-fan')
+            Likes.objects.create(user=self.admin, post=post)
+            make_comment(post, self.admin)
+            # Like et commentaire du fan sur un post qui lui survit
+            Likes.objects.create(user=fan, post=self.post)
+            make_comment(self.post, fan)
+        recompute_stats()
+        with self.captureOnCommitCallbacks(execute=True):
+            fan.delete()
+        self.assertEqual(pending_stats(), {
+            'users_count': -1, 'posts_count': -1, 'published_posts': -1,
+            'likes_count': -2, 'comments_count': -2,
+        })
+        incremental = self.snapshot()
+        recompute_stats()
+        self.assertEqual(incremental, self.snapshot())
+
+    def test_writes_do_not_update_the_row(self):
+        recompute_stats()
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            make_comment(self.post, self.admin)
+            like_service.unlike(self.admin, self.post)
+        self.assertFalse([query for query in queries.captured_queries if 'base_sitestats' in query['sql']])
+        self.assertEqual(pending_stats(), {'comments_count': 1, 'likes_count': -1})
+        with self.assertNumQueries(2):
+            data = self.client.get('/api/admin/stats/').data
+        self.assertEqual((data['comments_count'], data['likes_count']), (1, 0))
+        self.assertEqual(pending_stats(), {})
+
+    def test_stale_row_is_recomputed(self):
+        SiteStats.objects.create(pk=1, posts_count=99, recomputed_at=timezone.now() - timedelta(hours=2))
+        with self.settings(ADMIN_STATS_MAX_AGE=3600):
+            self.assertEqual(self.client.get('/api/admin/stats/').data['posts_count'], 2)
+
+
+class HotPathIndexTests(TestCase):
+    def test_slug_is_unique(self):
+        author = User.objects.create(username='auteur')
+        make_post(author)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            make_post(author)
+
+    @skipIf(connection.vendor != 'sqlite', 'Plans propres à SQLite')
+    def test_explain_report_shows_the_new_indexes(self):
+        out = StringIO()
+        call_command('explain_queries', stdout=out)
+        before, after = out.getvalue().split('=== Après')
+        self.assertNotIn('base_likes_user_created_idx', before)
+        # L'index unique de slug (migration 0010) est aussi écarté
+        self.assertNotIn('sqlite_autoindex_base_post', before)
+        self.assertIn('sqlite_autoindex_base_post', after)
+        for name in ('base_post_status_publish_idx', 'base_post_created_id_idx',
+                     'base_comment_post_created_idx', 'base_likes_post_created_idx',
+                     'base_likes_user_created_idx'):
+            self.assertIn(name, after)
+        self.assertNotIn('TEMP B-TREE', after)
+
+
+@skipIf(connection.vendor != 'sqlite', 'Réplica simulé par un second fichier SQLite')
+@override_settings(DATABASE_REPLICAS=['replica'], READ_YOUR_WRITES_WINDOW=60)
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    Principale et réplica sont deux fichiers SQLite distincts, sans
+    réplication : une ligne écrite n'est visible que sur la principale
+    """
+    replica_path = '/tmp/projet_python_test_replica.sqlite3'
+
+    @classmethod
+    def setUpClass(cls):
+        # Alias créé ici plutôt que dans les settings : le lanceur de tests
+        # ne le connaît pas, la classe le migre et le vide elle-même
+        if os.path.exists(cls.replica_path):
+            os.remove(cls.replica_path)
+        connections.settings['replica'] = {**connections['default'].settings_dict, 'NAME': cls.replica_path}
+        call_command('migrate', database='replica', verbosity=0)
+        cls.databases = {'default', 'replica'}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['replica'].close()
+        del connections['replica']
+        del connections.settings['replica']
+        os.remove(cls.replica_path)
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='lecteur')
+        self.post = make_post(self.user)
+        # Le réplica ne connaît que l'utilisateur, pas encore le post
+        User.objects.using('replica').create(pk=self.user.pk, username='lecteur')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_reads_go_to_the_replica(self):
+        self.assertEqual(Post.objects.using('default').count(), 1)
+        self.assertEqual(Post.objects.count(), 0)
+        self.assertEqual(self.client.get('/api/posts/').data['results'], [])
+        self.assertNotIn('primary_until', self.client.cookies)
+
+    def test_writes_go_to_the_primary_and_pin_later_reads(self):
+        response = self.client.post('/api/posts/premier-post/toggle-like/')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Likes.objects.using('default').filter(post=self.post).exists())
+        self.assertFalse(Likes.objects.using('replica').exists())
+        self.assertIn('primary_until', response.cookies)
+
+        # Lecture suivante du même client : sur la principale, le like est visible
+        results = self.client.get('/api/posts/').data['results']
+        self.assertEqual([(post['slug'], post['likes_count']) for post in results], [('premier-post', 1)])
+
+        # Un autre client (hors cache de réponses) continue de lire sur le réplica
+        cache.clear()
+        other = APIClient()
+        other.force_authenticate(User.objects.using('replica').create(username='autre'))
+        self.assertEqual(other.get('/api/posts/').data['results'], [])
+
+    def test_expired_window_reads_the_replica_again(self):
+        self.client.cookies['primary_until'] = str(time.time() - 1)
+        self.assertEqual(self.client.get('/api/posts/').data['results'], [])
+
+    def test_pinned_client_skips_responses_cached_from_the_replica(self):
+        self.assertEqual(self.client.get('/api/posts/').data['results'], [])
+        self.client.cookies['primary_until'] = str(time.time() + 60)
+        response = self.client.get('/api/posts/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.data['results']), 1)
+
+
+# Lectures sur le thread des appels thread_sensitive : les threads du pool
+# ouvriraient leur propre connexion, qui ne voit pas la transaction du test
+@override_settings(ASYNC_PARALLEL_READS=False)
+class AsyncReadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('lecteur', 'lecteur@example.com', 'motdepasse123')
+        self.posts = [make_post(self.user, slug=f'post-{index}') for index in range(3)]
+        make_comment(self.posts[0], self.user)
+        make_comment(self.posts[0], self.user, body='Deuxième')
+        Likes.objects.create(user=self.user, post=self.posts[0])
+
+    async def fetch_both(self, path):
+        await self.async_client.aforce_login(self.user)
+        await sync_to_async(self.client.force_login)(self.user)
+        sync_response = await sync_to_async(self.client.get)(f'/api/{path}')
+        async_response = await self.async_client.get(f'/api/async/{path}')
+        return sync_response, async_response
+
+    async def test_same_bytes_as_the_sync_endpoints(self):
+        for path in ('posts/?size=2', 'posts/post-0/', 'posts/post-0/comments/',
+                     'posts/post-0/likes/', 'posts/post-0/like-status/', 'posts/inconnu/',
+                     'posts/post-0/?fields=slug,comments.body', 'posts/post-0/likes/?omit=post.author'):
+            sync_response, async_response = await self.fetch_both(path)
+            with self.subTest(path=path):
+                self.assertEqual(async_response.status_code, sync_response.status_code)
+                self.assertEqual(
+                    async_response.content.replace(b'/api/async/', b'/api/'),
+                    sync_response.content,
+                )
+
+    async def test_cursor_pages_match(self):
+        sync_response, async_response = await self.fetch_both('posts/?size=2')
+        next_page = json.loads(async_response.content)['next']
+        self.assertIn('/api/async/posts/?cursor=', next_page)
+        page = json.loads((await self.async_client.get(next_page)).content)
+        self.assertEqual([post['slug'] for post in page['results']], ['post-0'])
+        self.assertIsNone(page['next'])
+
+    async def test_requires_authentication(self):
+        response = await self.async_client.get('/api/async/posts/')
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(json.loads(response.content), {'detail': 'Authentication credentials were not provided.'})
+
+    def test_detail_reads_post_and_comments_in_two_queries(self):
+        async_to_sync(self.async_client.aforce_login)(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = async_to_sync(self.async_client.get)('/api/async/posts/post-0/')
+        reads = [q for q in queries.captured_queries if 'base_' in q['sql']]
+        self.assertEqual(len(reads), 2)
+        self.assertEqual(len(json.loads(response.content)['comments']), 2)
+
+
+@skipIf(
+    connection.vendor == 'sqlite' and connection.is_in_memory_db(),
+    "SQLite en mémoire (cache partagé) ne supporte pas plusieurs connexions"
+)
+@override_settings(ASYNC_PARALLEL_READS=True)
+class ParallelAsyncReadTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('lecteur', 'lecteur@example.com', 'motdepasse123')
+        post = make_post(self.user, slug='post-0')
+        make_comment(post, self.user)
+        make_comment(post, self.user, body='Deuxième')
+
+    def test_detail_reads_overlap(self):
+        # Chaque lecture attend l'autre : lancées en série, la barrière expire
+        barrier = threading.Barrier(2, timeout=5)
+
+        def wait_for_the_other_read(execute, sql, params, many, context):
+            if 'base_post' in sql or 'base_comment' in sql:
+                barrier.wait()
+            return execute(sql, params, many, context)
+
+        def install(connection, **kwargs):
+            connection.execute_wrappers.append(wait_for_the_other_read)
+
+        install(connection)
+        self.addCleanup(connection.execute_wrappers.remove, wait_for_the_other_read)
+        connection_created.connect(install)
+        self.addCleanup(connection_created.disconnect, install)
+        async_to_sync(self.async_client.aforce_login)(self.user)
+        response = async_to_sync(self.async_client.get)('/api/async/posts/post-0/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([comment['body'] for comment in json.loads(response.content)['comments']],
+                         ['Deuxième', 'Un commentaire'])
+
+
+@override_settings(COMMENTS_EMBED_LIMIT=3)
+class PaginatedCommentsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('lecteur', 'lecteur@example.com', 'motdepasse123')
+        self.post = make_post(self.user)
+        self.comments = [make_comment(self.post, self.user, body=f'Commentaire {index}') for index in range(7)]
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_detail_embeds_the_first_comments_and_a_cursor(self):
+        data = self.client.get('/api/posts/premier-post/').data
+        self.assertEqual([comment['body'] for comment in data['comments']],
+                         ['Commentaire 6', 'Commentaire 5', 'Commentaire 4'])
+        self.assertEqual(data['comments_count'], 7)
+        self.assertIn('/api/posts/premier-post/comments/?cursor=', data['comments_next'])
+
+        # La suite continue exactement après le dernier commentaire intégré
+        page = self.client.get(data['comments_next'] + '&size=10').data
+        self.assertEqual([comment['body'] for comment in page['results']],
+                         [f'Commentaire {index}' for index in (3, 2, 1, 0)])
+        self.assertIsNone(page['next'])
+
+    def test_since_returns_only_newer_comments(self):
+        since = self.comments[4].created.isoformat()
+        response = self.client.get('/api/posts/premier-post/comments/', {'since': since})
+        self.assertEqual([comment['body'] for comment in response.data['results']],
+                         ['Commentaire 6', 'Commentaire 5'])
+
+    def test_invalid_since(self):
+        response = self.client.get('/api/posts/premier-post/comments/?since=hier')
+        self.assertEqual(response.status_code, 400)
+
+    def test_template_shows_only_the_latest_comments(self):
+        self.client.force_login(self.user)
+        response = self.client.get('/blog/post/premier-post/')
+        self.assertEqual(len(response.context['comments']), 3)
+        self.assertContains(response, '7 comments')
+        self.assertIsNone(response.context['newer_comments_url'])
+
+    def test_template_links_to_older_comments(self):
+        bodies = []
+        url = '/blog/post/premier-post/'
+        while url:
+            response = self.client.get(url)
+            bodies += [comment.body for comment in response.context['comments']]
+            url = response.context['older_comments_url']
+            if url:
+                self.assertContains(response, 'Older comments')
+        self.assertEqual(bodies, [f'Commentaire {index}' for index in range(6, -1, -1)])
+        self.assertIn('?cursor=', response.context['newer_comments_url'])
+
+
+class RowSerializerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user('auteur', 'auteur@example.com', 'motdepasse123')
+        self.reader = User.objects.create_user('lecteur', '', 'motdepasse123')
+        for index in range(3):
+            post = make_post(self.author, slug=f'post-{index}', body=f'Texte « accentué » {index}')
+            make_comment(post, self.reader, body='Réponse')
+            Likes.objects.create(user=self.reader, post=post)
+
+    def assertSameJSON(self, queryset, serializer_class, row_serializer_class):
+        renderer = JSONRenderer()
+        expected = renderer.render(serializer_class(queryset, many=True).data)
+        rows = row_serializer_class.rows(queryset)
+        self.assertEqual(renderer.render(row_serializer_class(rows, many=True).data), expected)
+
+    def test_output_matches_model_serializers(self):
+        self.assertSameJSON(Post.objects.order_by('id'), PostSerializer, PostRowSerializer)
+        self.assertSameJSON(Comment.objects.order_by('id'), CommentSerializer, CommentRowSerializer)
+        self.assertSameJSON(Likes.objects.order_by('id'), LikeSerializer, LikeRowSerializer)
+        self.assertSameJSON(User.objects.order_by('id'), UserSerializer, UserRowSerializer)
+
+    @override_settings(TIME_ZONE='Europe/Paris')
+    def test_dates_follow_the_current_timezone(self):
+        self.assertSameJSON(Comment.objects.order_by('id'), CommentSerializer, CommentRowSerializer)
+
+    def test_likes_are_read_in_a_single_query(self):
+        client = APIClient()
+        client.force_authenticate(self.reader)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/api/user/liked-posts/')
+        self.assertEqual(len(response.data['results']), 3)
+        # Une seule requête, avec les jointures user et post__author
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(response.data['results'][0]['post']['author']['username'], 'auteur')
+
+    def test_search_results_keep_their_cursor(self):
+        client = APIClient()
+        client.force_authenticate(self.reader)
+        first = client.get('/api/posts/', {'search': 'accentué', 'size': 2}).data
+        self.assertEqual(len(first['results']), 2)
+        self.assertNotIn('search_rank', first['results'][0])
+        rest = client.get(first['next']).data
+        self.assertEqual(len(rest['results']), 1)
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('bench_serializers', rows=10, repeat=2, stdout=out)
+        self.assertIn('likes', out.getvalue())
+
+
+class JSONCodecTests(TestCase):
+    payload = {
+        'title': 'Été « brûlant »\u2028ligne',
+        'created': timezone.now(),
+        'score': Decimal('1.50'),
+        'label': gettext_lazy('Like'),
+        'ids': {3: True, 7: False},
+        'results': [None, 1, 2.5, ['a']],
+    }
+
+    def test_same_bytes_as_drf(self):
+        expected = JSONRenderer().render(self.payload)
+        self.assertEqual(json_codec.dumps(self.payload), expected)
+        with mock.patch.object(json_codec, 'orjson', None):
+            self.assertEqual(json_codec.dumps(self.payload), expected)
+
+    def test_api_parses_and_rejects_json(self):
+        user = User.objects.create_user('lecteur', 'lecteur@example.com', 'motdepasse123')
+        make_post(user)
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.post('/api/posts/premier-post/add-comment/', {'body': 'Très bien'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['body'], 'Très bien')
+
+        response = client.post('/api/posts/premier-post/add-comment/', '{"body": ', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('JSON parse error', response.json()['detail'])
+
+    def test_auth_views_answer_json(self):
+        response = self.client.post('/accounts/api/login/', '{"username": ', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        User.objects.create_user('lecteur', 'lecteur@example.com', 'motdepasse123')
+        response = self.client.post(
+            '/accounts/api/login/', {'username': 'lecteur', 'password': 'motdepasse123'}, content_type='application/json'
+        )
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(response.json()['username'], 'lecteur')
+
+    @skipIf(msgpack is None, 'msgpack non installé')
+    def test_msgpack_is_opt_in(self):
+        user = User.objects.create_user('lecteur', 'lecteur@example.com', 'motdepasse123')
+        make_post(user)
+        client = APIClient()
+        client.force_authenticate(user)
+        self.assertEqual(client.get('/api/posts/')['Content-Type'], 'application/json')
+        response = client.get('/api/posts/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(response.content)['results'][0]['slug'], 'premier-post')
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user('admin', 'admin@example.com', 'motdepasse123', is_staff=True)
+        self.posts = [make_post(self.admin, slug=f'post-{index}') for index in range(3)]
+        make_comment(self.posts[0], self.admin)
+        for post in self.posts:
+            Likes.objects.create(user=self.admin, post=post)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def get(self, path):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return response.json(), [query['sql'] for query in queries]
+
+    def test_liked_post_ids_without_joins(self):
+        data, queries = self.get('/api/user/liked-posts/?fields=id,post.id')
+        self.assertEqual(data['results'][0], {'id': data['results'][0]['id'], 'post': {'id': self.posts[2].id}})
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('JOIN', queries[0])
+
+    def test_omit_nested_relation(self):
+        data, queries = self.get('/api/posts/post-0/likes/?omit=post.author,user')
+        self.assertEqual(set(data['results'][0]), {'id', 'post', 'created_at'})
+        self.assertNotIn('author', data['results'][0]['post'])
+        self.assertNotIn('auth_user', queries[-1])
+
+    def test_detail_without_comments_skips_their_query(self):
+        full, full_queries = self.get('/api/posts/post-0/')
+        cache.clear()
+        data, queries = self.get('/api/posts/post-0/?fields=title,content')
+        self.assertEqual(data, {'title': full['title'], 'content': full['content']})
+        self.assertEqual(len(queries), len(full_queries) - 1)
+        # Lecture du post (après les validateurs du GET conditionnel)
+        post_query = next(sql for sql in queries if '"title"' in sql)
+        self.assertNotIn('JOIN', post_query)
+        self.assertNotIn('"likes_count"', post_query)
+
+    def test_cursor_survives_omitted_ordering_field(self):
+        first, _ = self.get('/api/posts/?fields=slug&size=2')
+        self.assertEqual(first['results'], [{'slug': 'post-2'}, {'slug': 'post-1'}])
+        rest, _ = self.get(first['next'])
+        self.assertEqual(rest['results'], [{'slug': 'post-0'}])
+
+    def test_admin_list_narrows_columns(self):
+        data, queries = self.get('/api/admin/posts/?fields=id,author_username')
+        self.assertEqual(set(data['results'][0]), {'id', 'author_username'})
+        self.assertNotIn('"body"', queries[0])
+        self.assertIn('auth_user', queries[0])
+
+        data, queries = self.get('/api/admin/filter-posts/?status=published&omit=body,author_username')
+        self.assertNotIn('body', data['results'][0])
+        self.assertNotIn('auth_user', queries[0])
+
+    def test_writes_ignore_fieldsets(self):
+        response = self.client.patch('/api/admin/posts/%d/?fields=id' % self.posts[0].id, {'title': 'Nouveau'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['title'], 'Nouveau')
+
+
+def _route_callbacks(patterns):
+    # Vues de toutes les routes (y compris sous include()), sans doublons
+    callbacks = []
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            callbacks.extend(_route_callbacks(pattern.url_patterns))
+        elif pattern.callback not in callbacks:
+            callbacks.append(pattern.callback)
+    return callbacks
+
+
+@override_settings(QUERY_BUDGET_ENABLED=True, QUERY_BUDGET_MODE='raise', RESPONSE_CACHE_TIMEOUT=0)
+class QueryBudgetTests(TestCase):
+    """
+    Chaque route de base/api_urls.py et accounts/urls.py déclare un budget
+    de requêtes SQL ; on le vérifie avec peu puis beaucoup de données : le
+    nombre de requêtes ne doit pas dépendre du volume (pas de N+1)
+    """
+    # (méthode, chemin, données) ; {slug}, {post}, {comment}, {like}, {user} remplacés
+    requests = [
+        ('get', '/api/', None),
+        ('get', '/api/posts/', None),
+        ('get', '/api/posts/?search=contenu', None),
+        ('get', '/api/posts/{slug}/', None),
+        ('get', '/api/users/', None),
+        ('get', '/api/users/{user}/', None),
+        ('get', '/api/posts/{slug}/likes/', None),
+        ('post', '/api/posts/{slug}/toggle-like/', None),
+        ('delete', '/api/posts/{slug}/toggle-like/', None),
+        ('get', '/api/posts/{slug}/like-status/', None),
+        ('get', '/api/user/liked-posts/', None),
+        ('get', '/api/user/like-status/?slugs={slug},autre', None),
+        ('post', '/api/user/like-status/', {'slugs': ['{slug}'], 'ids': [1, 2]}),
+        ('get', '/api/user/liked-post-ids/', None),
+        ('get', '/api/posts/{slug}/comments/', None),
+        ('post', '/api/posts/{slug}/add-comment/', {'body': 'Nouveau'}),
+        ('delete', '/api/comments/{comment}/', None),
+        ('get', '/api/async/posts/', None),
+        ('get', '/api/async/posts/{slug}/', None),
+        ('get', '/api/async/posts/{slug}/comments/', None),
+        ('get', '/api/async/posts/{slug}/likes/', None),
+        ('get', '/api/async/posts/{slug}/like-status/', None),
+        ('get', '/api/admin/', None),
+        ('get', '/api/admin/posts/', None),
+        ('get', '/api/admin/posts/{post}/', None),
+        ('get', '/api/admin/posts/export/', None),
+        ('post', '/api/admin/posts/', {'title': 'Créé', 'slug': 'cree', 'body': 'Texte', 'author': '{user}'}),
+        ('patch', '/api/admin/posts/{post}/', {'title': 'Modifié'}),
+        ('get', '/api/admin/comments/', None),
+        ('get', '/api/admin/comments/{comment}/', None),
+        ('patch', '/api/admin/comments/{comment}/', {'body': 'Modifié'}),
+        ('delete', '/api/admin/comments/{comment}/', None),
+        ('get', '/api/admin/likes/', None),
+        ('get', '/api/admin/likes/{like}/', None),
+        ('delete', '/api/admin/likes/{like}/', None),
+        ('get', '/api/admin/users/', None),
+        ('get', '/api/admin/users/{user}/', None),
+        ('patch', '/api/admin/users/{user}/', {'first_name': 'Jean'}),
+        ('get', '/api/admin/stats/', None),
+        ('get', '/api/admin/filter-posts/?status=published', None),
+        ('delete', '/api/admin/posts/{post}/', None),
+        ('get', '/accounts/login/', None),
+        ('post', '/accounts/api/login/', {'username': 'lecteur', 'password': 'motdepasse123'}),
+        ('get', '/accounts/api/user/', None),
+        ('post', '/accounts/api/logout/', None),
+        ('post', '/accounts/api/register/', {'username': 'nouveau', 'email': 'n@example.com',
+                                             'password': 'motdepasse123', 'password2': 'motdepasse123'}),
+        ('get', '/accounts/register/', None),
+        ('post', '/accounts/direct-login/', {'username': 'lecteur', 'password': 'motdepasse123'}),
+        ('post', '/accounts/register-direct/', {'username': 'direct', 'email': 'd@example.com',
+                                                'password': 'motdepasse123', 'password2': 'motdepasse123'}),
+        ('get', '/accounts/direct-logout/', None),
+        ('get', '/accounts/logout/', None),
+    ]
+
+    def populate(self, size):
+        cache.clear()
+        self.admin = User.objects.create_user('lecteur', 'lecteur@example.com', 'motdepasse123', is_staff=True)
+        users = [self.admin] + [User.objects.create_user(f'membre{index}') for index in range(size)]
+        posts = [make_post(users[index % len(users)], slug=f'post-{index}') for index in range(size)]
+        for post in posts:
+            for user in users:
+                make_comment(post, user)
+                Likes.objects.create(user=user, post=post)
+        self.target = posts[0]
+        # Commentaires à supprimer par les requêtes DELETE
+        for _ in range(2):
+            make_comment(self.target, self.admin)
+        # L'index en mémoire survit au rollback du test : repartir de zéro
+        get_search_backend().reset()
+        self.addCleanup(get_search_backend().reset)
+        recompute_stats()
+
+    def run_requests(self):
+        counts = {}
+        client = APIClient()
+        for method, template, data in self.requests:
+            comment = Comment.objects.filter(post=self.target, author=self.admin).first()
+            like = Likes.objects.filter(post=self.target).first()
+            values = {
+                'slug': self.target.slug, 'post': self.target.pk, 'user': self.admin.pk,
+                'comment': comment and comment.pk, 'like': like and like.pk,
+            }
+            path = template.format(**values)
+            if data is not None:
+                data = json.loads(json.dumps(data).replace('{slug}', values['slug'])
+                                  .replace('"{user}"', str(values['user'])))
+            client.force_login(self.admin)
+            # Utilisateur relu en base à chaque requête : comptes indépendants du cache
+            forget_users([self.admin.pk])
+            with self.subTest(method=method, path=path):
+                response = getattr(client, method)(path, data, format='json')
+                self.assertLess(response.status_code, 500)
+                counts[(method, template)] = int(response['X-Query-Count'])
+        return counts
+
+    def test_every_route_declares_a_budget(self):
+        from base import api_urls
+        from accounts import urls as account_urls
+        for callback in _route_callbacks(api_urls.urlpatterns + account_urls.urlpatterns):
+            if getattr(callback, 'cls', None) is routers.APIRootView:
+                continue
+            actions = getattr(callback, 'actions', None) or {'get': None}
+            for method in actions:
+                with self.subTest(view=callback.__name__, method=method):
+                    self.assertIsNotNone(get_budget(callback, RequestFactory().generic(method.upper(), '/')))
+
+    def test_repeated_queries_are_reported(self):
+        author = User.objects.create_user('auteur')
+        posts = [make_post(author, slug=f'repete-{index}') for index in range(3)]
+        with record_queries() as stats:
+            Post.objects.filter(pk__in=[posts[0].pk]).count()
+            for post in posts:
+                Comment.objects.filter(post=post).count()
+        self.assertEqual(stats.count, 4)
+        self.assertEqual(stats.duplicates(3)[0][1], 3)
+        self.assertEqual(check_budget(stats, (4, 3), 'test')[0].count('requête répétée 3 fois'), 1)
+        with self.assertRaises(QueryBudgetExceeded):
+            enforce(check_budget(stats, (3, None), 'test'))
+
+    def test_query_counts_do_not_grow_with_data(self):
+        self.populate(2)
+        small = self.run_requests()
+        for model in (Likes, Comment, Post, User):
+            model.objects.all().delete()
+        self.populate(8)
+        large = self.run_requests()
+        for key, count in small.items():
+            with self.subTest(request=key):
+                self.assertEqual(large[key], count)
+
+
+class SeedDataTests(TestCase):
+    def test_seeded_volumes_and_counters(self):
+        out = StringIO()
+        call_command('seed_data', users=20, posts=30, comments=300, likes=200, batch_size=50, stdout=out)
+        self.assertIn('20 users, 30 posts, 300 comments, 200 likes', out.getvalue())
+        self.assertTrue(User.objects.get(username='seed0').is_staff)
+        self.assertTrue(User.objects.get(username='seed1').check_password(DEFAULT_PASSWORD))
+        # Compteurs dénormalisés et statistiques recalculés malgré bulk_create
+        for post in Post.objects.all():
+            self.assertEqual(post.likes_count, post.post_like_details.count())
+            self.assertEqual(post.comments_count, post.comments.count())
+        self.assertEqual(recompute_stats().likes_count, 200)
+        # Popularité inégale : le post le plus liké dépasse largement la médiane
+        likes = sorted(Post.objects.values_list('likes_count', flat=True))
+        self.assertGreater(likes[-1], 3 * likes[len(likes) // 2])
+
+    def test_seeding_twice_appends(self):
+        seed(users=3, posts=2, comments=0, likes=0)
+        self.assertEqual(seed(users=3, posts=2, comments=0, likes=0)['users'], 3)
+        self.assertTrue(Post.objects.filter(slug='seed-3').exists())
+
+
+class BenchEndpointsTests(TransactionTestCase):
+    """
+    Les clients du banc sont des threads : la base doit voir des données validées
+    """
+    baseline = '/tmp/projet_python_test_bench_baseline.json'
+
+    def setUp(self):
+        seed(users=5, posts=5, comments=20, likes=10)
+        self.addCleanup(lambda: os.path.exists(self.baseline) and os.remove(self.baseline))
+
+    def bench(self, *args):
+        out = StringIO()
+        call_command('bench_endpoints', '--only=post-detail,like,current-user', '--requests=4',
+                     '--clients=2', '--warmup=0', f'--baseline={self.baseline}', *args, stdout=out)
+        return out.getvalue()
+
+    def test_baseline_round_trip(self):
+        self.assertIn('--save-baseline', self.bench())
+        self.bench('--save-baseline')
+        results = load_baseline(self.baseline)['results']
+        self.assertEqual(set(results), {'post-detail', 'like', 'current-user'})
+        self.assertEqual(results['post-detail']['errors'], 0)
+        self.assertGreater(results['post-detail']['queries'], 0)
+
+        # Une requête SQL de plus par requête est une régression
+        results['post-detail']['queries'] -= 1
+        save_baseline(self.baseline, load_baseline(self.baseline)['meta'], results)
+        with self.assertRaisesMessage(CommandError, 'régression'):
+            self.bench('--fail-on-regression', '--tolerance=1000')
+
+    def test_regressions(self):
+        reference = {'rps': 100, 'p95_ms': 10, 'queries': 3, 'errors': 0}
+        self.assertEqual(regressions(dict(reference, rps=90, p95_ms=11), reference, 0.2), [])
+        self.assertEqual(len(regressions(dict(reference, rps=50, p95_ms=20, errors=1), reference, 0.2)), 3)
+
+
+@override_settings(
+    THROTTLE_ENABLED=True,
+    THROTTLE_BACKEND='base.throttling.LocalTokenBuckets',
+    THROTTLE_RATES={'like': {'user': '2/min', 'ip': '100/min'}, 'login': {'ip': '3/min'}, 'register': {'ip': '1/min'}},
+)
+class ThrottlingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('lecteur', 'lecteur@example.com', 'motdepasse123')
+        self.post = make_post(self.user)
+
+    def login(self, **extra):
+        return self.client.post('/accounts/api/login/', {'username': 'lecteur', 'password': 'faux'},
+                                content_type='application/json', **extra)
+
+    def test_login_is_shed_before_hashing(self):
+        for _ in range(3):
+            self.assertEqual(self.login().status_code, 400)
+        with mock.patch('accounts.api.authenticate') as authenticate, self.assertNumQueries(0):
+            response = self.login()
+        self.assertEqual(response.status_code, 429)
+        # Un jeton toutes les 20 s
+        self.assertIn(int(response['Retry-After']), range(1, 21))
+        authenticate.assert_not_called()
+        # Autre adresse IP, autre seau
+        self.assertEqual(self.login(REMOTE_ADDR='10.0.0.2').status_code, 400)
+
+    def test_login_routes_share_the_scope(self):
+        for _ in range(3):
+            self.login()
+        response = self.client.post('/accounts/direct-login/', {'username': 'lecteur', 'password': 'faux'},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 429)
+
+    def test_template_forms_share_the_scopes(self):
+        for _ in range(3):
+            self.login()
+        with mock.patch('accounts.views.authenticate') as authenticate:
+            response = self.client.post('/accounts/login/', {'username': 'lecteur', 'password': 'faux'})
+        self.assertEqual(response.status_code, 429)
+        authenticate.assert_not_called()
+        data = {'username': 'nouveau', 'email': 'n@example.com', 'password': 'motdepasse123',
+                'password2': 'motdepasse123'}
+        self.client.post('/accounts/api/register/', data, content_type='application/json')
+        response = self.client.post('/accounts/register/', dict(data, username='autre', email='a@example.com'))
+        self.assertEqual(response.status_code, 429)
+        self.assertFalse(User.objects.filter(username='autre').exists())
+        # L'affichage des formulaires n'est pas limité
+        self.assertEqual(self.client.get('/accounts/login/').status_code, 200)
+
+    def test_registration_is_limited_per_ip(self):
+        data = {'username': 'nouveau', 'email': 'n@example.com', 'password': 'motdepasse123',
+                'password2': 'motdepasse123'}
+        self.assertEqual(self.client.post('/accounts/api/register/', data, content_type='application/json').status_code, 200)
+        response = self.client.post('/accounts/register-direct/', dict(data, username='autre', email='a@example.com'),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 429)
+        self.assertFalse(User.objects.filter(username='autre').exists())
+        # Les GET (test de l'endpoint) ne consomment pas de jeton
+        self.assertEqual(self.client.get('/accounts/api/register/').status_code, 200)
+
+    def test_likes_are_limited_per_user(self):
+        other = User.objects.create_user('autre')
+        client = APIClient()
+        client.force_login(self.user)
+        path = f'/api/posts/{self.post.slug}/toggle-like/'
+        self.assertEqual(client.post(path).status_code, 201)
+        self.assertEqual(client.delete(path).status_code, 200)
+        response = client.post(path)
+        self.assertEqual(response.status_code, 429)
+        self.assertIn(int(response['Retry-After']), range(1, 31))
+        self.assertFalse(Likes.objects.exists())
+        client.force_login(other)
+        self.assertEqual(client.post(path).status_code, 201)
+
+    @override_settings(THROTTLE_NUM_PROXIES=1)
+    def test_forwarded_address_behind_proxy(self):
+        for _ in range(3):
+            self.login(HTTP_X_FORWARDED_FOR='203.0.113.7')
+        self.assertEqual(self.login(HTTP_X_FORWARDED_FOR='203.0.113.7').status_code, 429)
+        self.assertEqual(self.login(HTTP_X_FORWARDED_FOR='203.0.113.8').status_code, 400)
+
+    @override_settings(THROTTLE_BACKEND='base.throttling.CacheTokenBuckets')
+    def test_cache_buckets_are_shared_between_instances(self):
+        cache.clear()
+        first, second = CacheTokenBuckets(), CacheTokenBuckets()
+        self.assertEqual(first.take('k', 1, 0.5), 0)
+        self.assertAlmostEqual(second.take('k', 1, 0.5), 2, delta=0.1)
+
+    def test_bucket_refills_over_time(self):
+        state, wait = take(None, 2, 1, now=100)
+        state, wait = take(state, 2, 1, now=100)
+        self.assertEqual(wait, 0)
+        state, wait = take(state, 2, 1, now=100.5)
+        self.assertEqual(wait, 0.5)
+        self.assertEqual(take(state, 2, 1, now=101)[1], 0)
@@ -0,0 +1,169 @@
+"""
+Limitation de débit par client (seaux à jetons) pour les endpoints
+d'écriture et d'authentification. Chaque portée de THROTTLE_RATES donne
+un débit par utilisateur authentifié ('user') et/ou par adresse IP
+('ip') ; une requête refusée reçoit 429 et Retry-After avant tout
+hachage de mot de passe ou accès à la base.
+
+    @query_budget(6)
+    @throttle('login')      # au-dessus de @api_view / @require_POST
+    def login_api(request): ...
+"""
+import math
+import threading
+import time
+from functools import lru_cache, wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.dispatch import receiver
+from django.test.signals import setting_changed
+from django.utils.module_loading import import_string
+
+from accounts.tokens import InvalidToken, bearer_claims
+from backend.json_codec import json_response
+
+PERIODS = {'s': 1, 'sec': 1, 'm': 60, 'min': 60, 'h': 3600, 'hour': 3600, 'd': 86400, 'day': 86400}
+
+
+def parse_rate(rate):
+    """
+    '10/min' -> (capacité 10, 10 / 60 jetons par seconde)
+    """
+    count, period = rate.split('/')
+    return int(count), int(count) / PERIODS[period]
+
+
+def take(state, capacity, refill, now):
+    """
+    Retire un jeton du seau `state` (jetons, instant), rempli au débit
+    `refill` jusqu'à `capacity` ; retourne le nouvel état et l'attente
+    en secondes avant le prochain jeton (0 si la requête passe)
+    """
+    tokens, updated = state or (capacity, now)
+    tokens = min(capacity, tokens + max(0, now - updated) * refill)
+    if tokens >= 1:
+        return (tokens - 1, now), 0
+    return (tokens, now), (1 - tokens) / refill
+
+
+class LocalTokenBuckets:
+    """
+    Seaux en mémoire du processus : limite par processus seulement, pour
+    le développement et les tests
+    """
+    max_buckets = 10000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def take(self, key, capacity, refill):
+        now = time.time()
+        with self._lock:
+            if len(self._buckets) >= self.max_buckets:
+                # Un seau revenu plein équivaut à un seau absent
+                self._buckets = {bucket: entry for bucket, entry in self._buckets.items() if entry[1] > now}
+            entry = self._buckets.get(key)
+            state, wait = take(entry and entry[0], capacity, refill, now)
+            self._buckets[key] = (state, now + capacity / refill)
+            return wait
+
+
+class CacheTokenBuckets:
+    """
+    Seaux partagés entre processus via un backend de cache (Redis,
+    Memcached...). Lecture puis écriture sans verrou : des requêtes
+    simultanées d'un même client peuvent dépasser la limite d'un jeton
+    ou deux, ce qui reste acceptable pour absorber une rafale.
+    """
+    key_prefix = 'throttle'
+
+    def __init__(self):
+        self.cache = caches[getattr(settings, 'THROTTLE_CACHE_ALIAS', 'default')]
+
+    def take(self, key, capacity, refill):
+        key = f'{self.key_prefix}:{key}'
+        state, wait = take(self.cache.get(key), capacity, refill, time.time())
+        # L'entrée expire quand le seau serait de nouveau plein
+        self.cache.set(key, state, timeout=math.ceil(capacity / refill))
+        return wait
+
+
+@lru_cache(maxsize=None)
+def get_buckets():
+    return import_string(settings.THROTTLE_BACKEND)()
+
+
+@receiver(setting_changed)
+def reset_buckets(setting, **kwargs):
+    if setting in ('THROTTLE_BACKEND', 'THROTTLE_CACHE_ALIAS'):
+        get_buckets.cache_clear()
+
+
+def client_ip(request):
+    """
+    Adresse du client ; derrière THROTTLE_NUM_PROXIES mandataires de
+    confiance, l'entrée correspondante de X-Forwarded-For
+    """
+    proxies = getattr(settings, 'THROTTLE_NUM_PROXIES', 0)
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+    if proxies and forwarded:
+        addresses = [address.strip() for address in forwarded.split(',')]
+        return addresses[-min(proxies, len(addresses))]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def user_id(request):
+    """
+    Utilisateur du jeton Bearer (la limite passe avant l'authentification
+    DRF), sinon de la session
+    """
+    try:
+        claims = bearer_claims(request)
+    except InvalidToken:
+        claims = None
+    if claims:
+        return claims['u']
+    return request.user.pk if request.user.is_authenticated else None
+
+
+def check(request, scope):
+    """
+    Attente en secondes imposée au client pour la portée `scope`, ou 0.
+    L'utilisateur n'est identifié que si la portée limite par utilisateur.
+    """
+    rates = settings.THROTTLE_RATES.get(scope, {})
+    identities = []
+    owner = 'user' in rates and user_id(request)
+    if owner:
+        identities.append(('user', owner))
+    if 'ip' in rates:
+        identities.append(('ip', client_ip(request)))
+    buckets = get_buckets()
+    wait = 0
+    for kind, identity in identities:
+        capacity, refill = parse_rate(rates[kind])
+        wait = max(wait, buckets.take(f'{scope}:{kind}:{identity}', capacity, refill))
+    return wait
+
+
+def throttle(scope, methods=('POST', 'PUT', 'PATCH', 'DELETE')):
+    """
+    Applique la portée `scope` aux requêtes `methods` de la vue ; à placer
+    au-dessus des décorateurs de la vue (@api_view compris) pour refuser
+    avant l'authentification DRF, le parsing et les requêtes SQL
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if settings.THROTTLE_ENABLED and request.method in methods:
+                wait = check(request, scope)
+                if wait:
+                    return json_response(
+                        {'detail': 'Trop de requêtes, réessayez plus tard', 'retry_after': math.ceil(wait)},
+                        status=429, headers={'Retry-After': str(math.ceil(wait))},
+                    )
+            return view(request, *args, **kwargs)
+        return wrapped
+    return decorator
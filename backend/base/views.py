@@ -1,27 +1,29 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.http import Http404, HttpResponseRedirect
 from django.urls import reverse
+from django.conf import settings
 from .forms import CommentForm
 from django.core.paginator import (
     Paginator,
     EmptyPage,
     PageNotAnInteger,
 )
+from rest_framework.request import Request
+from .api import post_comments_queryset
 from .models import Post
+from .pagination import EmbeddedCommentPagination
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q
+from django.db import transaction
+from .search import get_search_backend
+from . import like_service
 # Create your views here.
 def post_list(request):
     query = request.GET.get('q', '')
-    posts = Post.published.all()
+    posts = Post.published.select_related('author').order_by('-publish')
     
-    # Si une requête de recherche est fournie, filtrer les posts
+    # Si une requête de recherche est fournie, utiliser le moteur de recherche indexé
     if query:
-        posts = posts.filter(
-            Q(title__icontains=query) | 
-            Q(body__icontains=query) |
-            Q(author__username__icontains=query)
-        )
+        posts = get_search_backend().search(posts, query)
     
     paginator = Paginator(posts, 6)  # Afficher 6 articles par page
     page = request.GET.get('page')
@@ -43,11 +45,7 @@ def search_posts(request):
     results = []
     
     if query:
-        results = Post.published.filter(
-            Q(title__icontains=query) | 
-            Q(body__icontains=query) |
-            Q(author__username__icontains=query)
-        )
+        results = get_search_backend().search(Post.published.select_related('author'), query)
         
     paginator = Paginator(results, 6)  # Afficher 6 articles par page
     page = request.GET.get('page')
@@ -69,7 +67,7 @@ def search_posts(request):
 
 def post_detail(request,slug):
     try:
-        post = Post.objects.get(slug=slug)
+        post = Post.objects.select_related('author').get(slug=slug)
     except Post.DoesNotExist:
         raise Http404("Post not found")
     
@@ -83,8 +81,10 @@ def post_detail(request,slug):
         if Likes.objects.filter(post=post, user=request.user).exists():
             liked = True
     
-    # Gérer les commentaires
-    comments = post.comments.all()
+    # Gérer les commentaires : COMMENTS_EMBED_LIMIT par page, les plus anciens
+    # via ?cursor=, avec la même pagination par clé que l'API des commentaires
+    comments_paginator = EmbeddedCommentPagination()
+    comments = comments_paginator.paginate_queryset(post_comments_queryset(post), Request(request))
     new_comment = None
     comment_form = None
     
@@ -98,13 +98,19 @@ def post_detail(request,slug):
                 new_comment.author = request.user
                 new_comment.username = request.user.username  # Auto-remplir le nom d'utilisateur
                 new_comment.email = request.user.email  # Auto-remplir l'email s'il existe
-                new_comment.save()
+                with transaction.atomic():
+                    new_comment.save()
+                # Compteur incrémenté en base par le signal
+                post.refresh_from_db(fields=['comments_count'])
         else:
             comment_form = CommentForm()
         
     context = {
         'post': post,
         'comments': comments,
+        'comments_limit': settings.COMMENTS_EMBED_LIMIT,
+        'older_comments_url': comments_paginator.get_next_link(),
+        'newer_comments_url': comments_paginator.get_previous_link(),
         'new_comment': new_comment,
         'comment_form': comment_form,
         'total_likes': total_likes,
@@ -115,19 +121,18 @@ def post_detail(request,slug):
 
 @login_required
 def like_post(request, slug):
-    post = get_object_or_404(Post, slug=slug)
-    from .models import Likes
+    post = get_object_or_404(Post.objects.only('id', 'slug', 'likes_count'), slug=slug)
     
-    # Si l'utilisateur a déjà liké le post, on retire son like (unlike)
-    like_exists = Likes.objects.filter(post=post, user=request.user).exists()
-    if like_exists:
-        # Supprimer le like existant
-        Likes.objects.filter(post=post, user=request.user).delete()
-    # Sinon, on ajoute son like
+    # Le formulaire envoie l'action correspondant à l'état affiché : une
+    # seule instruction SQL (et un double envoi reste idempotent). Sans
+    # action (ancien lien GET), on inverse l'état du like.
+    action = request.POST.get('action')
+    if action == 'like':
+        like_service.like(request.user, post)
+    elif action == 'unlike':
+        like_service.unlike(request.user, post)
     else:
-        # Créer un nouveau like
-        Likes.objects.create(post=post, user=request.user)
+        like_service.toggle(request.user, post)
     
     # Rediriger vers la page d'où vient la requête
     return HttpResponseRedirect(reverse('post_detail', args=[slug]))
-    
\ No newline at end of file
@@ -48,6 +48,7 @@ function App() {
   // Fonction pour gérer la déconnexion
   const handleLogout = () => {
     localStorage.removeItem('authToken');
+    localStorage.removeItem('refreshToken');
     localStorage.removeItem('username');
     localStorage.removeItem('isAdmin');
     setIsAuthenticated(false);
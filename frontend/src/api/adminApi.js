@@ -9,15 +9,45 @@ const getAuthHeader = () => {
   return token ? { Authorization: `Bearer ${token}` } : {};
 };
 
+// Retirer `with_count` d'un lien next/previous : le total n'est compté qu'une fois
+const withoutCount = (url) => {
+  if (!url) {
+    return null;
+  }
+  const parsed = new URL(url);
+  parsed.searchParams.delete('with_count');
+  return parsed.toString();
+};
+
+// Récupérer une page paginée par curseur ; le total n'est demandé que si `withCount` est vrai
+export const fetchPage = async (url, withCount = false) => {
+  const separator = url.includes('?') ? '&' : '?';
+  const response = await axios.get(withCount ? `${url}${separator}with_count=1` : url, {
+    headers: getAuthHeader()
+  });
+  const total = response.headers['x-total-count'];
+  return {
+    results: response.data.results,
+    next: withoutCount(response.data.next),
+    previous: withoutCount(response.data.previous),
+    total: total !== undefined ? parseInt(total, 10) : null
+  };
+};
+
+// Page d'une table d'administration : `pageUrl` est un lien next/previous
+// renvoyé par l'API ; sans lien, première page avec le total (X-Total-Count)
+const listPage = (url, pageUrl = null) => (pageUrl ? fetchPage(pageUrl) : fetchPage(url, true));
+
+// Choix des menus déroulants : les CHOICES_SIZE éléments les plus récents
+const CHOICES_SIZE = 100;
+const fetchChoices = async (url) => (await fetchPage(`${url}?size=${CHOICES_SIZE}`)).results;
+
 // Service pour l'administration des posts
 export const postService = {
-  // Récupérer tous les posts
-  getAllPosts: async () => {
+  // Récupérer une page de posts
+  getPosts: async (pageUrl = null) => {
     try {
-      const response = await axios.get(`${API_URL}posts/`, {
-        headers: getAuthHeader()
-      });
-      return response.data;
+      return await listPage(`${API_URL}posts/`, pageUrl);
     } catch (error) {
       console.error('Error fetching posts:', error);
       throw error;
@@ -76,13 +106,20 @@ export const postService = {
     }
   },
   
-  // Filtrer les posts par statut
-  filterPosts: async (status) => {
+  // Posts proposés dans les menus déroulants
+  getPostChoices: async () => {
     try {
-      const response = await axios.get(`${API_URL}filter-posts/?status=${status}`, {
-        headers: getAuthHeader()
-      });
-      return response.data;
+      return await fetchChoices(`${API_URL}posts/`);
+    } catch (error) {
+      console.error('Error fetching post choices:', error);
+      throw error;
+    }
+  },
+  
+  // Filtrer les posts par statut (une page)
+  filterPosts: async (status, pageUrl = null) => {
+    try {
+      return await listPage(`${API_URL}filter-posts/?status=${status}`, pageUrl);
     } catch (error) {
       console.error(`Error filtering posts by status ${status}:`, error);
       throw error;
@@ -92,12 +129,9 @@ export const postService = {
 
 // Service pour l'administration des commentaires
 export const commentService = {
-  getAllComments: async () => {
+  getComments: async (pageUrl = null) => {
     try {
-      const response = await axios.get(`${API_URL}comments/`, {
-        headers: getAuthHeader()
-      });
-      return response.data;
+      return await listPage(`${API_URL}comments/`, pageUrl);
     } catch (error) {
       console.error('Error fetching comments:', error);
       throw error;
@@ -155,12 +189,9 @@ export const commentService = {
 
 // Service pour l'administration des likes
 export const likeService = {
-  getAllLikes: async () => {
+  getLikes: async (pageUrl = null) => {
     try {
-      const response = await axios.get(`${API_URL}likes/`, {
-        headers: getAuthHeader()
-      });
-      return response.data;
+      return await listPage(`${API_URL}likes/`, pageUrl);
     } catch (error) {
       console.error('Error fetching likes:', error);
       throw error;
@@ -206,18 +237,24 @@ export const likeService = {
 
 // Service pour l'administration des utilisateurs
 export const userService = {
-  getAllUsers: async () => {
+  getUsers: async (pageUrl = null) => {
     try {
-      const response = await axios.get(`${API_URL}users/`, {
-        headers: getAuthHeader()
-      });
-      return response.data;
+      return await listPage(`${API_URL}users/`, pageUrl);
     } catch (error) {
       console.error('Error fetching users:', error);
       throw error;
     }
   },
   
+  getUserChoices: async () => {
+    try {
+      return await fetchChoices(`${API_URL}users/`);
+    } catch (error) {
+      console.error('Error fetching user choices:', error);
+      throw error;
+    }
+  },
+  
   getUser: async (id) => {
     try {
       const response = await axios.get(`${API_URL}users/${id}/`, {
@@ -281,3 +318,25 @@ export const statsService = {
     }
   }
 };
+
+// Service d'export en flux (NDJSON ou CSV) : posts, comments, likes ou users
+export const exportService = {
+  download: async (resource, output = 'csv') => {
+    try {
+      const response = await axios.get(`${API_URL}${resource}/export/?output=${output}`, {
+        headers: getAuthHeader(),
+        responseType: 'blob'
+      });
+      const url = window.URL.createObjectURL(response.data);
+      const link = document.createElement('a');
+      link.href = url;
+      link.download = `${resource}.${output}`;
+      link.click();
+      window.URL.revokeObjectURL(url);
+      return true;
+    } catch (error) {
+      console.error(`Error exporting ${resource}:`, error);
+      throw error;
+    }
+  }
+};
@@ -21,10 +21,54 @@ api.interceptors.request.use(
   (error) => Promise.reject(error)
 );
 
-// Intercepteur pour gérer les erreurs de réponse
+// Rafraîchissement en cours, partagé par toutes les requêtes en 401 : le jeton
+// de rafraîchissement ne sert qu'une fois, un second échange échouerait
+let refreshing = null;
+
+const refreshAccessToken = () => {
+  if (!refreshing) {
+    const refresh = localStorage.getItem('refreshToken');
+    refreshing = axios.post('/accounts/api/token/refresh/', { refresh })
+      .then(({ data }) => {
+        localStorage.setItem('authToken', data.token);
+        localStorage.setItem('refreshToken', data.refresh);
+        return data.token;
+      })
+      .catch((refreshError) => {
+        // Seul l'échec du rafraîchissement partagé déconnecte le client
+        localStorage.removeItem('authToken');
+        localStorage.removeItem('refreshToken');
+        throw refreshError;
+      })
+      .finally(() => {
+        refreshing = null;
+      });
+  }
+  return refreshing;
+};
+
+// Intercepteur pour gérer les erreurs de réponse : un jeton d'accès expiré
+// (401) est échangé une fois contre une nouvelle paire, puis la requête est rejouée
 api.interceptors.response.use(
   (response) => response,
-  (error) => {
+  async (error) => {
+    const config = error.config;
+    if (error.response?.status === 401 && config && !config._retried
+        && (refreshing || localStorage.getItem('refreshToken'))) {
+      config._retried = true;
+      try {
+        // Jeton déjà renouvelé par une autre requête : rejouer sans nouvel échange
+        const current = localStorage.getItem('authToken');
+        const sent = config.headers['Authorization'];
+        const token = !refreshing && current && sent !== `Bearer ${current}`
+          ? current
+          : await refreshAccessToken();
+        config.headers['Authorization'] = `Bearer ${token}`;
+        return api(config);
+      } catch (refreshError) {
+        // Rafraîchissement refusé : l'erreur d'origine est propagée
+      }
+    }
     console.error('API Error:', error.response || error.message || error);
     return Promise.reject(error);
   }
@@ -38,9 +82,12 @@ api.interceptors.response.use(
 export const fetchPosts = async (params = {}) => {
   try {
     const queryParams = new URLSearchParams();
-    // Ajouter les paramètres de pagination
-    if (params.page) {
-      queryParams.append('page', params.page);
+    // Ajouter les paramètres de pagination (curseur opaque renvoyé par l'API)
+    if (params.cursor) {
+      queryParams.append('cursor', params.cursor);
+    }
+    if (params.size) {
+      queryParams.append('size', params.size);
     }
     // Ajouter les paramètres de recherche
     if (params.search) {
@@ -56,6 +103,14 @@ export const fetchPosts = async (params = {}) => {
   }
 };
 
+// Extraire le curseur d'une URL `next` ou `previous` renvoyée par l'API
+export const cursorFromUrl = (url) => {
+  if (!url) {
+    return null;
+  }
+  return new URL(url, window.location.origin).searchParams.get('cursor');
+};
+
 // Fonction pour récupérer un post spécifique par son slug
 export const fetchPostBySlug = async (slug) => {
   try {
@@ -100,6 +155,29 @@ export const checkLikeStatus = async (slug) => {
   }
 };
 
+// Fonction pour vérifier en une seule requête le statut de like de plusieurs posts
+export const checkLikeStatuses = async (slugs) => {
+  try {
+    const response = await api.post('/api/user/like-status/', { slugs });
+    return response.data.slugs;
+  } catch (error) {
+    console.error('Erreur lors de la vérification groupée des likes:', error);
+    throw error;
+  }
+};
+
+// Fonction pour récupérer les ids des posts likés (instantané complet, ou delta depuis `since`)
+export const fetchLikedPostIds = async (since = null) => {
+  try {
+    const query = since ? `?since=${encodeURIComponent(since)}` : '';
+    const response = await api.get(`/api/user/liked-post-ids/${query}`);
+    return response.data;
+  } catch (error) {
+    console.error('Erreur lors de la récupération des posts likés:', error);
+    throw error;
+  }
+};
+
 // Fonction pour récupérer tous les posts likés par l'utilisateur
 export const fetchUserLikedPosts = async () => {
   try {
@@ -111,10 +189,11 @@ export const fetchUserLikedPosts = async () => {
   }
 };
 
-// Fonction pour récupérer les commentaires d'un post
-export const fetchComments = async (slug) => {
+// Fonction pour récupérer une page de commentaires d'un post
+// (`url` : lien `next` renvoyé par l'API, sinon la première page)
+export const fetchComments = async (slug, url = null) => {
   try {
-    const response = await api.get(`/api/posts/${slug}/comments/`);
+    const response = await api.get(url || `/api/posts/${slug}/comments/`);
     return response.data;
   } catch (error) {
     console.error(`Erreur lors de la récupération des commentaires du post ${slug}:`, error);
@@ -122,6 +201,17 @@ export const fetchComments = async (slug) => {
   }
 };
 
+// Fonction pour récupérer les commentaires publiés après `since` (date ISO)
+export const fetchNewComments = async (slug, since) => {
+  try {
+    const response = await api.get(`/api/posts/${slug}/comments/`, { params: { since } });
+    return response.data;
+  } catch (error) {
+    console.error(`Erreur lors de la récupération des nouveaux commentaires du post ${slug}:`, error);
+    throw error;
+  }
+};
+
 // Fonction pour ajouter un commentaire à un post
 export const addComment = async (slug, body) => {
   try {
@@ -215,7 +305,10 @@ export const registerUser = async (userData) => {
 // Fonction pour déconnecter un utilisateur
 export const logoutUser = async () => {
   try {
-    const response = await api.post('/accounts/api/logout/');
+    // Le jeton d'accès (en-tête) et le jeton de rafraîchissement sont révoqués
+    const response = await api.post('/accounts/api/logout/', {
+      refresh: localStorage.getItem('refreshToken'),
+    });
     return response.data;
   } catch (error) {
     console.error('Erreur lors de la déconnexion:', error);
@@ -0,0 +1,27 @@
+import React from 'react';
+
+// Pagination par curseur des tables d'administration : liens `previous` et
+// `next` renvoyés par l'API, total lu une fois (X-Total-Count) sur la première page
+const AdminPagination = ({ page, total, label, onNavigate }) => (
+  <div className="django-pagination">
+    <span className="step-links">
+      {page.previous && (
+        <button type="button" className="btn btn-link" onClick={() => onNavigate(page.previous)}>
+          &lsaquo; Précédent
+        </button>
+      )}
+      {total !== null && (
+        <span className="current">
+          {total} {label}
+        </span>
+      )}
+      {page.next && (
+        <button type="button" className="btn btn-link" onClick={() => onNavigate(page.next)}>
+          Suivant &rsaquo;
+        </button>
+      )}
+    </span>
+  </div>
+);
+
+export default AdminPagination;
@@ -25,15 +25,19 @@ const CommentEdit = () => {
     const fetchData = async () => {
       setLoading(true);
       try {
-        // Charger la liste des posts pour le menu déroulant
-        const postsData = await postService.getAllPosts();
-        setPosts(postsData);
+        // Posts les plus récents pour le menu déroulant (pas toute la table)
+        const postsData = await postService.getPostChoices();
         
         // Si en mode édition, charger les données du commentaire
         if (!isAddMode) {
           const commentData = await commentService.getComment(id);
           setComment(commentData);
+          // Garder l'article actuel sélectionnable s'il est plus ancien
+          if (commentData.post && !postsData.some(post => post.id === commentData.post)) {
+            postsData.push(await postService.getPost(commentData.post));
+          }
         }
+        setPosts(postsData);
       } catch (err) {
         console.error('Erreur lors du chargement des données:', err);
         setError('Impossible de charger les données. Assurez-vous d\'être connecté en tant qu\'administrateur.');
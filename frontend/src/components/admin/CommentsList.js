@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
 import { commentService } from '../../api/adminApi';
+import AdminPagination from './AdminPagination';
 
 const CommentsList = () => {
   const [comments, setComments] = useState([]);
@@ -8,6 +9,10 @@ const CommentsList = () => {
   const [error, setError] = useState(null);
   const [selectedItems, setSelectedItems] = useState([]);
   const [searchQuery, setSearchQuery] = useState('');
+  // Lien de la page affichée (null : première page)
+  const [pageUrl, setPageUrl] = useState(null);
+  const [page, setPage] = useState({ next: null, previous: null });
+  const [total, setTotal] = useState(null);
   const [filters, setFilters] = useState([
     {
       title: 'Par date de création',
@@ -30,8 +35,13 @@ const CommentsList = () => {
     const fetchComments = async () => {
       try {
         setLoading(true);
-        const data = await commentService.getAllComments();
+        const response = await commentService.getComments(pageUrl);
+        const data = response.results;
         setComments(data);
+        setPage({ next: response.next, previous: response.previous });
+        if (!pageUrl) {
+          setTotal(response.total);
+        }
         
         // Mettre à jour les options de filtre par article
         const posts = [...new Set(data.map(comment => comment.post_title || 'Sans titre'))];
@@ -60,7 +70,7 @@ const CommentsList = () => {
     };
 
     fetchComments();
-  }, []);
+  }, [pageUrl]);
 
   const handleSelectAll = (e) => {
     if (e.target.checked) {
@@ -194,14 +204,7 @@ const CommentsList = () => {
           <button type="submit">Exécuter</button>
         </div>
         
-        <div className="django-pagination">
-          <span className="step-links">
-            {/* Pagination ici */}
-            <span className="current">
-              Page 1 sur 1
-            </span>
-          </span>
-        </div>
+        <AdminPagination page={page} total={total} label="commentaires" onNavigate={setPageUrl} />
       </form>
       
       <DjangoFilter filters={filters} />
@@ -23,20 +23,27 @@ const LikesEdit = () => {
     const fetchData = async () => {
       setLoading(true);
       try {
-        // Charger la liste des posts et utilisateurs pour les menus déroulants
+        // Posts et utilisateurs les plus récents pour les menus déroulants
         const [postsData, usersData] = await Promise.all([
-          postService.getAllPosts(),
-          userService.getAllUsers()
+          postService.getPostChoices(),
+          userService.getUserChoices()
         ]);
         
-        setPosts(postsData);
-        setUsers(usersData);
-        
         // Si en mode édition, charger les données du like
         if (!isAddMode) {
           const likeData = await likeService.getLike(id);
           setLike(likeData);
+          // Garder l'article et l'utilisateur actuels sélectionnables s'ils sont plus anciens
+          if (likeData.post && !postsData.some(post => post.id === likeData.post)) {
+            postsData.push(await postService.getPost(likeData.post));
+          }
+          if (likeData.user && !usersData.some(user => user.id === likeData.user)) {
+            usersData.push(await userService.getUser(likeData.user));
+          }
         }
+        
+        setPosts(postsData);
+        setUsers(usersData);
       } catch (err) {
         console.error('Erreur lors du chargement des données:', err);
         setError('Impossible de charger les données. Assurez-vous d\'être connecté en tant qu\'administrateur.');
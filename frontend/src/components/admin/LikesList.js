@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
 import { likeService } from '../../api/adminApi';
+import AdminPagination from './AdminPagination';
 
 const LikesList = () => {
   const [likes, setLikes] = useState([]);
@@ -8,6 +9,10 @@ const LikesList = () => {
   const [error, setError] = useState(null);
   const [selectedItems, setSelectedItems] = useState([]);
   const [searchQuery, setSearchQuery] = useState('');
+  // Lien de la page affichée (null : première page)
+  const [pageUrl, setPageUrl] = useState(null);
+  const [page, setPage] = useState({ next: null, previous: null });
+  const [total, setTotal] = useState(null);
   const [filters, setFilters] = useState([
     {
       title: 'Par date',
@@ -30,8 +35,13 @@ const LikesList = () => {
     const fetchLikes = async () => {
       try {
         setLoading(true);
-        const data = await likeService.getAllLikes();
+        const response = await likeService.getLikes(pageUrl);
+        const data = response.results;
         setLikes(data);
+        setPage({ next: response.next, previous: response.previous });
+        if (!pageUrl) {
+          setTotal(response.total);
+        }
         
         // Mettre à jour les options de filtre par article
         const posts = [...new Set(data.map(like => like.post_title || 'Sans titre'))];
@@ -60,7 +70,7 @@ const LikesList = () => {
     };
 
     fetchLikes();
-  }, []);
+  }, [pageUrl]);
 
   const handleSelectAll = (e) => {
     if (e.target.checked) {
@@ -192,14 +202,7 @@ const LikesList = () => {
           <button type="submit">Exécuter</button>
         </div>
         
-        <div className="django-pagination">
-          <span className="step-links">
-            {/* Pagination ici */}
-            <span className="current">
-              Page 1 sur 1
-            </span>
-          </span>
-        </div>
+        <AdminPagination page={page} total={total} label="likes" onNavigate={setPageUrl} />
       </form>
       
       <DjangoFilter filters={filters} />
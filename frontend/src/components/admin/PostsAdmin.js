@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { Link, useNavigate, useLocation } from 'react-router-dom';
 import { postService } from '../../api/adminApi';
+import AdminPagination from './AdminPagination';
 import './AdminStyles.css';
 
 const PostsAdmin = () => {
@@ -10,26 +11,35 @@ const PostsAdmin = () => {
   const [activeFilter, setActiveFilter] = useState('all');
   const navigate = useNavigate();
   const location = useLocation();
+  // Lien de la page affichée (null : première page), propre au filtre de l'URL
+  const [cursor, setCursor] = useState({ search: location.search, url: null });
+  const pageUrl = cursor.search === location.search ? cursor.url : null;
+  const [page, setPage] = useState({ next: null, previous: null });
+  const [total, setTotal] = useState(null);
 
   useEffect(() => {
     const fetchPosts = async () => {
       try {
         setLoading(true);
-        let data;
+        let response;
         
         // Vérifiez si un filtre est appliqué via les paramètres d'URL
         const queryParams = new URLSearchParams(location.search);
         const statusFilter = queryParams.get('status');
         
         if (statusFilter && (statusFilter === 'published' || statusFilter === 'draft')) {
-          data = await postService.filterPosts(statusFilter);
+          response = await postService.filterPosts(statusFilter, pageUrl);
           setActiveFilter(statusFilter);
         } else {
-          data = await postService.getAllPosts();
+          response = await postService.getPosts(pageUrl);
           setActiveFilter('all');
         }
         
-        setPosts(data);
+        setPosts(response.results);
+        setPage({ next: response.next, previous: response.previous });
+        if (!pageUrl) {
+          setTotal(response.total);
+        }
         setError(null);
       } catch (err) {
         setError('Erreur lors du chargement des articles. Assurez-vous d\'être connecté comme administrateur.');
@@ -40,7 +50,7 @@ const PostsAdmin = () => {
     };
 
     fetchPosts();
-  }, [location.search]);
+  }, [location.search, pageUrl]);
 
   const handleFilterChange = (filter) => {
     if (filter === 'all') {
@@ -150,6 +160,12 @@ const PostsAdmin = () => {
             )}
           </tbody>
         </table>
+        <AdminPagination
+          page={page}
+          total={total}
+          label="articles"
+          onNavigate={url => setCursor({ search: location.search, url })}
+        />
       </div>
 
       <div className="admin-footer">
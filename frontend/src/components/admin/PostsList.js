@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { Link, useNavigate, useLocation } from 'react-router-dom';
 import { postService } from '../../api/adminApi';
+import AdminPagination from './AdminPagination';
 
 const PostsList = () => {
   const [posts, setPosts] = useState([]);
@@ -11,6 +12,12 @@ const PostsList = () => {
   const [currentAction, setCurrentAction] = useState('');
   const navigate = useNavigate();
   const location = useLocation();
+  // Lien de la page affichée (null : première page), propre aux filtres de l'URL
+  const [cursor, setCursor] = useState({ search: location.search, url: null });
+  const pageUrl = cursor.search === location.search ? cursor.url : null;
+  const [page, setPage] = useState({ next: null, previous: null });
+  const [total, setTotal] = useState(null);
+  const [reloadCount, setReloadCount] = useState(0);
   const [filters, setFilters] = useState([
     {
       title: 'Par auteur',
@@ -38,15 +45,17 @@ const PostsList = () => {
         const authorFilter = params.get('author');
         const statusFilter = params.get('status');
         
-        // Récupérer les posts (filtrés si nécessaire)
-        let data;
-        if (statusFilter) {
-          data = await postService.filterPosts(statusFilter);
-        } else {
-          data = await postService.getAllPosts();
+        // Récupérer une page de posts (filtrés si nécessaire)
+        const response = statusFilter
+          ? await postService.filterPosts(statusFilter, pageUrl)
+          : await postService.getPosts(pageUrl);
+        let data = response.results;
+        setPage({ next: response.next, previous: response.previous });
+        if (!pageUrl) {
+          setTotal(response.total);
         }
         
-        // Filtrer les posts par auteur côté client si nécessaire
+        // Filtrer les posts de la page par auteur côté client si nécessaire
         if (authorFilter) {
           data = data.filter(post => post.author_username === authorFilter);
         }
@@ -90,7 +99,7 @@ const PostsList = () => {
     };
 
     fetchPosts();
-  }, [location.search]);  // Rechargement quand les paramètres d'URL changent
+  }, [location.search, pageUrl, reloadCount]);  // Rechargement quand les paramètres d'URL ou la page changent
 
   const handleSelectAll = (e) => {
     if (e.target.checked) {
@@ -123,20 +132,9 @@ const PostsList = () => {
   };
   
   const resetSearch = () => {
-    // Réinitialiser la recherche et recharger tous les posts
+    // Réinitialiser la recherche et recharger la page courante
     setSearchQuery('');
-    const fetchPosts = async () => {
-      try {
-        setLoading(true);
-        const data = await postService.getAllPosts();
-        setPosts(data);
-      } catch (err) {
-        console.error(err);
-      } finally {
-        setLoading(false);
-      }
-    };
-    fetchPosts();
+    setReloadCount(count => count + 1);
   };
 
   const handleAction = async (e) => {
@@ -344,14 +342,12 @@ const PostsList = () => {
           </button>
         </div>
         
-        <div className="django-pagination">
-          <span className="step-links">
-            {/* Pagination ici */}
-            <span className="current">
-              Page 1 sur 1
-            </span>
-          </span>
-        </div>
+        <AdminPagination
+          page={page}
+          total={total}
+          label="posts"
+          onNavigate={url => setCursor({ search: location.search, url })}
+        />
       </form>
       
       <DjangoFilter filters={filters} />
@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
 import { userService } from '../../api/adminApi';
+import AdminPagination from './AdminPagination';
 
 const UsersList = () => {
   const [users, setUsers] = useState([]);
@@ -8,6 +9,10 @@ const UsersList = () => {
   const [error, setError] = useState(null);
   const [selectedItems, setSelectedItems] = useState([]);
   const [searchQuery, setSearchQuery] = useState('');
+  // Lien de la page affichée (null : première page)
+  const [pageUrl, setPageUrl] = useState(null);
+  const [page, setPage] = useState({ next: null, previous: null });
+  const [total, setTotal] = useState(null);
   const [filters, setFilters] = useState([
     {
       title: 'Statut',
@@ -31,8 +36,13 @@ const UsersList = () => {
     const fetchUsers = async () => {
       try {
         setLoading(true);
-        const data = await userService.getAllUsers();
+        const response = await userService.getUsers(pageUrl);
+        const data = response.results;
         setUsers(data);
+        setPage({ next: response.next, previous: response.previous });
+        if (!pageUrl) {
+          setTotal(response.total);
+        }
       } catch (err) {
         setError("Impossible de charger les utilisateurs. Assurez-vous d'être connecté en tant qu'administrateur.");
         console.error(err);
@@ -42,7 +52,7 @@ const UsersList = () => {
     };
 
     fetchUsers();
-  }, []);
+  }, [pageUrl]);
 
   const handleSelectAll = (e) => {
     if (e.target.checked) {
@@ -181,14 +191,7 @@ const UsersList = () => {
           <button type="submit">Exécuter</button>
         </div>
         
-        <div className="django-pagination">
-          <span className="step-links">
-            {/* Pagination ici */}
-            <span className="current">
-              Page 1 sur 1
-            </span>
-          </span>
-        </div>
+        <AdminPagination page={page} total={total} label="utilisateurs" onNavigate={setPageUrl} />
       </form>
       
       <DjangoFilter filters={filters} />
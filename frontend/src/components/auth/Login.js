@@ -57,7 +57,12 @@ const Login = ({ onLoginSuccess }) => {
         const isAdmin = data.is_staff || data.is_superuser || false;
         
         // Stocker les informations d'authentification
-        localStorage.setItem('authToken', 'session-auth'); // Token simplifié
+        // Jeton d'accès signé (envoyé en Bearer par blogApi.js) et jeton de rafraîchissement
+        const token = data.token || 'session-auth';
+        localStorage.setItem('authToken', token);
+        if (data.refresh) {
+          localStorage.setItem('refreshToken', data.refresh);
+        }
         localStorage.setItem('username', formData.username);
         localStorage.setItem('isAdmin', isAdmin);
         
@@ -65,7 +70,7 @@ const Login = ({ onLoginSuccess }) => {
         
         // Utiliser la fonction onLoginSuccess si fournie
         if (onLoginSuccess) {
-          onLoginSuccess('session-auth', formData.username, isAdmin);
+          onLoginSuccess(token, formData.username, isAdmin);
         }
         
         // Rediriger vers la page d'accueil
@@ -15,6 +15,7 @@ const Logout = () => {
       } finally {
         // Dans tous les cas, supprimer les données d'authentification locales
         localStorage.removeItem('authToken');
+        localStorage.removeItem('refreshToken');
         localStorage.removeItem('username');
         
         // Rediriger vers la page d'accueil
@@ -7,6 +7,9 @@ import './CommentSection.css';
 
 const CommentSection = ({ 
   comments = [], 
+  commentsCount, 
+  hasMoreComments = false, 
+  onLoadMore, 
   postSlug, 
   isAuthenticated, 
   currentUserId, 
@@ -17,6 +20,7 @@ const CommentSection = ({
   const [isSubmitting, setIsSubmitting] = useState(false);
   const [error, setError] = useState(null);
   const [success, setSuccess] = useState(false);
+  const [loadingMore, setLoadingMore] = useState(false);
   
   const handleSubmit = async (e) => {
     e.preventDefault();
@@ -42,6 +46,17 @@ const CommentSection = ({
     }
   };
   
+  const handleLoadMore = async () => {
+    setLoadingMore(true);
+    try {
+      await onLoadMore();
+    } catch (err) {
+      console.error('Erreur lors du chargement des commentaires:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleDeleteComment = async (commentId) => {
     if (window.confirm('Êtes-vous sûr de vouloir supprimer ce commentaire ?')) {
       try {
@@ -58,7 +73,7 @@ const CommentSection = ({
   
   return (
     <div className="comment-section">
-      <h3 className="mb-4">Commentaires ({comments.length})</h3>
+      <h3 className="mb-4">Commentaires ({commentsCount ?? comments.length})</h3>
       
       {/* Formulaire d'ajout de commentaire */}
       {isAuthenticated ? (
@@ -160,6 +175,13 @@ const CommentSection = ({
               )}
             </div>
           ))}
+          {hasMoreComments && (
+            <div className="text-center mt-3">
+              <Button variant="outline-secondary" size="sm" onClick={handleLoadMore} disabled={loadingMore}>
+                {loadingMore ? 'Chargement...' : 'Voir plus de commentaires'}
+              </Button>
+            </div>
+          )}
         </div>
       )}
     </div>
@@ -4,13 +4,19 @@ import { FaHeart, FaRegHeart } from 'react-icons/fa';
 import { addLike, removeLike, checkLikeStatus } from '../../api/blogApi';
 import './LikeButton.css';
 
-const LikeButton = ({ postSlug, likesCount, isAuthenticated, onLikeUpdate }) => {
-  const [liked, setLiked] = useState(false);
+const LikeButton = ({ postSlug, likesCount, isAuthenticated, onLikeUpdate, initialLiked }) => {
+  const [liked, setLiked] = useState(!!initialLiked);
   const [count, setCount] = useState(likesCount || 0);
   const [isLoading, setIsLoading] = useState(false);
   
   // Vérifier si l'utilisateur a déjà liké ce post
   useEffect(() => {
+    // Statut déjà fourni par le parent (requête groupée) : pas d'appel individuel
+    if (initialLiked !== undefined) {
+      setLiked(!!initialLiked);
+      return;
+    }
+    
     const checkLiked = async () => {
       if (isAuthenticated && postSlug) {
         try {
@@ -23,7 +29,7 @@ const LikeButton = ({ postSlug, likesCount, isAuthenticated, onLikeUpdate }) =>
     };
     
     checkLiked();
-  }, [postSlug, isAuthenticated]);
+  }, [postSlug, isAuthenticated, initialLiked]);
   
   const handleLikeToggle = async () => {
     if (!isAuthenticated) {
@@ -35,19 +41,14 @@ const LikeButton = ({ postSlug, likesCount, isAuthenticated, onLikeUpdate }) =>
     setIsLoading(true);
     
     try {
-      if (liked) {
-        await removeLike(postSlug);
-        setCount((prevCount) => Math.max(0, prevCount - 1));
-        setLiked(false);
-      } else {
-        await addLike(postSlug);
-        setCount((prevCount) => prevCount + 1);
-        setLiked(true);
-      }
+      // Le serveur renvoie le nouvel état et le nouveau compteur
+      const result = liked ? await removeLike(postSlug) : await addLike(postSlug);
+      setCount(result.likes_count);
+      setLiked(result.liked);
       
       // Notifier le composant parent que le statut de like a changé
       if (onLikeUpdate) {
-        onLikeUpdate(count);
+        onLikeUpdate(result.likes_count);
       }
     } catch (error) {
       console.error('Erreur lors de la modification du like:', error);
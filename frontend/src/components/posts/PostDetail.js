@@ -14,6 +14,8 @@ const PostDetail = () => {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [comments, setComments] = useState([]);
+  const [commentsNext, setCommentsNext] = useState(null);
+  const [commentsCount, setCommentsCount] = useState(0);
   const [isAuthenticated, setIsAuthenticated] = useState(false);
   const [currentUserId, setCurrentUserId] = useState(null);
 
@@ -37,13 +39,16 @@ const PostDetail = () => {
         const data = await fetchPostBySlug(slug);
         setPost(data);
         
-        // Charger les commentaires s'il n'y en a pas déjà dans les données
+        // Le détail n'embarque que les premiers commentaires, la suite est paginée
         if (!data.comments) {
           const commentsData = await fetchComments(slug);
-          setComments(commentsData);
+          setComments(commentsData.results);
+          setCommentsNext(commentsData.next);
         } else {
           setComments(data.comments);
+          setCommentsNext(data.comments_next);
         }
+        setCommentsCount(data.comments_count ?? data.comments?.length ?? 0);
         
         setLoading(false);
       } catch (err) {
@@ -77,6 +82,7 @@ const PostDetail = () => {
       
       // Ajouter le nouveau commentaire à la liste existante
       setComments(prevComments => [newComment, ...prevComments]);
+      setCommentsCount(prevCount => prevCount + 1);
       
       return true;
     } catch (err) {
@@ -90,6 +96,18 @@ const PostDetail = () => {
     setComments(prevComments => 
       prevComments.filter(comment => comment.id !== commentId)
     );
+    setCommentsCount(prevCount => Math.max(0, prevCount - 1));
+  };
+
+  const handleLoadMoreComments = async () => {
+    if (!commentsNext) return;
+    const page = await fetchComments(slug, commentsNext);
+    // Un commentaire ajouté entre-temps peut déjà être affiché
+    setComments(prevComments => {
+      const known = new Set(prevComments.map(comment => comment.id));
+      return [...prevComments, ...page.results.filter(comment => !known.has(comment.id))];
+    });
+    setCommentsNext(page.next);
   };
 
   if (loading) {
@@ -242,6 +260,9 @@ const PostDetail = () => {
             {/* Comments section */}
             <CommentSection 
               comments={comments}
+              commentsCount={commentsCount}
+              hasMoreComments={!!commentsNext}
+              onLoadMore={handleLoadMoreComments}
               postSlug={post.slug}
               isAuthenticated={isAuthenticated}
               currentUserId={currentUserId}
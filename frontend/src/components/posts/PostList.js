@@ -1,7 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { Link, useLocation } from 'react-router-dom';
-import { fetchPosts, checkAuthStatus } from '../../api/blogApi';
-import Pagination from './Pagination';
+import { fetchPosts, checkAuthStatus, cursorFromUrl, checkLikeStatuses } from '../../api/blogApi';
 import LikeButton from './LikeButton';
 import './PostList.css';
 
@@ -9,9 +8,13 @@ const PostList = () => {
   const [posts, setPosts] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
-  const [currentPage, setCurrentPage] = useState(1);
-  const [totalPages, setTotalPages] = useState(1);
+  // Pile des curseurs : cursors[i] ouvre la page i (null pour la première)
+  const [cursors, setCursors] = useState([null]);
+  const [currentPage, setCurrentPage] = useState(0);
+  const [nextCursor, setNextCursor] = useState(null);
   const [isAuthenticated, setIsAuthenticated] = useState(false);
+  // Statut de like de chaque post de la page, chargé en une seule requête
+  const [likedBySlug, setLikedBySlug] = useState({});
   const location = useLocation();
   
   // Extraire la requête de recherche des paramètres d'URL le cas échéant
@@ -39,7 +42,7 @@ const PostList = () => {
         setLoading(true);
         // Ajouter les paramètres de page et de recherche si nécessaire
         const params = {
-          page: currentPage,
+          cursor: cursors[currentPage],
           size: 12 // Augmenter le nombre d'articles par page à 12
         };
         
@@ -49,7 +52,7 @@ const PostList = () => {
         
         const response = await fetchPosts(params);
         setPosts(response.results);
-        setTotalPages(Math.ceil(response.count / 12)); // 12 posts par page pour remplir la page
+        setNextCursor(cursorFromUrl(response.next));
         setLoading(false);
       } catch (err) {
         console.error('Erreur lors du chargement des posts:', err);
@@ -59,10 +62,39 @@ const PostList = () => {
     };
 
     loadPosts();
+    // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [currentPage, searchQuery]);
 
-  const handlePageChange = (pageNumber) => {
-    setCurrentPage(pageNumber);
+  useEffect(() => {
+    const loadLikeStatuses = async () => {
+      if (!isAuthenticated || posts.length === 0) {
+        return;
+      }
+      try {
+        const statuses = await checkLikeStatuses(posts.map(post => post.slug));
+        setLikedBySlug(statuses);
+      } catch (error) {
+        console.error('Erreur lors de la vérification des likes:', error);
+      }
+    };
+
+    loadLikeStatuses();
+  }, [posts, isAuthenticated]);
+
+  // Revenir à la première page quand la recherche change
+  useEffect(() => {
+    setCursors([null]);
+    setCurrentPage(0);
+  }, [searchQuery]);
+
+  const handleNextPage = () => {
+    setCursors(previous => [...previous.slice(0, currentPage + 1), nextCursor]);
+    setCurrentPage(currentPage + 1);
+    window.scrollTo(0, 0);
+  };
+
+  const handlePreviousPage = () => {
+    setCurrentPage(Math.max(0, currentPage - 1));
     window.scrollTo(0, 0);
   };
 
@@ -123,6 +155,7 @@ const PostList = () => {
                           postSlug={posts[0].slug}
                           likesCount={posts[0].likes_count}
                           isAuthenticated={isAuthenticated}
+                          initialLiked={!!likedBySlug[posts[0].slug]}
                           onLikeUpdate={(newCount) => {
                             // Mettre à jour le compteur de likes dans la liste
                             setPosts(currentPosts => 
@@ -192,6 +225,7 @@ const PostList = () => {
                             postSlug={post.slug}
                             likesCount={post.likes_count}
                             isAuthenticated={isAuthenticated}
+                            initialLiked={!!likedBySlug[post.slug]}
                             onLikeUpdate={(newCount) => {
                               // Mettre à jour le compteur de likes dans la liste
                               setPosts(currentPosts => 
@@ -210,13 +244,22 @@ const PostList = () => {
             )}
           </div>
           
-          {/* Pagination */}
-          {totalPages > 1 && (
-            <Pagination 
-              currentPage={currentPage} 
-              totalPages={totalPages}
-              onPageChange={handlePageChange}
-            />
+          {/* Pagination par curseur */}
+          {(currentPage > 0 || nextCursor) && (
+            <nav aria-label="Pagination" className="my-4">
+              <ul className="pagination justify-content-center">
+                <li className={`page-item ${currentPage === 0 ? 'disabled' : ''}`}>
+                  <button className="page-link" onClick={handlePreviousPage} disabled={currentPage === 0}>
+                    &laquo; Précédent
+                  </button>
+                </li>
+                <li className={`page-item ${!nextCursor ? 'disabled' : ''}`}>
+                  <button className="page-link" onClick={handleNextPage} disabled={!nextCursor}>
+                    Suivant &raquo;
+                  </button>
+                </li>
+              </ul>
+            </nav>
           )}
         </div>
       </div>